@@ -0,0 +1,70 @@
+import os
+import uuid
+from contextlib import contextmanager
+
+import pytest
+
+
+@contextmanager
+def scratch_schema():
+    """Create an empty schema in the test Postgres and yield its conninfo."""
+    url = os.getenv("HLS_TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("HLS_TEST_DATABASE_URL is not set")
+    psycopg = pytest.importorskip("psycopg")
+    schema = f"test_{uuid.uuid4().hex}"
+    with psycopg.connect(url, autocommit=True) as connection:
+        connection.execute(f"CREATE SCHEMA {schema}")
+    try:
+        yield psycopg.conninfo.make_conninfo(url, options=f"-csearch_path={schema}")
+    finally:
+        with psycopg.connect(url, autocommit=True) as connection:
+            connection.execute(f"DROP SCHEMA {schema} CASCADE")
+
+
+@contextmanager
+def installed_driver(conninfo):
+    """Install a PostgresDriver as the hls_db driver."""
+    from hls_lambda_layer import hls_db
+    from hls_lambda_layer.hls_db_postgres import PostgresDriver
+
+    driver = PostgresDriver(conninfo)
+    previous = hls_db.driver
+    hls_db.driver = driver
+    try:
+        yield driver
+    finally:
+        hls_db.driver = previous
+        driver.close()
+
+
+@pytest.fixture
+def postgres_url():
+    """
+    Connection string for an empty schema in a local Postgres.
+
+    Tests using it are skipped unless HLS_TEST_DATABASE_URL points at a
+    database the tests may create schemas in.
+    """
+    with scratch_schema() as conninfo:
+        yield conninfo
+
+
+@pytest.fixture
+def postgres_driver(postgres_url):
+    """A PostgresDriver installed as the hls_db driver for the test."""
+    with installed_driver(postgres_url) as driver:
+        yield driver
+
+
+@pytest.fixture(scope="module")
+def module_postgres_driver():
+    """
+    A PostgresDriver on a schema shared by a test module.
+
+    For modules which load data once, such as large synthetic tables, and
+    then run several read only tests against it.
+    """
+    with scratch_schema() as conninfo:
+        with installed_driver(conninfo) as driver:
+            yield driver
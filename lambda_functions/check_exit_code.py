@@ -1,7 +1,9 @@
+from hls_lambda_layer.hls_failures import (
+    AC_EXPECTED_EXIT_CODES,
+    COMPLETED,
+    classify_exit_code,
+)
+
+
 def handler(event, context):
-    # Exit code 3 is invalid solar zenith angle.
-    # Exit code 4 is cloud cover over threshold.
-    if event == 0 or event == 3 or event == 4:
-        return True
-    else:
-        return False
+    return classify_exit_code(event, AC_EXPECTED_EXIT_CODES) in COMPLETED
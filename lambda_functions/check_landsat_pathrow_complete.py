@@ -2,25 +2,7 @@ import json
 import os
 from functools import reduce
 
-import boto3
-
-db_credentials_secrets_store_arn = os.getenv("HLS_SECRETS")
-database_name = os.getenv("HLS_DB_NAME")
-db_cluster_arn = os.getenv("HLS_DB_ARN")
-
-
-rds_client = boto3.client("rds-data")
-
-
-def execute_statement(sql, sql_parameters=[]):
-    response = rds_client.execute_statement(
-        secretArn=db_credentials_secrets_store_arn,
-        database=database_name,
-        resourceArn=db_cluster_arn,
-        sql=sql,
-        parameters=sql_parameters,
-    )
-    return response
+from hls_lambda_layer.hls_db import execute_statement, string_parameter
 
 
 def build_pathrows_string(records):
@@ -40,14 +22,14 @@ def handler(event, context):
     rowlistquery = " AND row IN (" + rowlist + ")"
     q = (
         "SELECT * FROM landsat_ac_log WHERE"
-        + " path = :path AND acquisition = :acquisition::date AND jobinfo->>'Status' = 'SUCCEEDED'"
+        + " path = :path AND acquisition = :acquisition::date AND job_status = 'SUCCEEDED'"
         + rowlistquery
     )
     response = execute_statement(
         q,
         sql_parameters=[
-            {"name": "path", "value": {"stringValue": event["path"]}},
-            {"name": "acquisition", "value": {"stringValue": event["date"]}},
+            string_parameter("path", event["path"]),
+            string_parameter("acquisition", event["date"]),
         ],
     )
     if len(response["records"]) > 0:
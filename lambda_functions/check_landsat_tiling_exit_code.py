@@ -1,12 +1,15 @@
+from hls_lambda_layer.hls_failures import (
+    COMPLETED,
+    TILING_EXPECTED_EXIT_CODES,
+    classify_exit_code,
+)
+
+
 def handler(event, context):
-    # Exit code 5 is empty tile output.
-    valid_exits = [0, 5]
-    valid = True
-    for code in event:
-        if isinstance(code, int):
-            if code not in valid_exits:
-                valid = False
-        else:
-            if code == "nocode":
-                valid = False
-    return valid
+    # Entries which are neither exit codes nor "nocode" are the inputs of
+    # path rows which were not tiled.
+    codes = [code for code in event if isinstance(code, int) or code == "nocode"]
+    return all(
+        classify_exit_code(code, TILING_EXPECTED_EXIT_CODES) in COMPLETED
+        for code in codes
+    )
@@ -0,0 +1,25 @@
+"""Create the log table partitions for upcoming acquisition months."""
+import os
+
+from hls_lambda_layer.hls_db import execute_statement, long_parameter
+
+
+def handler(event, context):
+    """
+    Create partitions for acquisitions up to MONTHS_AHEAD months from now.
+
+    Parameters:
+    event (dict) Scheduled event source
+
+    Returns:
+    created (int) The number of partitions created
+
+    """
+    months_ahead = int(os.getenv("MONTHS_AHEAD", "3"))
+    response = execute_statement(
+        "SELECT create_log_partitions(:months_ahead::integer)",
+        sql_parameters=[long_parameter("months_ahead", months_ahead)],
+    )
+    created = response["records"][0][0]["longValue"]
+    print(f"Created {created} log table partitions")
+    return created
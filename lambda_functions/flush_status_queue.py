@@ -0,0 +1,20 @@
+"""Apply queued status writes to the logging database in batches."""
+from hls_lambda_layer.hls_status_queue import flush_records
+
+
+def handler(event, context):
+    """
+    Flush a batch of queued status statements.
+
+    Parameters:
+    event (dict) SQS event source with queued status statements
+
+    Returns:
+    response (dict) batchItemFailures for the messages to redeliver
+
+    """
+    failed = flush_records(event["Records"])
+    print(f"Flushed {len(event['Records']) - len(failed)} status writes")
+    return {
+        "batchItemFailures": [{"itemIdentifier": message_id} for message_id in failed]
+    }
@@ -3,24 +3,18 @@ import json
 import os
 from operator import itemgetter
 
-import boto3
-from hls_lambda_layer.hls_batch_utils import parse_jobinfo
-
-db_credentials_secrets_store_arn = os.getenv("HLS_SECRETS")
-database_name = os.getenv("HLS_DB_NAME")
-db_cluster_arn = os.getenv("HLS_DB_ARN")
-rds_client = boto3.client("rds-data")
-
-
-def execute_statement(sql, sql_parameters=[]):
-    response = rds_client.execute_statement(
-        secretArn=db_credentials_secrets_store_arn,
-        database=database_name,
-        resourceArn=db_cluster_arn,
-        sql=sql,
-        parameters=sql_parameters,
-    )
-    return response
+from hls_lambda_layer.hls_batch_utils import (
+    JOB_COLUMN_VALUES,
+    JOB_COLUMNS,
+    NEXT_RETRY_AT,
+    archive_jobinfo,
+    job_column_parameters,
+    parse_jobinfo,
+    retry_backoff_parameters,
+)
+from hls_lambda_layer.hls_db import string_parameter
+from hls_lambda_layer.hls_failures import AC_EXPECTED_EXIT_CODES, classify
+from hls_lambda_layer.hls_status_queue import write_statement
 
 
 def handler(event, context):
@@ -38,30 +32,24 @@ def handler(event, context):
     jobinfo, jobinfostring, exitcode, jobid = itemgetter(
         "jobinfo", "jobinfostring", "exitcode", "jobid"
     )(parsed_info)
+    failure_class = classify(parsed_info, AC_EXPECTED_EXIT_CODES)
     q = (
-        "UPDATE landsat_ac_log SET (jobid, jobinfo, run_count) ="
-        + " (:jobid::text, :jobinfo::jsonb, run_count + 1)"
+        f"UPDATE landsat_ac_log SET (jobid, jobinfo, run_count, {JOB_COLUMNS}) ="
+        + f" (:jobid::text, :jobinfo::jsonb, run_count + 1, {JOB_COLUMN_VALUES}),"
+        + " failure_class = :failure_class::text, claimed_until = NULL,"
+        + f" next_retry_at = {NEXT_RETRY_AT}"
         + " WHERE scene_id = :scene::text"
     )
     sql_parameters = [
-        {"name": "jobinfo", "value": {"stringValue": jobinfostring}},
-        {"name": "scene", "value": {"stringValue": event["scene"]}},
+        string_parameter("jobinfo", jobinfostring),
+        string_parameter("scene", event["scene"]),
+        string_parameter("jobid", jobid or None),
+        string_parameter("failure_class", failure_class),
     ]
-    if jobid:
-        sql_parameters.append(
-            {
-                "name": "jobid",
-                "value": {"stringValue": jobid},
-            },
-        )
-    else:
-        sql_parameters.append(
-            {
-                "name": "jobid",
-                "value": {"isNull": True},
-            },
-        )
-    execute_statement(q, sql_parameters=sql_parameters)
+    sql_parameters.extend(job_column_parameters(parsed_info))
+    sql_parameters.extend(retry_backoff_parameters(failure_class))
+    archive_jobinfo(parsed_info)
+    write_statement(q, sql_parameters=sql_parameters)
 
     print(f"Exit Code is {exitcode}")
     return exitcode
@@ -2,47 +2,93 @@ import json
 import os
 from functools import reduce
 
-import boto3
+from hls_lambda_layer.hls_db import execute_statement, string_parameter
 
-db_credentials_secrets_store_arn = os.getenv("HLS_SECRETS")
-database_name = os.getenv("HLS_DB_NAME")
-db_cluster_arn = os.getenv("HLS_DB_ARN")
 
+def succeeded_coverage(pathrows, coverages, succeeded_rows):
+    """
+    Percentage of a tile's summed pathrow coverage that has succeeded.
 
-rds_client = boto3.client("rds-data")
+    Parameters:
+    pathrows (list) Pathrows intersecting the tile, which may repeat
+    coverages (list) PercentOfS2 for each entry in pathrows
+    succeeded_rows (set) Rows with a successful atmospheric correction
 
+    Returns:
+    coverage (float) Succeeded share of the tile's total coverage, 0-100
 
-def execute_statement(sql, sql_parameters=[]):
-    response = rds_client.execute_statement(
-        secretArn=db_credentials_secrets_store_arn,
-        database=database_name,
-        resourceArn=db_cluster_arn,
-        sql=sql,
-        parameters=sql_parameters,
+    """
+    succeeded = [pathrow[-3:] in succeeded_rows for pathrow in pathrows]
+    total = sum(coverages)
+    if total == 0:
+        return 100.0 if all(succeeded) else 0.0
+    covered = sum(coverage for coverage, ok in zip(coverages, succeeded) if ok)
+    return covered / total * 100
+
+
+def release_claim(event):
+    execute_statement(
+        "UPDATE landsat_mgrs_log SET claimed_until = NULL"
+        + " WHERE path = :path::varchar(3) AND mgrs = :mgrs::varchar(5)"
+        + " AND acquisition = :acquisition::date AND claimed_until IS NOT NULL",
+        sql_parameters=[
+            string_parameter("path", event["path"]),
+            string_parameter("mgrs", event["MGRS"]),
+            string_parameter("acquisition", event["date"]),
+        ],
     )
-    return response
 
 
 def handler(event, context):
-    pathrows = event["mgrs_metadata"]["pathrows"]
+    """
+    Check if enough of an MGRS tile's pathrows have succeeded for tiling.
+
+    A tile which is not ready ends its execution without being logged, so its
+    reprocessing claim is released here for the next incompletes run to
+    check it again.
+
+    Parameters:
+    event (dict) Event source with date, path and the pr2mgrs mgrs_metadata
+
+    Returns:
+    status (dict) ready_for_tiling and the pathrows_string of the succeeded
+    pathrows to tile with
+
+    """
+    threshold = float(os.getenv("COVERAGE_THRESHOLD", "100"))
+    mgrs_metadata = event["mgrs_metadata"]
+    pathrows = mgrs_metadata["pathrows"]
+    # Without coverage metadata every pathrow counts equally.
+    coverages = mgrs_metadata.get("pathrows_coverage", [1.0] * len(pathrows))
     rowlist = reduce((lambda agg, row: agg + "'" + row[-3:] + "'" + ","), pathrows, "")
     rowlist = rowlist.rstrip(",")
     rowlistquery = " AND row IN (" + rowlist + ")"
     q = (
-        "SELECT * FROM landsat_ac_log WHERE"
-        + " path = :path AND acquisition = :acquisition::date AND jobinfo->>'Status' = 'SUCCEEDED'"
+        "SELECT row FROM landsat_ac_log WHERE"
+        + " path = :path AND acquisition = :acquisition::date AND job_status = 'SUCCEEDED'"
         + rowlistquery
     )
     response = execute_statement(
         q,
         sql_parameters=[
-            {"name": "path", "value": {"stringValue": event["path"]}},
-            {"name": "acquisition", "value": {"stringValue": event["date"]}},
+            string_parameter("path", event["path"]),
+            string_parameter("acquisition", event["date"]),
         ],
     )
-    if len(response["records"]) == len(pathrows):
-        ready_for_tiling = True
-    else:
-        ready_for_tiling = False
+    succeeded_rows = {record[0]["stringValue"] for record in response["records"]}
+    coverage = succeeded_coverage(pathrows, coverages, succeeded_rows)
+    print(f"{event['MGRS']} succeeded coverage is {coverage:.1f}%")
+
+    succeeded_pathrows = []
+    for pathrow in pathrows:
+        if pathrow[-3:] in succeeded_rows and pathrow not in succeeded_pathrows:
+            succeeded_pathrows.append(pathrow)
 
-    return ready_for_tiling
+    # Rounding guards against float error when every pathrow has succeeded.
+    ready_for_tiling = len(succeeded_pathrows) > 0 and round(coverage, 6) >= threshold
+    if not ready_for_tiling:
+        release_claim(event)
+    return {
+        "ready_for_tiling": ready_for_tiling,
+        "pathrows_string": ",".join(succeeded_pathrows),
+    }
@@ -2,47 +2,56 @@ import json
 import os
 from operator import itemgetter
 
-import boto3
-from hls_lambda_layer.hls_batch_utils import parse_jobinfo
-
-rds_client = boto3.client("rds-data")
-
-db_credentials_secrets_store_arn = os.getenv("HLS_SECRETS")
-database_name = os.getenv("HLS_DB_NAME")
-db_cluster_arn = os.getenv("HLS_DB_ARN")
-
-
-def execute_statement(sql, sql_parameters=[]):
-    response = rds_client.execute_statement(
-        secretArn=db_credentials_secrets_store_arn,
-        database=database_name,
-        resourceArn=db_cluster_arn,
-        sql=sql,
-        parameters=sql_parameters,
-    )
-    return response
+from hls_lambda_layer.hls_batch_utils import (
+    JOB_COLUMN_VALUES,
+    JOB_COLUMNS,
+    NEXT_RETRY_AT,
+    archive_jobinfo,
+    job_column_parameters,
+    parse_jobinfo,
+    retry_backoff_parameters,
+)
+from hls_lambda_layer.hls_db import string_parameter
+from hls_lambda_layer.hls_failures import (
+    TILING_EXPECTED_EXIT_CODES,
+    TRANSIENT_INFRA,
+    classify,
+)
+from hls_lambda_layer.hls_status_queue import write_statement
 
 
 def handler(event, context):
     sql_parameters = [
-        {"name": "mgrs", "value": {"stringValue": event["MGRS"]}},
-        {"name": "path", "value": {"stringValue": event["path"]}},
-        {"name": "acquisition", "value": {"stringValue": event["date"]}},
+        string_parameter("mgrs", event["MGRS"]),
+        string_parameter("path", event["path"]),
+        string_parameter("acquisition", event["date"]),
     ]
     try:
         parsed_info = parse_jobinfo("tilejobinfo", event)
         jobinfo, jobinfostring, exitcode = itemgetter(
             "jobinfo", "jobinfostring", "exitcode"
         )(parsed_info)
+        failure_class = classify(parsed_info, TILING_EXPECTED_EXIT_CODES)
         q = (
-            "UPDATE landsat_mgrs_log SET (jobinfo, run_count) ="
-            + " (:jobinfo::jsonb, run_count +1)"
-        )
-        sql_parameters.append(
-            {"name": "jobinfo", "value": {"stringValue": jobinfostring}}
+            f"UPDATE landsat_mgrs_log SET (jobinfo, run_count, {JOB_COLUMNS}) ="
+            + f" (:jobinfo::jsonb, run_count +1, {JOB_COLUMN_VALUES}),"
+            + " failure_class = :failure_class::text, claimed_until = NULL,"
+            + f" next_retry_at = {NEXT_RETRY_AT}"
         )
+        sql_parameters.append(string_parameter("jobinfo", jobinfostring))
+        sql_parameters.append(string_parameter("failure_class", failure_class))
+        sql_parameters.extend(job_column_parameters(parsed_info))
+        sql_parameters.extend(retry_backoff_parameters(failure_class))
+        archive_jobinfo(parsed_info)
     except KeyError:
-        q = "UPDATE landsat_mgrs_log SET run_count = run_count +1"
+        q = (
+            "UPDATE landsat_mgrs_log SET run_count = run_count +1,"
+            + " failure_class = :failure_class::text, claimed_until = NULL,"
+            + f" next_retry_at = {NEXT_RETRY_AT}"
+        )
+        # Without the tiling job's result the failure is not the granule's.
+        sql_parameters.append(string_parameter("failure_class", TRANSIENT_INFRA))
+        sql_parameters.extend(retry_backoff_parameters(TRANSIENT_INFRA))
         exitcode = "nocode"
 
     sql = (
@@ -51,7 +60,7 @@ def handler(event, context):
         + " mgrs = :mgrs::varchar(5) AND acquisition = :acquisition::date;"
     )
     print(sql)
-    execute_statement(
+    write_statement(
         sql,
         sql_parameters=sql_parameters,
     )
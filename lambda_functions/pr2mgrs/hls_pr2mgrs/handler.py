@@ -6,48 +6,230 @@ the pre-computed relationship between Sentinel-2 tile and Landsat pathrow.
 
 ref: https://github.com/NASA-IMPACT/hls.v1.5/blob/d7fdaf2cc3745ce434f77fb0506b9eeb26acdc35/L8/sr_tile/script/run_sr_tile.sh#L126
 """
+
+import mmap
 import os
-from typing import Dict
+import struct
+from typing import Dict, List, Optional, Tuple
+
+data_dir = os.path.join(os.path.dirname(__file__), "data")
+lookup_file = os.path.join(data_dir, "HLS.L8S2overlap.txt")
+packed_lookup_file = os.path.join(data_dir, "HLS.L8S2overlap.bin")
+
+# Packed overlap table layout, all values little-endian.
+#   header: magic, record count, tile count
+#   tiles:  one entry per S2 tile sorted by tile id with its ULX/ULY and the
+#           start/count of its records in the tile ordered index
+#   records: one entry per overlap row sorted by pathrow in file order with
+#            the integer pathrow, tile number and PercentOfS2
+#   tile index: record numbers grouped by tile number in file order
+MAGIC = b"HLSL8S2\x01"
+HEADER = struct.Struct("<8sII")
+TILE = struct.Struct("<5siiII")
+RECORD = struct.Struct("<IHf")
+RECORD_NUMBER = struct.Struct("<I")
+MAX_TILES = 2**16
+
+
+def pack_overlap_table(lines: List[str]) -> bytes:
+    """
+    Pack the lines of HLS.L8S2overlap.txt into the binary lookup format.
+
+    Parameters:
+    lines (list) Lines of HLS.L8S2overlap.txt, including the header
+
+    Returns:
+    packed (bytes) The packed overlap table
+
+    """
+    rows = [line.split(" ") for line in lines[1:]]
+    # Stable sort so rows for a pathrow keep their file order.
+    rows.sort(key=lambda row: int(row[0]))
+    tile_ids = sorted({row[1] for row in rows})
+    if len(tile_ids) > MAX_TILES:
+        raise ValueError(f"{len(tile_ids)} tiles exceed the packed format limit")
+    tile_numbers = {tile_id: number for number, tile_id in enumerate(tile_ids)}
+
+    tile_corners: Dict[str, Tuple[int, int]] = {}
+    tile_records: Dict[str, List[int]] = {tile_id: [] for tile_id in tile_ids}
+    packed_records = bytearray()
+    for record_number, (pathrow, tile_id, ulx, uly, coverage) in enumerate(rows):
+        tile_corners.setdefault(tile_id, (int(ulx), int(uly)))
+        tile_records[tile_id].append(record_number)
+        packed_records += RECORD.pack(
+            int(pathrow), tile_numbers[tile_id], float(coverage)
+        )
+
+    packed_tiles = bytearray()
+    packed_index = bytearray()
+    start = 0
+    for tile_id in tile_ids:
+        records = tile_records[tile_id]
+        ulx, uly = tile_corners[tile_id]
+        packed_tiles += TILE.pack(tile_id.encode(), ulx, uly, start, len(records))
+        for record_number in records:
+            packed_index += RECORD_NUMBER.pack(record_number)
+        start += len(records)
+
+    header = HEADER.pack(MAGIC, len(rows), len(tile_ids))
+    return bytes(header + packed_tiles + packed_records + packed_index)
+
+
+class OverlapTable:
+    """Binary searchable, memory mapped view of the packed overlap table."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.record_count, self.tile_count = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a packed overlap table")
+        self.tiles_offset = HEADER.size
+        self.records_offset = self.tiles_offset + self.tile_count * TILE.size
+        self.index_offset = self.records_offset + self.record_count * RECORD.size
+
+    def tile(self, number: int) -> Tuple[str, int, int, int, int]:
+        tile_id, ulx, uly, start, count = TILE.unpack_from(
+            self.buffer, self.tiles_offset + number * TILE.size
+        )
+        return tile_id.decode(), ulx, uly, start, count
+
+    def record(self, number: int) -> Tuple[str, int, float]:
+        pathrow, tile_number, coverage = RECORD.unpack_from(
+            self.buffer, self.records_offset + number * RECORD.size
+        )
+        return f"{pathrow:06d}", tile_number, round(coverage, 1)
 
-# We put this outside the function so it can be cached
-lookup_file = os.path.join(os.path.dirname(__file__), "data", "HLS.L8S2overlap.txt")
-with open(lookup_file, "r") as f:
-    lookupTable = list(map(lambda x: x.split(" "), f.read().splitlines()))
+    def find_tile(self, mgrs: str) -> Optional[int]:
+        key = mgrs.encode()
+        low, high = 0, self.tile_count
+        while low < high:
+            middle = (low + high) // 2
+            offset = self.tiles_offset + middle * TILE.size
+            if self.buffer[offset : offset + 5] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.tile_count and self.tile(low)[0] == mgrs:
+            return low
+        return None
+
+    def pathrow_tiles(self, pathrow: str) -> List[Tuple[str, float]]:
+        """Tiles and PercentOfS2 for each overlap row of a pathrow."""
+        if len(pathrow) != 6 or not pathrow.isdigit():
+            return []
+        key = int(pathrow)
+        low, high = 0, self.record_count
+        while low < high:
+            middle = (low + high) // 2
+            offset = self.records_offset + middle * RECORD.size
+            if RECORD_NUMBER.unpack_from(self.buffer, offset)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        tiles = []
+        for number in range(low, self.record_count):
+            record_pathrow, tile_number, coverage = RECORD.unpack_from(
+                self.buffer, self.records_offset + number * RECORD.size
+            )
+            if record_pathrow != key:
+                break
+            tiles.append((self.tile(tile_number)[0], round(coverage, 1)))
+        return tiles
+
+    def mgrs_pathrows(self, mgrs: str) -> Optional[Dict]:
+        """Pathrows with PercentOfS2 and the ULX/ULY of an MGRS tile."""
+        number = self.find_tile(mgrs)
+        if number is None:
+            return None
+        _, ulx, uly, start, count = self.tile(number)
+        pathrows = []
+        for position in range(start, start + count):
+            (record_number,) = RECORD_NUMBER.unpack_from(
+                self.buffer, self.index_offset + position * RECORD_NUMBER.size
+            )
+            pathrow, _, coverage = self.record(record_number)
+            pathrows.append((pathrow, coverage))
+        return {"pathrows": pathrows, "ulx": str(ulx), "uly": str(uly)}
+
+
+# Opened on first use and then cached for the life of the container.
+overlap_table = None
+
+
+def get_overlap_table() -> OverlapTable:
+    global overlap_table
+    if overlap_table is None:
+        overlap_table = OverlapTable(packed_lookup_file)
+    return overlap_table
+
+
+def get_mgrs_values(pathrow: str) -> Dict:
+    """MGRS tiles intersecting a Landsat pathrow."""
+    # Do we want to raise an error when no grid is found ?
+    mgrs = [tile for tile, _ in get_overlap_table().pathrow_tiles(pathrow)]
+    mgrs_values = {"mgrs": mgrs, "count": len(mgrs)}
+    return mgrs_values
+
+
+def get_mgrs_metadata(mgrs: str, path: Optional[str] = None) -> Dict:
+    """
+    Landsat pathrows intersecting an MGRS tile and the tile's ULX/ULY.
+
+    pathrows_coverage holds the PercentOfS2 of each entry in pathrows.
+    """
+    tile = get_overlap_table().mgrs_pathrows(mgrs)
+    overlaps = []
+    mgrs_ulx = None
+    mgrs_uly = None
+    if tile is not None:
+        overlaps = tile["pathrows"]
+        mgrs_ulx = tile["ulx"]
+        mgrs_uly = tile["uly"]
+    if path:
+        overlaps = [overlap for overlap in overlaps if overlap[0][0:3] == path]
+    pathrows = [pathrow for pathrow, _ in overlaps]
+    # Do we want to raise an error when no grid is found ?
+    pathrows_string = ",".join(pathrows)
+    mgrs_metadata = {
+        "pathrows": pathrows,
+        "mgrs_ulx": mgrs_ulx,
+        "mgrs_uly": mgrs_uly,
+        "pathrows_string": pathrows_string,
+        "pathrows_coverage": [coverage for _, coverage in overlaps],
+    }
+    return mgrs_metadata
 
 
 def handler(event: Dict, context: Dict):
-    """AWS Lambda handler."""
-    if event.get("row"):
-        pathrow = f"{event['path']}{event['row']}"
-        listS2 = list(filter(lambda x: x[0] == pathrow, lookupTable))
-        # Do we want to raise an error when no grid is found ?
-        mgrs = [s2[1] for s2 in listS2]
-        mgrs_values = {"mgrs": mgrs, "count": len(mgrs)}
-        return mgrs_values
+    """
+    AWS Lambda handler.
 
-    elif event.get("MGRS"):
-        listL8 = list(filter(lambda x: x[1] == str(event.get("MGRS")), lookupTable))
-        pathrows = [l8[0] for l8 in listL8]
-        mgrs_ulx = None
-        mgrs_uly = None
-        if len(listL8) > 0:
-            mgrs_ulx = listL8[0][2]
-            mgrs_uly = listL8[0][3]
-        if event.get("path"):
-            pathrows = [
-                pathrow
-                for pathrow in pathrows
-                if pathrow[0:3] == str(event.get("path"))
-            ]
-        # Do we want to raise an error when no grid is found ?
-        pathrows_string = ",".join(pathrows)
-        mgrs_metadata = {
-            "pathrows": pathrows,
-            "mgrs_ulx": mgrs_ulx,
-            "mgrs_uly": mgrs_uly,
-            "pathrows_string": pathrows_string,
+    Accepts a single lookup, either a Landsat path and row or an MGRS tile
+    optionally filtered to one Landsat path, or a batch of lookups as lists of
+    ``pathrows`` and/or ``mgrs_tiles`` (with the same optional ``path``
+    filter).  Batches return the single lookup results keyed by pathrow and
+    MGRS tile.
+    """
+    if "pathrows" in event or "mgrs_tiles" in event:
+        path = str(event["path"]) if event.get("path") else None
+        return {
+            "pathrows": {
+                pathrow: get_mgrs_values(pathrow)
+                for pathrow in event.get("pathrows", [])
+            },
+            "mgrs_tiles": {
+                mgrs: get_mgrs_metadata(mgrs, path)
+                for mgrs in event.get("mgrs_tiles", [])
+            },
         }
-        return mgrs_metadata
+
+    elif event.get("row"):
+        return get_mgrs_values(f"{event['path']}{event['row']}")
+
+    elif event.get("MGRS"):
+        path = str(event["path"]) if event.get("path") else None
+        return get_mgrs_metadata(str(event.get("MGRS")), path)
 
     else:
         raise Exception("Missing PATHROW or MGRS")
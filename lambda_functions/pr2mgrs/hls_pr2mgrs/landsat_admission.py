@@ -0,0 +1,46 @@
+"""
+HLS: Landsat scene admission.
+
+Look up the MGRS tiles intersecting a new Landsat scene, log the scene and
+its tiles in one database transaction and check LAADS auxiliary data
+availability in a single invocation.
+"""
+
+import os
+from typing import Dict
+
+from hls_lambda_layer.hls_db import execute_statement, historic_value, transaction
+from hls_lambda_layer.hls_granule_log import landsat_mgrs_insert, landsat_scene_insert
+from hls_lambda_layer.laads import laads_available
+
+from .handler import get_mgrs_values
+
+
+def handler(event: Dict, context: Dict):
+    """
+    AWS Lambda handler.
+
+    Parameters:
+    event (dict) Landsat scene from the Landsat step function input
+
+    Returns:
+    event (dict) The scene with mgrsvalues and, when tiles intersect the
+    scene, the LAADS availability taskresult
+
+    """
+    mgrsvalues = get_mgrs_values(f"{event['path']}{event['row']}")
+    event["mgrsvalues"] = mgrsvalues
+    if mgrsvalues["count"] == 0:
+        return event
+
+    historic = historic_value()
+    statements = [
+        landsat_scene_insert(event, historic),
+        landsat_mgrs_insert(event, mgrsvalues["mgrs"], historic),
+    ]
+    with transaction() as transaction_id:
+        for sql, sql_parameters in statements:
+            execute_statement(sql, sql_parameters, transactionId=transaction_id)
+
+    event["taskresult"] = laads_available(event["scene"], os.environ["LAADS_BUCKET"])
+    return event
@@ -1,6 +1,12 @@
 import pytest
 
-from lambda_functions.pr2mgrs.hls_pr2mgrs.handler import handler
+from lambda_functions.pr2mgrs.hls_pr2mgrs.handler import (
+    OverlapTable,
+    handler,
+    lookup_file,
+    pack_overlap_table,
+    packed_lookup_file,
+)
 
 
 def test_handler_mgrs():
@@ -10,7 +16,7 @@ def test_handler_mgrs():
         "count": 2,
     }
 
-    handler({"path": "001", "row": "002"}, {}) == expected
+    assert handler({"path": "001", "row": "002"}, {}) == expected
 
 
 def test_handler_pathrow():
@@ -19,6 +25,7 @@ def test_handler_pathrow():
         "mgrs_ulx": "199980",
         "mgrs_uly": "5900020",
         "pathrows_string": "001086,232086,233086",
+        "pathrows_coverage": [1.0, 27.6, 100.0],
     }
     assert handler({"MGRS": "19HBU"}, {}) == expected
 
@@ -26,3 +33,90 @@ def test_handler_pathrow():
 def test_handler_mgrs_empty():
     expected = {"mgrs": [], "count": 0}
     assert handler({"path": "001", "row": "001"}, {}) == expected
+
+
+def test_handler_pathrow_path_filter():
+    expected = {
+        "pathrows": ["232086"],
+        "mgrs_ulx": "199980",
+        "mgrs_uly": "5900020",
+        "pathrows_string": "232086",
+        "pathrows_coverage": [27.6],
+    }
+    assert handler({"MGRS": "19HBU", "path": "232"}, {}) == expected
+
+
+def test_handler_pathrow_unknown_mgrs():
+    expected = {
+        "pathrows": [],
+        "mgrs_ulx": None,
+        "mgrs_uly": None,
+        "pathrows_string": "",
+        "pathrows_coverage": [],
+    }
+    assert handler({"MGRS": "00AAA"}, {}) == expected
+
+
+def test_handler_results_are_copies():
+    handler({"path": "001", "row": "002"}, {})["mgrs"].append("bogus")
+    assert handler({"path": "001", "row": "002"}, {})["count"] == 2
+
+
+def test_packed_table_is_current():
+    """The packed artifact must be rebuilt when the text table changes."""
+    with open(lookup_file, "r") as f:
+        packed = pack_overlap_table(f.read().splitlines())
+    with open(packed_lookup_file, "rb") as f:
+        assert f.read() == packed
+
+
+def test_overlap_table(tmp_path):
+    lines = [
+        "PathRow S2TileID S2ULX S2ULY PercentOfS2",
+        "001002 28XEQ 499980 9000000 6.1",
+        "001002 29XMK 399960 9000000 10.0",
+        "001003 28XEQ 499980 9000000 2.2",
+        "002001 27XWH 499980 8800020 97.1",
+    ]
+    path = tmp_path / "overlap.bin"
+    path.write_bytes(pack_overlap_table(lines))
+    table = OverlapTable(str(path))
+    assert table.pathrow_tiles("001002") == [("28XEQ", 6.1), ("29XMK", 10.0)]
+    assert table.pathrow_tiles("002001") == [("27XWH", 97.1)]
+    assert table.pathrow_tiles("001001") == []
+    assert table.mgrs_pathrows("28XEQ") == {
+        "pathrows": [("001002", 6.1), ("001003", 2.2)],
+        "ulx": "499980",
+        "uly": "9000000",
+    }
+    assert table.mgrs_pathrows("27XWJ") is None
+
+
+def test_overlap_table_bad_magic(tmp_path):
+    path = tmp_path / "overlap.bin"
+    path.write_bytes(b"\x00" * 64)
+    with pytest.raises(ValueError):
+        OverlapTable(str(path))
+
+
+def test_handler_batch():
+    event = {"pathrows": ["001002", "001001"], "mgrs_tiles": ["19HBU", "00AAA"]}
+    actual = handler(event, {})
+    assert actual["pathrows"] == {
+        "001002": {"mgrs": ["28XEQ", "29XMK"], "count": 2},
+        "001001": {"mgrs": [], "count": 0},
+    }
+    assert actual["mgrs_tiles"]["19HBU"] == handler({"MGRS": "19HBU"}, {})
+    assert actual["mgrs_tiles"]["00AAA"]["pathrows"] == []
+
+
+def test_handler_batch_path_filter():
+    event = {"mgrs_tiles": ["19HBU"], "path": "232"}
+    actual = handler(event, {})
+    assert actual["pathrows"] == {}
+    assert actual["mgrs_tiles"]["19HBU"]["pathrows"] == ["232086"]
+
+
+def test_handler_missing_arguments():
+    with pytest.raises(Exception):
+        handler({}, {})
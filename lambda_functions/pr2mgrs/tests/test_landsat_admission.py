@@ -0,0 +1,57 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from lambda_functions.pr2mgrs.hls_pr2mgrs.landsat_admission import handler
+
+scene = {
+    "path": "127",
+    "row": "010",
+    "scene": "LC08_L1GT_127010_20200527_20200527_01_RT",
+    "date": "2020-05-27",
+}
+
+
+@patch.dict(os.environ, {"LAADS_BUCKET": "laads"})
+@patch("hls_lambda_layer.laads.s3_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_handler(client, s3_client):
+    client.begin_transaction.return_value = {"transactionId": "t1"}
+    s3_client.list_objects_v2.return_value = {"Contents": ["a key"]}
+    output = handler(dict(scene), {})
+
+    assert output["mgrsvalues"]["count"] == 14
+    assert output["taskresult"]["available"]
+    assert output["taskresult"]["doy"] == "2020148"
+    assert client.execute_statement.call_count == 2
+    for args, kwargs in client.execute_statement.call_args_list:
+        assert kwargs["transactionId"] == "t1"
+    ac_log, mgrs_log = client.execute_statement.call_args_list
+    assert ac_log[1]["sql"].startswith("INSERT INTO landsat_ac_log")
+    assert mgrs_log[1]["sql"].startswith("INSERT INTO landsat_mgrs_log")
+    client.commit_transaction.assert_called_once()
+    client.rollback_transaction.assert_not_called()
+
+
+@patch.dict(os.environ, {"LAADS_BUCKET": "laads"})
+@patch("hls_lambda_layer.laads.s3_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_handler_rolls_back(client, s3_client):
+    client.begin_transaction.return_value = {"transactionId": "t1"}
+    client.execute_statement.side_effect = [{}, ValueError("failed")]
+    with pytest.raises(ValueError):
+        handler(dict(scene), {})
+    client.rollback_transaction.assert_called_once()
+    client.commit_transaction.assert_not_called()
+    s3_client.list_objects_v2.assert_not_called()
+
+
+@patch("hls_lambda_layer.laads.s3_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_handler_no_mgrs(client, s3_client):
+    output = handler({**scene, "path": "999", "row": "999"}, {})
+    assert output["mgrsvalues"] == {"mgrs": [], "count": 0}
+    assert "taskresult" not in output
+    client.begin_transaction.assert_not_called()
+    s3_client.list_objects_v2.assert_not_called()
@@ -3,41 +3,25 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict
 
 import boto3
+from hls_lambda_layer.hls_db import execute_statement, string_parameter
 
-db_credentials_secrets_store_arn = os.getenv("HLS_SECRETS")
-database_name = os.getenv("HLS_DB_NAME")
-db_cluster_arn = os.getenv("HLS_DB_ARN")
-
-rds_client = boto3.client("rds-data")
 cw_client = boto3.client("cloudwatch")
 
 
-def execute_statement(sql, sql_parameters=[]):
-    response = rds_client.execute_statement(
-        secretArn=db_credentials_secrets_store_arn,
-        database=database_name,
-        resourceArn=db_cluster_arn,
-        sql=sql,
-        parameters=sql_parameters,
-    )
-    return response
-
-
 def handler(event: Dict, context: Dict):
     job_id = os.getenv("JOB_ID")
     table_name = os.getenv("TABLE_NAME")
     metric_namespace = "hls"
     from_statement = f" FROM {table_name} WHERE"
     query = (
-        "SELECT COALESCE(jobinfo->'Container'->>'ExitCode', 'null_value')"
-        + "as exit_code, count(*)"
+        "SELECT COALESCE(exit_code::text, 'null_value') as exit_code, count(*)"
         + from_statement
-        + " job_stopped > to_timestamp(:from_ts, 'yyyy-mm-dd hh24:mi:ss')"
-        + " group by COALESCE(jobinfo->'Container'->>'ExitCode', 'null_value');"
+        + " stopped_at > to_timestamp(:from_ts, 'yyyy-mm-dd hh24:mi:ss')"
+        + " group by COALESCE(exit_code::text, 'null_value');"
     )
 
     from_ts = str(datetime.now(timezone.utc) - timedelta(hours=1))
-    sql_parameters = [{"name": "from_ts", "value": {"stringValue": from_ts}}]
+    sql_parameters = [string_parameter("from_ts", from_ts)]
     query_response = execute_statement(query, sql_parameters=sql_parameters)
 
     updated_metrics = [
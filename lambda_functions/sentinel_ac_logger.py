@@ -3,24 +3,23 @@ import json
 import os
 from operator import itemgetter
 
-import boto3
-from hls_lambda_layer.hls_batch_utils import parse_jobinfo
-
-db_credentials_secrets_store_arn = os.getenv("HLS_SECRETS")
-database_name = os.getenv("HLS_DB_NAME")
-db_cluster_arn = os.getenv("HLS_DB_ARN")
-rds_client = boto3.client("rds-data")
-
-
-def execute_statement(sql, sql_parameters=[]):
-    response = rds_client.execute_statement(
-        secretArn=db_credentials_secrets_store_arn,
-        database=database_name,
-        resourceArn=db_cluster_arn,
-        sql=sql,
-        parameters=sql_parameters,
-    )
-    return response
+from hls_lambda_layer.hls_batch_utils import (
+    JOB_COLUMN_VALUES,
+    JOB_COLUMNS,
+    NEXT_RETRY_AT,
+    archive_jobinfo,
+    job_column_parameters,
+    parse_jobinfo,
+    retry_backoff_parameters,
+)
+from hls_lambda_layer.hls_db import boolean_parameter, long_parameter, string_parameter
+from hls_lambda_layer.hls_failures import (
+    AC_EXPECTED_EXIT_CODES,
+    RETRIED,
+    SUCCESS,
+    classify,
+)
+from hls_lambda_layer.hls_status_queue import write_statement
 
 
 def handler(event, context):
@@ -40,48 +39,39 @@ def handler(event, context):
     )(parsed_info)
     print(f"Exit Code is {exitcode}")
 
-    succeeded = False
-    expected_error = False
-    unexpected_error = True
-
-    if exitcode == 0:
-        succeeded = True
-        unexpected_error = False
-    elif exitcode in [137, 3, 4]:
-        succeeded = False
-        expected_error = True
-        unexpected_error = False
-    else:
-        succeeded = False
-        expected_error = False
-        unexpected_error = True
+    failure_class = classify(parsed_info, AC_EXPECTED_EXIT_CODES)
+    succeeded = failure_class == SUCCESS
+    unexpected_error = failure_class in RETRIED["sentinel_log"]
+    expected_error = not succeeded and not unexpected_error
 
     if "id" in event:
         selector_string = " WHERE id = :selector"
         selector_value = event["id"]
-        selector_parameter = {
-            "name": "selector",
-            "value": {"longValue": selector_value},
-        }
+        selector_parameter = long_parameter("selector", selector_value)
     else:
         selector_string = " WHERE granule = :selector::text"
         selector_value = event["granule"]
-        selector_parameter = {
-            "name": "selector",
-            "value": {"stringValue": selector_value},
-        }
+        selector_parameter = string_parameter("selector", selector_value)
     q = (
         "UPDATE sentinel_log SET"
-        + " (jobinfo, run_count, succeeded, expected_error, unexpected_error) ="
-        + " (:jobinfo::jsonb, run_count + 1, :succeeded::boolean, :expected_error::boolean, :unexpected_error::boolean)"
+        + " (jobinfo, run_count, succeeded, expected_error, unexpected_error,"
+        + f" {JOB_COLUMNS}) ="
+        + " (:jobinfo::jsonb, run_count + 1, :succeeded::boolean, :expected_error::boolean, :unexpected_error::boolean,"
+        + f" {JOB_COLUMN_VALUES}), failure_class = :failure_class::text,"
+        + " claimed_until = NULL,"
+        + f" next_retry_at = {NEXT_RETRY_AT}"
         + selector_string
     )
     sql_parameters = [
-        {"name": "jobinfo", "value": {"stringValue": jobinfostring}},
-        {"name": "succeeded", "value": {"booleanValue": succeeded}},
-        {"name": "expected_error", "value": {"booleanValue": expected_error}},
-        {"name": "unexpected_error", "value": {"booleanValue": unexpected_error}},
+        string_parameter("jobinfo", jobinfostring),
+        boolean_parameter("succeeded", succeeded),
+        boolean_parameter("expected_error", expected_error),
+        boolean_parameter("unexpected_error", unexpected_error),
+        string_parameter("failure_class", failure_class),
     ]
+    sql_parameters.extend(job_column_parameters(parsed_info))
+    sql_parameters.extend(retry_backoff_parameters(failure_class))
     sql_parameters.append(selector_parameter)
-    execute_statement(q, sql_parameters=sql_parameters)
+    archive_jobinfo(parsed_info)
+    write_statement(q, sql_parameters=sql_parameters)
     return exitcode
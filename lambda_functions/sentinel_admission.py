@@ -0,0 +1,44 @@
+"""
+HLS: Sentinel granule admission.
+
+Find the granule's twins in the input bucket, log the granule and check
+LAADS auxiliary data availability in a single invocation.
+"""
+
+import os
+from typing import Dict
+
+import boto3
+from hls_lambda_layer.hls_db import execute_statement, historic_value
+from hls_lambda_layer.hls_granule_log import sentinel_granule_insert
+from hls_lambda_layer.laads import laads_available
+
+s3 = boto3.client("s3")
+
+
+def twin_granules(bucket: str, granule: str) -> str:
+    """Comma separated granules sharing the granule's id up to the timestamp."""
+    prefix = granule[0:-6]
+    response = s3.list_objects_v2(
+        Bucket=bucket,
+        Prefix=prefix,
+    )
+    granules = [obj["Key"][0:-4] for obj in response["Contents"]]
+    return ",".join(granules)
+
+
+def handler(event: Dict, context: Dict):
+    """
+    AWS Lambda handler.
+
+    Parameters:
+    event (dict) Event source with the granule from the Sentinel input bucket
+
+    Returns:
+    output (dict) The twin granule list with its LAADS availability
+
+    """
+    granule = twin_granules(os.environ["SENTINEL_INPUT_BUCKET"], event["granule"])
+    sql, sql_parameters = sentinel_granule_insert(granule, historic_value())
+    execute_statement(sql, sql_parameters)
+    return laads_available(granule, os.environ["LAADS_BUCKET"])
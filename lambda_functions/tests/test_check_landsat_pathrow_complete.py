@@ -17,7 +17,7 @@ event = {
 }
 
 
-@patch("lambda_functions.check_landsat_pathrow_complete.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_convert(client):
     return_value = {
         "records": [
@@ -35,7 +35,7 @@ def test_handler_convert(client):
     assert actual == "090089"
 
 
-@patch("lambda_functions.check_landsat_pathrow_complete.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_none(client):
     return_value = {"records": []}
     client.execute_statement.return_value = return_value
@@ -0,0 +1,23 @@
+import os
+from unittest.mock import patch
+
+from lambda_functions.create_log_partitions import handler
+
+
+@patch("hls_lambda_layer.hls_db.rds_client")
+@patch.dict(os.environ, {"MONTHS_AHEAD": "6"})
+def test_handler(client):
+    client.execute_statement.return_value = {"records": [[{"longValue": 12}]]}
+    assert handler({}, {}) == 12
+    args, kwargs = client.execute_statement.call_args
+    assert {"name": "months_ahead", "value": {"longValue": 6}} in kwargs["parameters"]
+
+
+def test_handler_creates_future_months(postgres_driver):
+    from lambda_functions.setupdb import handler as setupdb
+
+    setupdb({}, {})
+    with patch.dict(os.environ, {"MONTHS_AHEAD": "5"}):
+        # Two more months for each branch of the three tables.
+        assert handler({}, {}) == 12
+        assert handler({}, {}) == 0
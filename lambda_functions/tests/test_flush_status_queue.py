@@ -0,0 +1,14 @@
+import json
+from unittest.mock import patch
+
+from lambda_functions.flush_status_queue import handler
+
+
+@patch("lambda_functions.flush_status_queue.flush_records")
+def test_handler(flush_records):
+    flush_records.return_value = ["b"]
+    body = json.dumps({"sql": "SELECT 1", "parameters": []})
+    event = {
+        "Records": [{"messageId": "a", "body": body}, {"messageId": "b", "body": body}]
+    }
+    assert handler(event, {}) == {"batchItemFailures": [{"itemIdentifier": "b"}]}
@@ -28,7 +28,7 @@ def test_handler_keyError():
 
 
 @patch.dict(os.environ, {"LAADS_BUCKET": "test"})
-@patch("lambda_functions.laads_available.s3")
+@patch("hls_lambda_layer.laads.s3_client")
 def test_handler(s3):
     from lambda_functions.laads_available import handler
 
@@ -7,11 +7,12 @@ from hls_lambda_layer.batch_test_events import (
     batch_failed_event_string_cause,
     batch_succeeded_event,
 )
+from hls_lambda_layer.hls_batch_utils import compact_jobinfo
 
 from lambda_functions.landsat_ac_logger import handler
 
 
-@patch("lambda_functions.landsat_ac_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_keyError(client):
     """Test handler."""
     event = {
@@ -23,7 +24,10 @@ def test_handler_keyError(client):
         "jobinfo": batch_failed_event,
     }
     cause = json.loads(event["jobinfo"]["Cause"])
-    jobinfo = {"name": "jobinfo", "value": {"stringValue": json.dumps(cause)}}
+    jobinfo = {
+        "name": "jobinfo",
+        "value": {"stringValue": json.dumps(compact_jobinfo(cause))},
+    }
     client.execute_statement.return_value = {}
     output = handler(event, {})
     args, kwargs = client.execute_statement.call_args
@@ -36,7 +40,7 @@ def test_handler_keyError(client):
     assert output == 1
 
 
-@patch("lambda_functions.landsat_ac_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler(client):
     """Test handler."""
     event = {
@@ -51,7 +55,7 @@ def test_handler(client):
     args, kwargs = client.execute_statement.call_args
     jobinfo = {
         "name": "jobinfo",
-        "value": {"stringValue": json.dumps(event["jobinfo"])},
+        "value": {"stringValue": json.dumps(compact_jobinfo(event["jobinfo"]))},
     }
 
     scene = {
@@ -63,7 +67,7 @@ def test_handler(client):
     assert output == 0
 
 
-@patch("lambda_functions.landsat_ac_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_no_jobid(client):
     """Test handler."""
     event = {
@@ -1,51 +1,86 @@
-import json
+import os
 from unittest.mock import patch
 
 import pytest
 
-from lambda_functions.landsat_pathrow_status import handler
+from lambda_functions.landsat_pathrow_status import handler, succeeded_coverage
 
+event = {
+    "date": "2020-05-28",
+    "path": "182",
+    "MGRS": "36VVK",
+    "mgrs_metadata": {
+        "pathrows": ["182019", "182020"],
+        "pathrows_coverage": [98.0, 2.0],
+    },
+}
 
-@patch("lambda_functions.landsat_pathrow_status.rds_client")
+
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_ready(client):
     """Test handler."""
-    event = {
-        "date": "2020-05-28",
-        "path": "182",
-        "MGRS": "36VVK",
-        "mgrs_metadata": {
-            "pathrows": ["182019", "182020"],
-        },
-    }
     return_value = {
         "records": [
-            {"row": "019"},
-            {"row": "020"},
+            [{"stringValue": "019"}],
+            [{"stringValue": "020"}],
         ]
     }
     client.execute_statement.return_value = return_value
     actual = handler(event, {})
     args, kwargs = client.execute_statement.call_args
-    assert actual
+    assert actual == {"ready_for_tiling": True, "pathrows_string": "182019,182020"}
+    assert "row IN ('019','020')" in kwargs["sql"]
+    assert client.execute_statement.call_count == 1
 
 
-@patch("lambda_functions.landsat_pathrow_status.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_not_ready(client):
     """Test handler."""
-    event = {
-        "date": "2020-05-28",
-        "path": "182",
-        "MGRS": "36VVK",
-        "mgrs_metadata": {
-            "pathrows": ["182019", "182020"],
-        },
-    }
     return_value = {
         "records": [
-            {"row": "019"},
+            [{"stringValue": "019"}],
         ]
     }
     client.execute_statement.return_value = return_value
     actual = handler(event, {})
+    assert not actual["ready_for_tiling"]
+    # The tile's claim is released so the next incompletes run rechecks it.
     args, kwargs = client.execute_statement.call_args
-    assert not actual
+    assert kwargs["sql"].startswith("UPDATE landsat_mgrs_log SET claimed_until = NULL")
+    assert {"name": "mgrs", "value": {"stringValue": "36VVK"}} in kwargs["parameters"]
+
+
+@patch.dict(os.environ, {"COVERAGE_THRESHOLD": "95"})
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_handler_ready_over_threshold(client):
+    """Test handler."""
+    return_value = {
+        "records": [
+            [{"stringValue": "019"}],
+        ]
+    }
+    client.execute_statement.return_value = return_value
+    actual = handler(event, {})
+    assert actual == {"ready_for_tiling": True, "pathrows_string": "182019"}
+
+
+@patch.dict(os.environ, {"COVERAGE_THRESHOLD": "95"})
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_handler_no_coverage_metadata(client):
+    """Test handler."""
+    legacy_event = {**event, "mgrs_metadata": {"pathrows": ["182019", "182020"]}}
+    return_value = {
+        "records": [
+            [{"stringValue": "019"}],
+        ]
+    }
+    client.execute_statement.return_value = return_value
+    actual = handler(legacy_event, {})
+    assert not actual["ready_for_tiling"]
+
+
+def test_succeeded_coverage_repeated_pathrow():
+    pathrows = ["067093", "067093", "068093"]
+    coverages = [97.1, 11.2, 100.0]
+    assert succeeded_coverage(pathrows, coverages, {"093"}) == 100.0
+    assert succeeded_coverage(pathrows, coverages, set()) == 0.0
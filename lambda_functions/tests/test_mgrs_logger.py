@@ -8,11 +8,12 @@ from hls_lambda_layer.batch_test_events import (
     batch_failed_event_string_cause,
     batch_succeeded_event,
 )
+from hls_lambda_layer.hls_batch_utils import compact_jobinfo
 
 from lambda_functions.mgrs_logger import handler
 
 
-@patch("lambda_functions.mgrs_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler(client):
     """Test handler."""
     event = {
@@ -29,16 +30,21 @@ def test_handler(client):
     mgrs = {"name": "mgrs", "value": {"stringValue": "29VMJ"}}
     jobinfo = {
         "name": "jobinfo",
-        "value": {"stringValue": json.dumps(event["tilejobinfo"])},
+        "value": {"stringValue": json.dumps(compact_jobinfo(event["tilejobinfo"]))},
     }
     assert path in kwargs["parameters"]
     assert mgrs in kwargs["parameters"]
     assert acquisition in kwargs["parameters"]
     assert jobinfo in kwargs["parameters"]
+    assert {"name": "exit_code", "value": {"longValue": 0}} in kwargs["parameters"]
+    assert {
+        "name": "job_status",
+        "value": {"stringValue": "SUCCEEDED"},
+    } in kwargs["parameters"]
     assert expected == 0
 
 
-@patch("lambda_functions.mgrs_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_error(client):
     """Test handler."""
     event = {
@@ -51,12 +57,20 @@ def test_handler_error(client):
     expected = handler(event, {})
     args, kwargs = client.execute_statement.call_args
     cause = json.loads(event["tilejobinfo"]["Cause"])
-    jobinfo = {"name": "jobinfo", "value": {"stringValue": json.dumps(cause)}}
+    jobinfo = {
+        "name": "jobinfo",
+        "value": {"stringValue": json.dumps(compact_jobinfo(cause))},
+    }
     assert jobinfo in kwargs["parameters"]
     assert expected == 1
+    failure_class = {"name": "failure_class", "value": {"stringValue": "input_error"}}
+    assert failure_class in kwargs["parameters"]
+    retry_backoff = {"name": "retry_backoff", "value": {"longValue": 3600}}
+    assert retry_backoff in kwargs["parameters"]
+    assert "next_retry_at" in kwargs["sql"]
 
 
-@patch("lambda_functions.mgrs_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_error_no_exit_code(client):
     """Test handler."""
     event = {
@@ -69,12 +83,18 @@ def test_handler_error_no_exit_code(client):
     expected = handler(event, {})
     args, kwargs = client.execute_statement.call_args
     cause = json.loads(event["tilejobinfo"]["Cause"])
-    jobinfo = {"name": "jobinfo", "value": {"stringValue": json.dumps(cause)}}
+    jobinfo = {
+        "name": "jobinfo",
+        "value": {"stringValue": json.dumps(compact_jobinfo(cause))},
+    }
     assert jobinfo in kwargs["parameters"]
+    assert {"name": "exit_code", "value": {"isNull": True}} in kwargs["parameters"]
     assert expected == "nocode"
+    retry_backoff = {"name": "retry_backoff", "value": {"longValue": 300}}
+    assert retry_backoff in kwargs["parameters"]
 
 
-@patch("lambda_functions.mgrs_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_error_non_json(client):
     """Test handler."""
     event = {
@@ -93,7 +113,7 @@ def test_handler_error_non_json(client):
     assert expected == "nocode"
 
 
-@patch("lambda_functions.mgrs_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_error_no_tilejobinfo(client):
     """Test handler."""
     event = {
@@ -105,5 +125,12 @@ def test_handler_error_no_tilejobinfo(client):
     expected = handler(event, {})
     args, kwargs = client.execute_statement.call_args
 
-    assert len(kwargs["parameters"]) == 3
+    assert len(kwargs["parameters"]) == 6
+    failure_class = {
+        "name": "failure_class",
+        "value": {"stringValue": "transient_infra"},
+    }
+    assert failure_class in kwargs["parameters"]
+    retry_backoff = {"name": "retry_backoff", "value": {"longValue": 300}}
+    assert retry_backoff in kwargs["parameters"]
     assert expected == "nocode"
@@ -11,6 +11,7 @@ def test_convert_records():
     record = [
         {"longValue": 1},
         {"stringValue": "LC08_L1TP_111070_20210701_20210701_02_RT"},
+        {"longValue": 30000},
     ]
     converted = convert_records(record)
     assert (
@@ -18,31 +19,42 @@ def test_convert_records():
         == "collection02/level-1/standard/oli-tirs/2021/111/070/LC08_L1TP_111070_20210701_20210701_02_RT"
     )
     assert converted["id"] == 1
+    assert converted["memory"] == 30000
 
 
 @patch("lambda_functions.process_landsat_ac_errors.step_function_client")
-@patch("lambda_functions.process_landsat_ac_errors.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 @patch.dict(os.environ, {"RETRY_LIMIT": "3"})
+@patch.dict(os.environ, {"MAX_CONCURRENCY": "400"})
 def test_handler_chunking(rds_client, step_function_client):
     records = [
         [
             {"longValue": 1},
             {"stringValue": "LC08_L1TP_111070_20210701_20210701_02_RT"},
+            {"longValue": 20000},
+            # The priority key
+            {"stringValue": "2021-07-01"},
+            {"longValue": 0},
+            {"longValue": 1},
         ]
-        for i in range(350)
+        for i in range(2000)
     ]
     response = {"records": records}
-    rds_client.execute_statement.return_value = response
+    rds_client.execute_statement.side_effect = [response]
     handler({}, {})
-    assert step_function_client.start_execution.call_count == 4
-    args, kwargs = step_function_client.start_execution.call_args_list[3]
-    input = json.loads(kwargs["input"])
-    assert input["errors"][0] == {
+    inputs = [
+        json.loads(kwargs["input"])
+        for args, kwargs in step_function_client.start_execution.call_args_list
+    ]
+    # Limited by the 256 KB payload quota, below the MaxConcurrency of 400.
+    assert sorted(len(input["errors"]) for input in inputs) == [290] + [342] * 5
+    assert inputs[0]["errors"][0] == {
         "id": 1,
         "scene_id": "LC08_L1TP_111070_20210701_20210701_02_RT",
         "scheme": "s3",
         "bucket": "usgs-landsat",
         "prefix": "collection02/level-1/standard/oli-tirs/2021/111/070/LC08_L1TP_111070_20210701_20210701_02_RT",
+        "memory": 20000,
         "sensor": "C",
         "satellite": "08",
         "processingCorrectionLevel": "L1TP",
@@ -60,7 +72,7 @@ def test_handler_chunking(rds_client, step_function_client):
         "date": "2021-07-01",
     }
 
-    args, kwargs = rds_client.execute_statement.call_args
+    args, kwargs = rds_client.execute_statement.call_args_list[0]
     retry_limit = {"name": "retry_limit", "value": {"longValue": 3}}
     historic = {"name": "historic_value", "value": {"booleanValue": False}}
 
@@ -69,11 +81,12 @@ def test_handler_chunking(rds_client, step_function_client):
 
 
 @patch("lambda_functions.process_landsat_ac_errors.step_function_client")
-@patch("lambda_functions.process_landsat_ac_errors.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 @patch.dict(os.environ, {"RETRY_LIMIT": "3"})
 def test_not_historic(rds_client, step_function_client):
+    rds_client.execute_statement.return_value = {"records": []}
     handler({}, {})
-    args, kwargs = rds_client.execute_statement.call_args
+    args, kwargs = rds_client.execute_statement.call_args_list[0]
     historic = {"name": "historic_value", "value": {"booleanValue": False}}
     assert historic in kwargs["parameters"]
-    assert " AND jobinfo is NOT NULL" in kwargs["sql"]
+    assert " AND (historic OR jobinfo IS NOT NULL)" in kwargs["sql"]
@@ -10,25 +10,34 @@ event = {"time": "2021-01-30T12:00:00Z"}
 
 
 @patch("lambda_functions.process_landsat_mgrs_incompletes.step_function_client")
-@patch("lambda_functions.process_landsat_mgrs_incompletes.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 @patch.dict(os.environ, {"DAYS_PRIOR": "4"})
 @patch.dict(os.environ, {"RETRY_LIMIT": "3"})
 @patch.dict(os.environ, {"HISTORIC": "historic"})
+@patch.dict(os.environ, {"MAX_CONCURRENCY": "400"})
 def test_handler_chunking(rds_client, step_function_client):
     records = [
         [
             {"stringValue": "15UUT"},
             {"stringValue": "030"},
             {"stringValue": "2021-01-26"},
+            # The priority key
+            {"stringValue": "2021-01-26"},
+            {"longValue": 0},
+            {"longValue": 1},
         ]
-        for i in range(350)
+        for i in range(1200)
     ]
     response = {"records": records}
-    rds_client.execute_statement.return_value = response
+    rds_client.execute_statement.side_effect = [response]
     handler(event, {})
-    assert step_function_client.start_execution.call_count == 4
-    args, kwargs = step_function_client.start_execution.call_args_list[3]
-    input = json.loads(kwargs["input"])
+    inputs = [
+        json.loads(kwargs["input"])
+        for args, kwargs in step_function_client.start_execution.call_args_list
+    ]
+    # Limited by the Map state's MaxConcurrency of 400.
+    assert sorted(len(input["incompletes"]) for input in inputs) == [400] * 3
+    input = inputs[0]
     assert input["incompletes"][0] == {
         "MGRS": "15UUT",
         "path": "030",
@@ -36,7 +45,7 @@ def test_handler_chunking(rds_client, step_function_client):
     }
     assert input["fromdate"] == "26/01/2021"
 
-    args, kwargs = rds_client.execute_statement.call_args
+    args, kwargs = rds_client.execute_statement.call_args_list[0]
     delta = {"name": "delta", "value": {"stringValue": "26/01/2021"}}
     retry_limit = {"name": "retry_limit", "value": {"longValue": 3}}
     historic_value = {"name": "historic_value", "value": {"booleanValue": True}}
@@ -44,10 +53,12 @@ def test_handler_chunking(rds_client, step_function_client):
     assert retry_limit in kwargs["parameters"]
     assert historic_value in kwargs["parameters"]
     assert "TO_DATE" in kwargs["sql"]
+    assert "ORDER BY acquisition, run_count, id" in kwargs["sql"]
+    assert "FOR UPDATE SKIP LOCKED" in kwargs["sql"]
 
 
 @patch("lambda_functions.process_landsat_mgrs_incompletes.step_function_client")
-@patch("lambda_functions.process_landsat_mgrs_incompletes.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 @patch.dict(os.environ, {"HOURS_PRIOR": "6"})
 @patch.dict(os.environ, {"RETRY_LIMIT": "3"})
 @patch.dict(os.environ, {"HISTORIC": "historic"})
@@ -57,14 +68,18 @@ def test_handler_hours(rds_client, step_function_client):
             {"stringValue": "15UUT"},
             {"stringValue": "030"},
             {"stringValue": "2021-01-26"},
+            # The priority key
+            {"stringValue": "2021-01-26"},
+            {"longValue": 0},
+            {"longValue": 1},
         ]
         for i in range(1)
     ]
     response = {"records": records}
-    rds_client.execute_statement.return_value = response
+    rds_client.execute_statement.side_effect = [response]
     handler(event, {})
 
-    args, kwargs = rds_client.execute_statement.call_args
+    args, kwargs = rds_client.execute_statement.call_args_list[0]
     delta = {"name": "delta", "value": {"stringValue": "30-01-2021 06:00:00"}}
     assert delta in kwargs["parameters"]
     assert "TO_TIMESTAMP" in kwargs["sql"]
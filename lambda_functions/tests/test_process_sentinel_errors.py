@@ -8,25 +8,36 @@ from lambda_functions.process_sentinel_errors import handler
 
 
 @patch("lambda_functions.process_sentinel_errors.step_function_client")
-@patch("lambda_functions.process_sentinel_errors.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 @patch.dict(os.environ, {"RETRY_LIMIT": "1"})
+@patch.dict(os.environ, {"MAX_CONCURRENCY": "400"})
 def test_handler_chunking(rds_client, step_function_client):
-    records = [[{"longValue": 1}, {"stringValue": "granule"}] for i in range(350)]
+    key = [{"stringValue": "2021-01-26"}, {"longValue": 0}, {"longValue": 1}]
+    row = [{"longValue": 1}, {"stringValue": "granule"}, {"longValue": 20000}]
+    records = [row + key for i in range(700)]
     response = {"records": records}
-    rds_client.execute_statement.return_value = response
+    rds_client.execute_statement.side_effect = [response]
     handler({}, {})
-    assert step_function_client.start_execution.call_count == 4
-    args, kwargs = step_function_client.start_execution.call_args_list[3]
-    input = json.loads(kwargs["input"])
-    assert input["errors"][0] == {"id": 1, "granule": "granule"}
+    inputs = [
+        json.loads(kwargs["input"])
+        for args, kwargs in step_function_client.start_execution.call_args_list
+    ]
+    # Limited by the Map state's MaxConcurrency of 400.
+    assert sorted(len(input["errors"]) for input in inputs) == [300, 400]
+    assert inputs[0]["errors"][0] == {
+        "id": 1,
+        "granule": "granule",
+        "memory": 20000,
+    }
 
 
 @patch("lambda_functions.process_sentinel_errors.step_function_client")
-@patch("lambda_functions.process_sentinel_errors.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 @patch.dict(os.environ, {"HISTORIC": "historic"})
 @patch.dict(os.environ, {"RETRY_LIMIT": "1"})
 def test_historic_environment(rds_client, step_function_client):
     historic_parameter = {"name": "historic_value", "value": {"booleanValue": True}}
+    rds_client.execute_statement.return_value = {"records": []}
     handler({}, {})
-    args, kwargs = rds_client.execute_statement.call_args
+    args, kwargs = rds_client.execute_statement.call_args_list[0]
     assert historic_parameter in kwargs["parameters"]
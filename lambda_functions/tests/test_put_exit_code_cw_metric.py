@@ -8,7 +8,7 @@ from lambda_functions.put_exit_code_cw_metric import handler
 
 
 @patch("lambda_functions.put_exit_code_cw_metric.cw_client")
-@patch("lambda_functions.put_exit_code_cw_metric.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 @patch.dict(os.environ, {"JOB_ID": "id", "TABLE_NAME": "landsat_ac_granule_log"})
 def test_handler(rds_client, cw_client):
     records = [
@@ -45,7 +45,7 @@ def test_handler(rds_client, cw_client):
 
 
 @patch("lambda_functions.put_exit_code_cw_metric.cw_client")
-@patch("lambda_functions.put_exit_code_cw_metric.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 @patch.dict(os.environ, {"JOB_ID": "id", "TABLE_NAME": "landsat_ac_granule_log"})
 def test_handler_not_updated(rds_client, cw_client):
     records = [
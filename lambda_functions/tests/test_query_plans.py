@@ -0,0 +1,220 @@
+"""
+Check the scheduled and per execution queries use the setupdb indexes.
+
+The tables are loaded with synthetic rows in production proportions, mostly
+finished jobs with a small share of failures, and each handler's query is
+captured and run through EXPLAIN.  HLS_TEST_PLAN_ROWS sets the rows per table.
+"""
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from hls_lambda_layer import hls_db
+from hls_lambda_layer.hls_db import string_parameter
+
+from lambda_functions import (
+    check_landsat_pathrow_complete,
+    landsat_pathrow_status,
+    process_landsat_ac_errors,
+    process_landsat_mgrs_incompletes,
+    process_sentinel_errors,
+    put_exit_code_cw_metric,
+    setupdb,
+)
+
+ROWS = int(os.getenv("HLS_TEST_PLAN_ROWS", "2000000"))
+
+# One row in 200 is an unfinished job and one in 10 is historic.  Acquisitions
+# are spread over the 13 years the partitions cover.
+load = """
+INSERT INTO sentinel_log
+    (granule, acquisition, run_count, historic, succeeded, expected_error,
+    unexpected_error, exit_code, failure_class, job_status, stopped_at)
+SELECT
+    'S2A_MSIL1C_' || i, date '2015-07-01' + i % 4000, i % 3, i % 10 = 0,
+    i % 200 <> 0, false, i % 200 = 0,
+    CASE WHEN i % 200 = 0 THEN 1 ELSE 0 END,
+    CASE WHEN i % 200 = 0 THEN 'input_error' ELSE 'success' END,
+    CASE WHEN i % 200 = 0 THEN 'FAILED' ELSE 'SUCCEEDED' END,
+    now() - (i % 8760) * interval '1 hour'
+FROM generate_series(1, {rows}) AS i;
+
+INSERT INTO landsat_ac_log
+    (path, row, acquisition, scene_id, jobinfo, run_count, historic,
+    exit_code, failure_class, job_status, stopped_at)
+SELECT
+    lpad((i % 233)::text, 3, '0'), lpad((i / (233 * 4700) % 248)::text, 3, '0'),
+    date '2013-04-01' + i % 4700, 'LC08_' || i, '{{}}', i % 3, i % 10 = 0,
+    CASE WHEN i % 200 = 0 THEN 1 ELSE 0 END,
+    CASE WHEN i % 200 = 0 THEN 'input_error' ELSE 'success' END,
+    CASE WHEN i % 200 = 0 THEN 'FAILED' ELSE 'SUCCEEDED' END,
+    now() - (i % 8760) * interval '1 hour'
+FROM generate_series(1, {rows}) AS i;
+
+INSERT INTO landsat_mgrs_log
+    (ts, path, mgrs, acquisition, run_count, historic, exit_code, failure_class,
+    job_status, stopped_at)
+SELECT
+    now() - (i % 8760) * interval '1 hour', lpad((i % 233)::text, 3, '0'),
+    lpad((i / (233 * 4700))::text, 5, '0'), date '2013-04-01' + i % 4700,
+    i % 3, i % 10 = 0,
+    CASE WHEN i % 200 = 0 THEN 1 ELSE 0 END,
+    CASE WHEN i % 200 = 0 THEN 'input_error' ELSE 'success' END,
+    CASE WHEN i % 200 = 0 THEN 'FAILED' ELSE 'SUCCEEDED' END,
+    now() - (i % 8760) * interval '1 hour'
+FROM generate_series(1, {rows}) AS i;
+
+ANALYZE sentinel_log;
+ANALYZE landsat_ac_log;
+ANALYZE landsat_mgrs_log;
+"""
+
+
+@pytest.fixture(scope="module")
+def loaded(module_postgres_driver):
+    setupdb.handler({}, {})
+    module_postgres_driver.execute_statement(load.format(rows=ROWS), [])
+    return module_postgres_driver
+
+
+def captured_query(module, event, records=[], call=-1):
+    """Run a handler and return the sql and parameters of its query."""
+    with patch.object(hls_db, "driver") as driver:
+        driver.execute_statement.return_value = {"records": records}
+        module.handler(event, {})
+    args, kwargs = driver.execute_statement.call_args_list[call]
+    return args[0], args[1]
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(driver, sql, sql_parameters):
+    response = driver.execute_statement(
+        "EXPLAIN (FORMAT JSON) " + sql.rstrip(";"), sql_parameters
+    )
+    plan = json.loads(response["records"][0][0]["stringValue"])[0]["Plan"]
+    return list(plan_nodes(plan))
+
+
+def cte(nodes, name):
+    """The plan nodes of the named CTE."""
+    (node,) = [node for node in nodes if node.get("Subplan Name") == f"CTE {name}"]
+    return list(plan_nodes(node))
+
+
+def assert_uses_index(driver, nodes, index_name):
+    """Assert the plan reads large tables through index_name's partitions."""
+    tree = driver.execute_statement(
+        "SELECT relid::text FROM pg_partition_tree(:index::regclass)",
+        [string_parameter("index", index_name)],
+    )
+    indexes = {record[0]["stringValue"] for record in tree["records"]}
+    used = {node["Index Name"] for node in nodes if "Index Name" in node}
+    assert used and used <= indexes
+    assert_no_large_seq_scans(driver, nodes)
+
+
+def assert_claims_by_key(driver, nodes):
+    """Assert a claim_page query updates its page through the primary keys."""
+    page = cte(nodes, "page")
+    claim = [node for node in nodes if node not in page]
+    used = {node["Index Name"] for node in claim if "Index Name" in node}
+    assert all(name.endswith("_pkey") for name in used)
+    assert_no_large_seq_scans(driver, claim)
+
+
+def assert_no_large_seq_scans(driver, nodes):
+    # Small partitions, such as future months, are cheapest to scan directly.
+    large = driver.execute_statement(
+        "SELECT relname::text FROM pg_class WHERE reltuples > 10000"
+        + " AND relnamespace = current_schema()::regnamespace",
+        [],
+    )
+    large = {record[0]["stringValue"] for record in large["records"]}
+    seq_scanned = {
+        node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"
+    }
+    assert not seq_scanned & large
+
+
+def scanned(nodes):
+    return {node["Relation Name"] for node in nodes if "Relation Name" in node}
+
+
+@pytest.mark.parametrize("historic", ["", "historic"])
+@patch.dict(os.environ, {"RETRY_LIMIT": "3"})
+def test_process_sentinel_errors(loaded, historic):
+    with patch.dict(os.environ, {"HISTORIC": historic}):
+        sql, sql_parameters = captured_query(process_sentinel_errors, {})
+    nodes = explain(loaded, sql, sql_parameters)
+    page = cte(nodes, "page")
+    assert_uses_index(loaded, page, "sentinel_log_retry_idx")
+    branch = "historic" if historic else "forward"
+    assert all(name.startswith(f"sentinel_log_{branch}") for name in scanned(page))
+    assert_claims_by_key(loaded, nodes)
+
+
+@pytest.mark.parametrize("historic", ["", "historic"])
+@patch.dict(os.environ, {"RETRY_LIMIT": "3"})
+def test_process_landsat_ac_errors(loaded, historic):
+    with patch.dict(os.environ, {"HISTORIC": historic}):
+        sql, sql_parameters = captured_query(process_landsat_ac_errors, {})
+    nodes = explain(loaded, sql, sql_parameters)
+    page = cte(nodes, "page")
+    assert_uses_index(loaded, page, "landsat_ac_log_retry_idx")
+    branch = "historic" if historic else "forward"
+    assert all(name.startswith(f"landsat_ac_log_{branch}") for name in scanned(page))
+    assert_claims_by_key(loaded, nodes)
+
+
+@pytest.mark.parametrize(
+    "prior", [{"DAYS_PRIOR": "4", "HOURS_PRIOR": ""}, {"HOURS_PRIOR": "6"}]
+)
+@patch.dict(os.environ, {"RETRY_LIMIT": "3"})
+def test_process_landsat_mgrs_incompletes(loaded, prior):
+    event = {"time": "2021-01-30T12:00:00Z"}
+    with patch.dict(os.environ, prior):
+        sql, sql_parameters = captured_query(process_landsat_mgrs_incompletes, event)
+    nodes = explain(loaded, sql, sql_parameters)
+    page = cte(nodes, "page")
+    assert_uses_index(loaded, page, "landsat_mgrs_log_incomplete_idx")
+    assert all(name.startswith("landsat_mgrs_log_forward") for name in scanned(page))
+    assert_claims_by_key(loaded, nodes)
+    scans = [node for node in page if "Index Cond" in node]
+    assert scans and all("ts <" in scan["Index Cond"] for scan in scans)
+
+
+@pytest.mark.parametrize(
+    "module", [landsat_pathrow_status, check_landsat_pathrow_complete]
+)
+def test_pathrow_status(loaded, module):
+    event = {
+        "date": "2013-04-01",
+        "path": "001",
+        "MGRS": "36VVK",
+        "mgrs_metadata": {"pathrows": ["001000", "001001"]},
+    }
+    sql, sql_parameters = captured_query(module, event, call=0)
+    nodes = explain(loaded, sql, sql_parameters)
+    assert_uses_index(loaded, nodes, "landsat_ac_log_succeeded_idx")
+    assert scanned(nodes) == {
+        "landsat_ac_log_forward_2013",
+        "landsat_ac_log_historic_2013",
+    }
+
+
+@pytest.mark.parametrize("table_name", ["sentinel_log", "landsat_ac_log"])
+def test_put_exit_code_cw_metric(loaded, table_name):
+    environment = {"JOB_ID": "id", "TABLE_NAME": table_name}
+    with patch.dict(os.environ, environment), patch.object(
+        put_exit_code_cw_metric, "cw_client"
+    ):
+        sql, sql_parameters = captured_query(put_exit_code_cw_metric, {})
+    nodes = explain(loaded, sql, sql_parameters)
+    assert_uses_index(loaded, nodes, f"{table_name}_stopped_at_idx")
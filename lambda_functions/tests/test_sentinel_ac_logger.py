@@ -8,11 +8,12 @@ from hls_lambda_layer.batch_test_events import (
     batch_failed_event_string_cause,
     batch_succeeded_event,
 )
+from hls_lambda_layer.hls_batch_utils import compact_jobinfo
 
 from lambda_functions.sentinel_ac_logger import handler
 
 
-@patch("lambda_functions.sentinel_ac_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_keyError(client):
     """Test handler."""
     event = {
@@ -20,7 +21,10 @@ def test_handler_keyError(client):
         "jobinfo": batch_failed_event,
     }
     cause = json.loads(event["jobinfo"]["Cause"])
-    jobinfo = {"name": "jobinfo", "value": {"stringValue": json.dumps(cause)}}
+    jobinfo = {
+        "name": "jobinfo",
+        "value": {"stringValue": json.dumps(compact_jobinfo(cause))},
+    }
     selector = {"name": "selector", "value": {"stringValue": event["granule"]}}
     succeeded = {"name": "succeeded", "value": {"booleanValue": False}}
     expected_error = {"name": "expected_error", "value": {"booleanValue": False}}
@@ -36,7 +40,7 @@ def test_handler_keyError(client):
     assert output == 1
 
 
-@patch("lambda_functions.sentinel_ac_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_expected_keyError(client):
     """Test handler."""
     event = {
@@ -44,11 +48,15 @@ def test_handler_expected_keyError(client):
         "jobinfo": batch_expected_failed_event,
     }
     cause = json.loads(event["jobinfo"]["Cause"])
-    jobinfo = {"name": "jobinfo", "value": {"stringValue": json.dumps(cause)}}
+    jobinfo = {
+        "name": "jobinfo",
+        "value": {"stringValue": json.dumps(compact_jobinfo(cause))},
+    }
     selector = {"name": "selector", "value": {"stringValue": event["granule"]}}
     succeeded = {"name": "succeeded", "value": {"booleanValue": False}}
-    expected_error = {"name": "expected_error", "value": {"booleanValue": True}}
-    unexpected_error = {"name": "unexpected_error", "value": {"booleanValue": False}}
+    # Out of memory jobs are retried with more memory.
+    expected_error = {"name": "expected_error", "value": {"booleanValue": False}}
+    unexpected_error = {"name": "unexpected_error", "value": {"booleanValue": True}}
     client.execute_statement.return_value = {}
     output = handler(event, {})
     args, kwargs = client.execute_statement.call_args
@@ -57,10 +65,12 @@ def test_handler_expected_keyError(client):
     assert succeeded in kwargs["parameters"]
     assert expected_error in kwargs["parameters"]
     assert unexpected_error in kwargs["parameters"]
+    failure_class = {"name": "failure_class", "value": {"stringValue": "oom"}}
+    assert failure_class in kwargs["parameters"]
     assert output == 137
 
 
-@patch("lambda_functions.sentinel_ac_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler(client):
     """Test handler."""
     event = {
@@ -72,7 +82,7 @@ def test_handler(client):
     args, kwargs = client.execute_statement.call_args
     jobinfo = {
         "name": "jobinfo",
-        "value": {"stringValue": json.dumps(event["jobinfo"])},
+        "value": {"stringValue": json.dumps(compact_jobinfo(event["jobinfo"]))},
     }
     selector = {"name": "selector", "value": {"stringValue": event["granule"]}}
     succeeded = {"name": "succeeded", "value": {"booleanValue": True}}
@@ -84,10 +94,15 @@ def test_handler(client):
     assert unexpected_error in kwargs["parameters"]
     assert selector in kwargs["parameters"]
     assert output == 0
+    assert {
+        "name": "failure_class",
+        "value": {"stringValue": "success"},
+    } in kwargs["parameters"]
     assert "WHERE granule" in kwargs["sql"]
+    assert "claimed_until = NULL" in kwargs["sql"]
 
 
-@patch("lambda_functions.sentinel_ac_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_update_by_id(client):
     """Test handler."""
     event = {
@@ -99,7 +114,7 @@ def test_handler_update_by_id(client):
     args, kwargs = client.execute_statement.call_args
     jobinfo = {
         "name": "jobinfo",
-        "value": {"stringValue": json.dumps(event["jobinfo"])},
+        "value": {"stringValue": json.dumps(compact_jobinfo(event["jobinfo"]))},
     }
     selector = {"name": "selector", "value": {"longValue": event["id"]}}
     succeeded = {"name": "succeeded", "value": {"booleanValue": True}}
@@ -114,7 +129,7 @@ def test_handler_update_by_id(client):
     assert "WHERE id" in kwargs["sql"]
 
 
-@patch("lambda_functions.sentinel_ac_logger.rds_client")
+@patch("hls_lambda_layer.hls_db.rds_client")
 def test_handler_valueError(client):
     """Test handler."""
     event = {
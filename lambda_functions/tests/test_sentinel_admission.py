@@ -0,0 +1,31 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from lambda_functions.sentinel_admission import handler
+
+
+@patch.dict(
+    os.environ, {"SENTINEL_INPUT_BUCKET": "sentinelinput", "LAADS_BUCKET": "laads"}
+)
+@patch("hls_lambda_layer.laads.s3_client")
+@patch("lambda_functions.sentinel_admission.s3")
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_handler(client, s3, laads_s3_client):
+    granule = "S2A_MSIL1C_20200708T232851_N0209_R044_T58LEP_20200709T005119"
+    twin = "S2A_MSIL1C_20200708T232851_N0209_R044_T58LEP_20200709T012345"
+    s3.list_objects_v2.return_value = {
+        "Contents": [{"Key": f"{granule}.zip"}, {"Key": f"{twin}.zip"}]
+    }
+    laads_s3_client.list_objects_v2.return_value = {}
+    output = handler({"granule": granule}, {})
+
+    args, kwargs = s3.list_objects_v2.call_args
+    assert kwargs == {"Bucket": "sentinelinput", "Prefix": granule[0:-6]}
+    args, kwargs = client.execute_statement.call_args
+    logged = {"name": "granule", "value": {"stringValue": f"{granule},{twin}"}}
+    assert logged in kwargs["parameters"]
+    assert output["granule"] == f"{granule},{twin}"
+    assert output["doy"] == "2020190"
+    assert not output["available"]
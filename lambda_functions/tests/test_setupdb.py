@@ -0,0 +1,247 @@
+import json
+import os
+from unittest.mock import patch
+
+from lambda_functions import process_sentinel_errors
+from lambda_functions.setupdb import handler
+
+# The log tables as created before they were partitioned.
+legacy_ddl = """
+CREATE TABLE landsat_mgrs_log (
+    id bigserial primary key,
+    ts timestamptz default now() not null,
+    path varchar(3) not null,
+    mgrs varchar(5) not null,
+    acquisition date not null,
+    jobinfo jsonb,
+    constraint no_dupe_mgrs unique(path, mgrs, acquisition)
+);
+CREATE TABLE landsat_ac_log (
+    id bigserial primary key,
+    ts timestamptz default now() not null,
+    path varchar(3) not null,
+    row varchar(3) not null,
+    acquisition date not null,
+    jobid text not null,
+    jobinfo jsonb,
+    constraint no_dupe_pathrowdate unique(path, row, acquisition)
+);
+CREATE TABLE sentinel_log (
+    id bigserial primary key,
+    ts timestamptz default now() not null,
+    jobinfo jsonb,
+    granule varchar,
+    run_count integer
+);
+"""
+
+
+def log_tables(driver):
+    return driver.execute_statement(
+        "SELECT relname, relkind FROM pg_class"
+        + " WHERE relnamespace = current_schema()::regnamespace"
+        + " AND relkind IN ('r', 'p') AND NOT relispartition"
+        + " AND relname <> 'schema_migrations'"
+        + " ORDER BY relname",
+        [],
+    )["records"]
+
+
+class Context:
+    def __init__(self, remaining_millis):
+        self.remaining_millis = remaining_millis
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_millis
+
+
+def test_handler_leaves_migrations_pending_near_deadline(postgres_driver):
+    response = handler({}, Context(30000))
+    assert response["applied"] == []
+    assert response["pending"][0] == "0001"
+    response = handler({}, Context(900000))
+    assert response["applied"][0] == "0001"
+    assert response["pending"] == []
+
+
+def test_handler_is_rerunnable(postgres_driver):
+    handler({}, {})
+    handler({}, {})
+    assert log_tables(postgres_driver) == [
+        [{"stringValue": "landsat_ac_log"}, {"stringValue": "p"}],
+        [{"stringValue": "landsat_mgrs_log"}, {"stringValue": "p"}],
+        [{"stringValue": "sentinel_log"}, {"stringValue": "p"}],
+    ]
+    created = postgres_driver.execute_statement("SELECT create_log_partitions(3)", [])
+    assert created["records"] == [[{"longValue": 0}]]
+
+
+def test_handler_partitions(postgres_driver):
+    handler({}, {})
+    execute = postgres_driver.execute_statement
+    execute(
+        "INSERT INTO landsat_ac_log (path, row, acquisition, historic) VALUES"
+        + " ('001', '001', '2014-05-01', false), ('001', '001', '2026-05-01', true),"
+        + " ('001', '001', '2001-01-01', false)",
+        [],
+    )
+    rows = execute(
+        "SELECT tableoid::regclass::text FROM landsat_ac_log ORDER BY acquisition",
+        [],
+    )
+    assert rows["records"] == [
+        [{"stringValue": "landsat_ac_log_forward_default"}],
+        [{"stringValue": "landsat_ac_log_forward_2014"}],
+        [{"stringValue": "landsat_ac_log_historic_202605"}],
+    ]
+
+
+def test_handler_upgrades_legacy_tables(postgres_driver):
+    postgres_driver.execute_statement(legacy_ddl, [])
+    handler({}, {})
+    handler({}, {})
+    assert log_tables(postgres_driver) == [
+        [{"stringValue": "landsat_ac_log"}, {"stringValue": "r"}],
+        [{"stringValue": "landsat_mgrs_log"}, {"stringValue": "r"}],
+        [{"stringValue": "sentinel_log"}, {"stringValue": "r"}],
+    ]
+
+
+def test_handler_dedupes_sentinel_log(postgres_driver):
+    execute = postgres_driver.execute_statement
+    execute(legacy_ddl, [])
+    execute(
+        "INSERT INTO sentinel_log (granule, run_count) VALUES"
+        + " ('a', 0), ('a', 2), ('a', 1), ('b', NULL), ('b', NULL), ('c', 0)",
+        [],
+    )
+    handler({}, {})
+    rows = execute(
+        "SELECT id, granule, run_count FROM sentinel_log ORDER BY granule", []
+    )
+    assert rows["records"] == [
+        [{"longValue": 2}, {"stringValue": "a"}, {"longValue": 2}],
+        [{"longValue": 5}, {"stringValue": "b"}, {"isNull": True}],
+        [{"longValue": 6}, {"stringValue": "c"}, {"longValue": 0}],
+    ]
+
+
+def test_handler_backfills_priority_keys(postgres_driver):
+    execute = postgres_driver.execute_statement
+    execute(legacy_ddl, [])
+    execute(
+        "INSERT INTO sentinel_log (ts, granule, run_count) VALUES"
+        + " ('2020-07-10', 'S2A_MSIL1C_20200708T232851_N0209_R044_T58LEP_20200709T005119',"
+        + " 1), ('2020-07-11', 'unparsable', 1)",
+        [],
+    )
+    handler({}, {})
+    rows = execute(
+        "SELECT acquisition::text, historic FROM sentinel_log ORDER BY id", []
+    )
+    assert rows["records"] == [
+        [{"stringValue": "2020-07-08"}, {"booleanValue": False}],
+        [{"stringValue": "2020-07-11"}, {"booleanValue": False}],
+    ]
+    # The legacy rows are selected for retry.
+    execute("UPDATE sentinel_log SET failure_class = 'input_error'", [])
+    with patch.dict(os.environ, {"RETRY_LIMIT": "3"}), patch.object(
+        process_sentinel_errors, "step_function_client"
+    ) as client:
+        process_sentinel_errors.handler({}, {})
+    args, kwargs = client.start_execution.call_args
+    assert len(json.loads(kwargs["input"])["errors"]) == 2
+
+
+def test_handler_backfills_job_columns(postgres_driver):
+    handler({}, {})
+    execute = postgres_driver.execute_statement
+    execute(
+        "INSERT INTO landsat_mgrs_log (path, mgrs, acquisition, jobinfo) VALUES"
+        + """ ('001', 'a', '2020-01-01', '{"Status": "SUCCEEDED",
+        "Container": {"ExitCode": 0}, "StartedAt": 1601068570556,
+        "StoppedAt": 1601069627539}'),"""
+        + """ ('001', 'b', '2020-01-01', '{"Status": "FAILED",
+        "Container": {}}'),"""
+        + """ ('001', 'c', '2020-01-01', '{"cause": "A cause message"}'),"""
+        + " ('001', 'd', '2020-01-01', NULL)",
+        [],
+    )
+    # As if the rows were logged before the backfill migration.
+    execute("DELETE FROM schema_migrations WHERE version = '0002'", [])
+    handler({}, {})
+    rows = execute(
+        "SELECT mgrs, exit_code, job_status,"
+        + " stopped_at = '2020-09-25T21:33:47.539Z'::timestamptz"
+        + " FROM landsat_mgrs_log ORDER BY mgrs",
+        [],
+    )
+    assert rows["records"] == [
+        [
+            {"stringValue": "a"},
+            {"longValue": 0},
+            {"stringValue": "SUCCEEDED"},
+            {"booleanValue": True},
+        ],
+        [{"stringValue": "b"}, {"isNull": True}, {"stringValue": "FAILED"}]
+        + [{"isNull": True}],
+        [{"stringValue": "c"}] + [{"isNull": True}] * 3,
+        [{"stringValue": "d"}] + [{"isNull": True}] * 3,
+    ]
+
+
+def test_partition_log_tables(postgres_driver):
+    from scripts.partition_log_tables import partition_log_tables
+
+    execute = postgres_driver.execute_statement
+    execute(legacy_ddl, [])
+    handler({}, {})
+    execute(
+        "INSERT INTO sentinel_log (granule, run_count) VALUES"
+        + " ('S2A_MSIL1C_20200708T232851_N0209_R044_T58LEP_20200709T005119', 1),"
+        + " ('S2B_MSIL1C_20160101T000000_N0209_R044_T58LEP_20160101T005119', 0)",
+        [],
+    )
+    execute(
+        "INSERT INTO landsat_ac_log (path, row, acquisition, historic) VALUES"
+        + " ('001', '001', '2014-05-01', NULL), ('001', '002', '2014-05-01', true)",
+        [],
+    )
+    partition_log_tables(batch_size=1)
+    partition_log_tables(batch_size=1, drop=True)
+    assert log_tables(postgres_driver) == [
+        [{"stringValue": "landsat_ac_log"}, {"stringValue": "p"}],
+        [{"stringValue": "landsat_mgrs_log"}, {"stringValue": "p"}],
+        [{"stringValue": "sentinel_log"}, {"stringValue": "p"}],
+    ]
+    rows = execute(
+        "SELECT id, acquisition, tableoid::regclass::text FROM sentinel_log"
+        + " ORDER BY id",
+        [],
+    )
+    assert rows["records"] == [
+        [
+            {"longValue": 1},
+            {"stringValue": "2020-07-08"},
+            {"stringValue": "sentinel_log_forward_2020"},
+        ],
+        [
+            {"longValue": 2},
+            {"stringValue": "2016-01-01"},
+            {"stringValue": "sentinel_log_forward_2016"},
+        ],
+    ]
+    rows = execute(
+        "SELECT row, tableoid::regclass::text FROM landsat_ac_log ORDER BY row", []
+    )
+    assert rows["records"] == [
+        [{"stringValue": "001"}, {"stringValue": "landsat_ac_log_forward_2014"}],
+        [{"stringValue": "002"}, {"stringValue": "landsat_ac_log_historic_2014"}],
+    ]
+    # New rows continue the id sequence.
+    execute(
+        "INSERT INTO sentinel_log (granule, acquisition) VALUES ('c', '2021-01-01')",
+        [],
+    )
+    ids = execute("SELECT max(id) FROM sentinel_log", [])
+    assert ids["records"] == [[{"longValue": 3}]]
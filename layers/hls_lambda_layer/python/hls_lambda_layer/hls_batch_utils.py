@@ -1,20 +1,109 @@
 import json
+import os
+from datetime import datetime, timezone
+
+import boto3
+from hls_lambda_layer.hls_db import long_parameter, string_parameter
+from hls_lambda_layer.hls_failures import TRANSIENT_INFRA
+
+# Created on first use and then reused for the life of the container.
+s3_client = None
+
+# Fields kept in the logged jobinfo.  The rest of the Batch job description,
+# such as Environment, MountPoints, Volumes, NetworkInterfaces and ARNs, is
+# never read back and can be archived with archive_jobinfo.
+JOB_FIELDS = (
+    "JobId",
+    "JobName",
+    "Status",
+    "StatusReason",
+    "CreatedAt",
+    "StartedAt",
+    "StoppedAt",
+)
+CONTAINER_FIELDS = ("ExitCode", "Reason", "Memory", "Vcpus", "ResourceRequirements")
+ATTEMPT_FIELDS = ("StartedAt", "StoppedAt", "StatusReason")
+ATTEMPT_CONTAINER_FIELDS = ("ExitCode", "Reason", "LogStreamName")
+
+# Denormalized job columns written alongside jobinfo by the batch job loggers.
+JOB_COLUMNS = "exit_code, job_status, started_at, stopped_at"
+JOB_COLUMN_VALUES = (
+    ":exit_code::integer, :job_status::text,"
+    + " :started_at::timestamptz, :stopped_at::timestamptz"
+)
+
+# Seconds before a failed granule is first due for reprocessing, doubling with
+# each run up to RETRY_BACKOFF_CAP.  Transient infrastructure failures, such as
+# Spot interruptions, start from the shorter TRANSIENT_RETRY_BACKOFF.
+RETRY_BACKOFF = int(os.getenv("RETRY_BACKOFF", "3600"))
+TRANSIENT_RETRY_BACKOFF = int(os.getenv("TRANSIENT_RETRY_BACKOFF", "300"))
+RETRY_BACKOFF_CAP = int(os.getenv("RETRY_BACKOFF_CAP", "604800"))
+
+# next_retry_at written by the batch job loggers.  run_count is the count
+# before the logged run.
+NEXT_RETRY_AT = (
+    "now() + make_interval(secs => LEAST(:retry_backoff_cap::integer,"
+    + " :retry_backoff::integer * power(2, COALESCE(run_count, 0))))"
+)
+
+
+def get_s3_client():
+    global s3_client
+    if s3_client is None:
+        s3_client = boto3.client("s3")
+    return s3_client
+
+
+def pick(source, fields):
+    return {field: source[field] for field in fields if field in source}
+
+
+def compact_jobinfo(jobinfo):
+    """
+    Whitelisted copy of a Batch job description for logging.
+
+    Parameters:
+    jobinfo (dict) A Batch job description
+
+    Returns:
+    jobinfo (dict) The job's status, timing, exit code and resources
+
+    """
+    if "JobId" not in jobinfo:
+        return jobinfo
+    compact = pick(jobinfo, JOB_FIELDS)
+    if isinstance(jobinfo.get("Container"), dict):
+        compact["Container"] = pick(jobinfo["Container"], CONTAINER_FIELDS)
+    if isinstance(jobinfo.get("Attempts"), list):
+        compact["Attempts"] = [
+            dict(
+                pick(attempt, ATTEMPT_FIELDS),
+                Container=pick(attempt.get("Container", {}), ATTEMPT_CONTAINER_FIELDS),
+            )
+            for attempt in jobinfo["Attempts"]
+        ]
+    return compact
+
+
+def epoch_ms_to_iso(value):
+    if not isinstance(value, (int, float)):
+        return None
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc).isoformat()
 
 
 def parse_jobinfo(key, event):
     if "Cause" in event[key].keys():
         try:
-            jobinfo = json.loads(event[key]["Cause"])
-            jobid = jobinfo["JobId"]
-            jobinfostring = json.dumps(jobinfo)
+            rawjobinfo = json.loads(event[key]["Cause"])
+            jobid = rawjobinfo["JobId"]
         except ValueError:
-            jobinfo = {"cause": event[key]["Cause"]}
+            rawjobinfo = {"cause": event[key]["Cause"]}
             jobid = None
-            jobinfostring = json.dumps(jobinfo)
     else:
-        jobinfo = event[key]
-        jobid = jobinfo["JobId"]
-        jobinfostring = json.dumps(event[key])
+        rawjobinfo = event[key]
+        jobid = rawjobinfo["JobId"]
+    jobinfo = compact_jobinfo(rawjobinfo)
+    jobinfostring = json.dumps(jobinfo)
 
     try:
         exitcode = jobinfo["Attempts"][0]["Container"]["ExitCode"]
@@ -23,10 +112,84 @@ def parse_jobinfo(key, event):
     except TypeError:
         exitcode = "nocode"
 
+    # The columns mirror the jobinfo paths the retry queries have always read,
+    # so exit_code is the job level Container.ExitCode.
+    container_exitcode = jobinfo.get("Container", {}).get("ExitCode")
+    if not isinstance(container_exitcode, int):
+        container_exitcode = None
     output = {
         "jobinfo": jobinfo,
+        "rawjobinfo": rawjobinfo,
         "jobid": jobid,
         "jobinfostring": jobinfostring,
         "exitcode": exitcode,
+        "exit_code": container_exitcode,
+        "job_status": jobinfo.get("Status"),
+        "started_at": epoch_ms_to_iso(jobinfo.get("StartedAt")),
+        "stopped_at": epoch_ms_to_iso(jobinfo.get("StoppedAt")),
     }
     return output
+
+
+def job_column_parameters(parsed_info):
+    """
+    Data API parameters for JOB_COLUMN_VALUES.
+
+    Parameters:
+    parsed_info (dict) The output of parse_jobinfo
+
+    Returns:
+    sql_parameters (list) exit_code, job_status, started_at and stopped_at
+    parameters
+
+    """
+    return [
+        long_parameter("exit_code", parsed_info["exit_code"]),
+        string_parameter("job_status", parsed_info["job_status"]),
+        string_parameter("started_at", parsed_info["started_at"]),
+        string_parameter("stopped_at", parsed_info["stopped_at"]),
+    ]
+
+
+def archive_jobinfo(parsed_info):
+    """
+    Archive the full Batch job description when JOBINFO_ARCHIVE_BUCKET is set.
+
+    Parameters:
+    parsed_info (dict) The output of parse_jobinfo
+
+    Returns:
+    key (str) The archived object's key, None when nothing was archived
+
+    """
+    bucket = os.getenv("JOBINFO_ARCHIVE_BUCKET")
+    if not bucket or parsed_info["jobid"] is None:
+        return None
+    key = f"jobinfo/{parsed_info['jobid']}.json"
+    get_s3_client().put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=json.dumps(parsed_info["rawjobinfo"]).encode("utf-8"),
+        ContentType="application/json",
+    )
+    return key
+
+
+def retry_backoff_parameters(failure_class):
+    """
+    Data API parameters for NEXT_RETRY_AT.
+
+    Parameters:
+    failure_class (str) The logged run's class, see hls_failures
+
+    Returns:
+    sql_parameters (list) retry_backoff and retry_backoff_cap parameters
+
+    """
+    transient = failure_class == TRANSIENT_INFRA
+    return [
+        long_parameter(
+            "retry_backoff", TRANSIENT_RETRY_BACKOFF if transient else RETRY_BACKOFF
+        ),
+        long_parameter("retry_backoff_cap", RETRY_BACKOFF_CAP),
+    ]
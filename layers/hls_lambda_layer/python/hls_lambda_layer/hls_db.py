@@ -0,0 +1,265 @@
+"""
+Shared access to the HLS logging database.
+
+Statements use the RDS Data API's named :parameter SQL and typed parameter
+encoding whichever driver runs them.  HLS_DB_DRIVER selects the driver,
+either data-api (the default) or postgres for pooled psycopg connections from
+Lambdas deployed in the VPC.
+"""
+
+import json
+import os
+import random
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import boto3
+from botocore.exceptions import ClientError
+
+# Created on first use and then reused for the life of the container.
+rds_client = None
+
+MAX_ATTEMPTS = int(os.getenv("HLS_DB_MAX_ATTEMPTS", "6"))
+BASE_DELAY = 0.5
+MAX_DELAY = 20.0
+
+THROTTLING_ERRORS = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableError",
+    "InternalServerErrorException",
+    # Raised while an Aurora Serverless cluster resumes from a pause.
+    "DatabaseResumingException",
+    "DatabaseUnavailableException",
+}
+# BadRequestException also covers SQL errors, so it is only retried when the
+# message shows an Aurora Serverless cluster that is paused or resuming.
+RESUMING_MESSAGE = re.compile(
+    r"communications link failure|resuming after being auto-paused|is resuming",
+    re.IGNORECASE,
+)
+
+
+def get_rds_client():
+    global rds_client
+    if rds_client is None:
+        rds_client = boto3.client("rds-data")
+    return rds_client
+
+
+def string_parameter(name: str, value: Optional[str]) -> Dict:
+    if value is None:
+        return null_parameter(name)
+    return {"name": name, "value": {"stringValue": value}}
+
+
+def long_parameter(name: str, value: Optional[int]) -> Dict:
+    if value is None:
+        return null_parameter(name)
+    return {"name": name, "value": {"longValue": value}}
+
+
+def boolean_parameter(name: str, value: Optional[bool]) -> Dict:
+    if value is None:
+        return null_parameter(name)
+    return {"name": name, "value": {"booleanValue": value}}
+
+
+def null_parameter(name: str) -> Dict:
+    return {"name": name, "value": {"isNull": True}}
+
+
+def historic_value() -> bool:
+    """Whether this Lambda is deployed for the historic pipeline."""
+    return os.getenv("HISTORIC") == "historic"
+
+
+def is_retryable(error: ClientError) -> bool:
+    code = error.response.get("Error", {}).get("Code")
+    message = error.response.get("Error", {}).get("Message", "")
+    if code in THROTTLING_ERRORS:
+        return True
+    return code == "BadRequestException" and bool(RESUMING_MESSAGE.search(message))
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full jitter exponential backoff for a zero based attempt number."""
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2**attempt))
+
+
+def log_statement(sql: str, seconds: float, attempts: int, status: str):
+    print(
+        json.dumps(
+            {
+                "db_statement": " ".join(sql.split())[:80],
+                "db_latency_ms": round(seconds * 1000, 1),
+                "db_attempts": attempts,
+                "db_status": status,
+            }
+        )
+    )
+
+
+def call_data_api(operation: str, label: str, **kwargs) -> Dict:
+    """
+    Call a Data API operation with retries and latency logging.
+
+    Aurora Serverless resume and throttling errors are retried with jittered
+    exponential backoff.
+
+    Parameters:
+    operation (str) The rds-data client method, e.g. execute_statement
+    label (str) The SQL or operation name to log
+    kwargs Operation arguments other than the cluster, secret and database
+
+    Returns:
+    response (dict) The Data API response
+
+    """
+    method = getattr(get_rds_client(), operation)
+    arguments = {
+        "secretArn": os.getenv("HLS_SECRETS"),
+        "resourceArn": os.getenv("HLS_DB_ARN"),
+        **kwargs,
+    }
+    if operation not in ("commit_transaction", "rollback_transaction"):
+        arguments["database"] = os.getenv("HLS_DB_NAME")
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        try:
+            response = method(**arguments)
+        except ClientError as error:
+            attempt += 1
+            if attempt >= MAX_ATTEMPTS or not is_retryable(error):
+                log_statement(label, time.perf_counter() - start, attempt, "error")
+                raise
+            time.sleep(backoff_delay(attempt - 1))
+        else:
+            log_statement(label, time.perf_counter() - start, attempt + 1, "ok")
+            return response
+
+
+class DataApiDriver:
+    """Run statements through the RDS Data API."""
+
+    # The errors raised by a statement which could not be run.
+    errors = (ClientError,)
+
+    def execute_statement(self, sql: str, sql_parameters: List[Dict], **kwargs) -> Dict:
+        return call_data_api(
+            "execute_statement", sql, sql=sql, parameters=sql_parameters, **kwargs
+        )
+
+    def batch_execute_statement(
+        self, sql: str, parameter_sets: List[List[Dict]]
+    ) -> Dict:
+        return call_data_api(
+            "batch_execute_statement", sql, sql=sql, parameterSets=parameter_sets
+        )
+
+    @contextmanager
+    def transaction(self) -> Iterator[str]:
+        response = call_data_api("begin_transaction", "BEGIN")
+        transaction_id = response["transactionId"]
+        try:
+            yield transaction_id
+        except Exception:
+            call_data_api(
+                "rollback_transaction", "ROLLBACK", transactionId=transaction_id
+            )
+            raise
+        call_data_api("commit_transaction", "COMMIT", transactionId=transaction_id)
+
+    def stream_statement(
+        self, sql: str, sql_parameters: List[Dict], batch_size: int
+    ) -> Iterator[List[List[Dict]]]:
+        # The Data API has no cursors, so the whole result comes back at once.
+        yield self.execute_statement(sql, sql_parameters).get("records", [])
+
+
+# Created on first use and then reused for the life of the container.
+driver = None
+
+
+def get_driver():
+    global driver
+    if driver is None:
+        if os.getenv("HLS_DB_DRIVER", "data-api") == "postgres":
+            from hls_lambda_layer.hls_db_postgres import PostgresDriver
+
+            driver = PostgresDriver()
+        else:
+            driver = DataApiDriver()
+    return driver
+
+
+def database_errors() -> tuple:
+    """The exception types the driver raises for a statement which fails."""
+    return get_driver().errors
+
+
+def execute_statement(sql: str, sql_parameters: List[Dict] = [], **kwargs) -> Dict:
+    """
+    Execute a statement.
+
+    Parameters:
+    sql (str) The SQL statement
+    sql_parameters (list) Data API parameters built with the *_parameter helpers
+    kwargs Extra execute_statement arguments such as transactionId
+
+    Returns:
+    response (dict) The Data API shaped execute_statement response
+
+    """
+    return get_driver().execute_statement(sql, sql_parameters, **kwargs)
+
+
+def batch_execute_statement(sql: str, parameter_sets: List[List[Dict]]) -> Dict:
+    """
+    Execute one statement for each parameter set in a single call.
+
+    Parameters:
+    sql (str) The SQL statement
+    parameter_sets (list) A list of Data API parameter lists
+
+    Returns:
+    response (dict) The Data API shaped batch_execute_statement response
+
+    """
+    return get_driver().batch_execute_statement(sql, parameter_sets)
+
+
+def transaction():
+    """
+    Run statements in a transaction.
+
+    A context manager which yields the transactionId to pass to
+    execute_statement.  The transaction is committed when the block exits and
+    rolled back if it raises.
+    """
+    return get_driver().transaction()
+
+
+def stream_statement(
+    sql: str, sql_parameters: List[Dict] = [], batch_size: int = 1000
+) -> Iterator[List[List[Dict]]]:
+    """
+    Execute a query and yield its records in batches.
+
+    The postgres driver reads through a server side cursor so large
+    reprocessing selects are not held in memory or capped at the Data API's
+    1 MB result size.
+
+    Parameters:
+    sql (str) The SQL query
+    sql_parameters (list) Data API parameters built with the *_parameter helpers
+    batch_size (int) Records to fetch per batch
+
+    Returns:
+    batches (iterator) Lists of Data API shaped records
+
+    """
+    return get_driver().stream_statement(sql, sql_parameters, batch_size)
@@ -0,0 +1,187 @@
+"""
+Pooled psycopg driver for the HLS logging database.
+
+Accepts the same :parameter SQL and Data API parameter encoding as the Data
+API driver and returns Data API shaped responses, so handlers run unchanged
+on either driver.  psycopg and psycopg_pool are not in the Lambda runtime and
+must be bundled with Lambdas that select this driver.
+"""
+
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import boto3
+from hls_lambda_layer.hls_db import log_statement
+
+# Quoted literals and identifiers are matched first so a :name inside them,
+# such as 'hh24:mi:ss', is left alone.  :: casts are skipped by the lookbehind.
+TOKENS = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|(?<!:):([A-Za-z_]\w*)|%""")
+
+
+def to_pyformat(sql: str) -> str:
+    """Convert :name placeholders to psycopg %(name)s placeholders."""
+
+    def replace(match):
+        if match.group(1):
+            return match.group(1).replace("%", "%%")
+        if match.group(2):
+            return f"%({match.group(2)})s"
+        return "%%"
+
+    return TOKENS.sub(replace, sql)
+
+
+def parameter_values(sql_parameters: List[Dict]) -> Dict[str, Any]:
+    """Decode Data API parameters to Python values."""
+    values = {}
+    for parameter in sql_parameters:
+        value = parameter["value"]
+        if value.get("isNull"):
+            values[parameter["name"]] = None
+        else:
+            (values[parameter["name"]],) = value.values()
+    return values
+
+
+def to_field(value: Any) -> Dict:
+    """Encode a Python value as a Data API result field."""
+    if value is None:
+        return {"isNull": True}
+    if isinstance(value, bool):
+        return {"booleanValue": value}
+    if isinstance(value, int):
+        return {"longValue": value}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (dict, list)):
+        return {"stringValue": json.dumps(value)}
+    if isinstance(value, datetime):
+        return {"stringValue": value.strftime("%Y-%m-%d %H:%M:%S.%f")}
+    if isinstance(value, date):
+        return {"stringValue": value.isoformat()}
+    return {"stringValue": str(value)}
+
+
+def postgres_conninfo() -> str:
+    """
+    Connection string from HLS_DB_URL or the HLS_SECRETS RDS secret.
+
+    Returns:
+    conninfo (str) A libpq connection string
+
+    """
+    url = os.getenv("HLS_DB_URL")
+    if url:
+        return url
+    secret = json.loads(
+        boto3.client("secretsmanager").get_secret_value(
+            SecretId=os.getenv("HLS_SECRETS")
+        )["SecretString"]
+    )
+    return (
+        f"host={secret['host']} port={secret['port']} user={secret['username']}"
+        f" password={secret['password']}"
+        f" dbname={os.getenv('HLS_DB_NAME', secret.get('dbname'))}"
+    )
+
+
+class PostgresDriver:
+    """Run statements on a pool of direct psycopg connections."""
+
+    def __init__(self, conninfo: Optional[str] = None, max_size: int = None):
+        import psycopg
+        from psycopg_pool import ConnectionPool
+
+        # The errors raised by a statement which could not be run, including
+        # the pool's timeouts.
+        self.errors = (psycopg.Error,)
+
+        # Statements outside transaction() commit as they run, as on the Data
+        # API, which also lets migrations build indexes concurrently.
+        self.pool = ConnectionPool(
+            conninfo or postgres_conninfo(),
+            kwargs={"autocommit": True},
+            min_size=1,
+            max_size=max_size or int(os.getenv("HLS_DB_POOL_SIZE", "2")),
+            check=ConnectionPool.check_connection,
+            open=True,
+        )
+        self.transactions = {}
+
+    @contextmanager
+    def connection(self, transaction_id: Optional[str] = None):
+        if transaction_id is not None:
+            yield self.transactions[transaction_id]
+        else:
+            with self.pool.connection() as connection:
+                yield connection
+
+    def execute_statement(
+        self,
+        sql: str,
+        sql_parameters: List[Dict],
+        transactionId: str = None,
+        continueAfterTimeout: bool = False,
+    ) -> Dict:
+        # Connections have no call timeout, so continueAfterTimeout is ignored.
+        start = time.perf_counter()
+        with self.connection(transactionId) as connection:
+            if sql_parameters:
+                cursor = connection.execute(
+                    to_pyformat(sql), parameter_values(sql_parameters)
+                )
+            else:
+                # Without parameters several statements can run at once.
+                cursor = connection.execute(sql)
+            response = {"numberOfRecordsUpdated": max(cursor.rowcount, 0)}
+            if cursor.description is not None:
+                response["records"] = [
+                    [to_field(value) for value in row] for row in cursor.fetchall()
+                ]
+        log_statement(sql, time.perf_counter() - start, 1, "ok")
+        return response
+
+    def batch_execute_statement(self, sql: str, parameter_sets: List[List[Dict]]) -> Dict:
+        start = time.perf_counter()
+        with self.connection() as connection, connection.transaction():
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    to_pyformat(sql),
+                    [parameter_values(parameters) for parameters in parameter_sets],
+                )
+        log_statement(sql, time.perf_counter() - start, 1, "ok")
+        return {"updateResults": [{} for _ in parameter_sets]}
+
+    @contextmanager
+    def transaction(self) -> Iterator[str]:
+        with self.pool.connection() as connection:
+            transaction_id = str(uuid.uuid4())
+            self.transactions[transaction_id] = connection
+            try:
+                with connection.transaction():
+                    yield transaction_id
+            finally:
+                del self.transactions[transaction_id]
+
+    def stream_statement(
+        self, sql: str, sql_parameters: List[Dict], batch_size: int
+    ) -> Iterator[List[List[Dict]]]:
+        start = time.perf_counter()
+        with self.pool.connection() as connection, connection.transaction():
+            with connection.cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+                cursor.execute(to_pyformat(sql), parameter_values(sql_parameters))
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield [[to_field(value) for value in row] for row in rows]
+        log_statement(sql, time.perf_counter() - start, 1, "ok")
+
+    def close(self):
+        self.pool.close()
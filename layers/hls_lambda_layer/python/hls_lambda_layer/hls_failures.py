@@ -0,0 +1,207 @@
+"""
+Classification of Batch job results, and the retry policy built on it.
+
+The batch job loggers classify each logged job with classify and persist the
+class in the log tables' failure_class column.  The retry Lambdas select rows
+by class with retry_condition and the log archive removes rows whose class is
+not retried with finished_condition, so which failures are retried for each
+pipeline is decided here alone.
+
+Jobs killed for running out of memory are retried with more memory, a step up
+MEMORY_STEPS at a time, until they have run with the last step.  The retry
+Lambdas record the memory of each retry in the log tables' memory column as
+they claim the row, see escalate_memory, and pass it to the state machine as
+the job's container memory.
+"""
+
+import os
+from typing import Dict, Iterable
+
+SUCCESS = "success"
+# The job failed as it should for its input, such as cloud cover over threshold.
+EXPECTED_TERMINAL = "expected_terminal"
+# The job was interrupted by its host or container runtime, such as by a Spot
+# reclaim, rather than failed by its input.
+TRANSIENT_INFRA = "transient_infra"
+OOM = "oom"
+TIMEOUT = "timeout"
+INPUT_ERROR = "input_error"
+
+CLASSES = (SUCCESS, EXPECTED_TERMINAL, TRANSIENT_INFRA, OOM, TIMEOUT, INPUT_ERROR)
+
+# Classes which complete a step function execution.
+COMPLETED = (SUCCESS, EXPECTED_TERMINAL)
+
+# Exit code 3 is invalid solar zenith angle.
+# Exit code 4 is cloud cover over threshold.
+AC_EXPECTED_EXIT_CODES = (3, 4)
+# Exit code 5 is empty tile output.
+TILING_EXPECTED_EXIT_CODES = (5,)
+
+OOM_EXIT_CODE = 137
+
+# Batch job status reasons.
+TIMEOUT_STATUS_REASONS = ("Job attempt duration exceeded timeout",)
+TRANSIENT_STATUS_REASONS = ("Host EC2",)
+# ECS container reasons.
+TRANSIENT_CONTAINER_REASONS = (
+    "CannotCreateContainerError",
+    "CannotInspectContainerError",
+    "CannotPullContainerError",
+    "CannotStartContainerError",
+    "DockerTimeoutError",
+    "ResourceInitializationError",
+)
+OOM_CONTAINER_REASONS = ("OutOfMemoryError",)
+
+# Container memory, in MiB, of a job's successive runs after running out of
+# memory.  The first step is the job definitions' memory and the last the cap.
+MEMORY_STEPS = tuple(
+    int(step) for step in os.getenv("MEMORY_STEPS", "20000,30000,60000").split(",")
+)
+
+# Classes the retry Lambdas select from each log table.
+RETRIED = {
+    "sentinel_log": (TRANSIENT_INFRA, OOM, TIMEOUT, INPUT_ERROR),
+    "landsat_ac_log": (TRANSIENT_INFRA, OOM, TIMEOUT, INPUT_ERROR),
+    # Tiles are tiled again until they succeed, as more of their path rows
+    # become available.
+    "landsat_mgrs_log": (
+        EXPECTED_TERMINAL,
+        TRANSIENT_INFRA,
+        OOM,
+        TIMEOUT,
+        INPUT_ERROR,
+    ),
+}
+# Tables whose rows are logged before their first job runs, which are
+# retried until they have a class.
+UNCLASSIFIED_RETRIED = ("landsat_ac_log", "landsat_mgrs_log")
+# Tables whose out of memory jobs are retried with more memory, only until
+# they have run with the cap.
+ESCALATED = ("sentinel_log", "landsat_ac_log")
+
+
+def classify_exit_code(exit_code, expected_exit_codes: Iterable[int]) -> str:
+    """
+    Classify a job by its container exit code alone.
+
+    Parameters:
+    exit_code (int) The exit code, or a placeholder such as "nocode" when the
+    container did not exit
+    expected_exit_codes (tuple) The pipeline's expected failure exit codes
+
+    Returns:
+    failure_class (str)
+
+    """
+    if not isinstance(exit_code, int):
+        return TRANSIENT_INFRA
+    if exit_code == 0:
+        return SUCCESS
+    if exit_code == OOM_EXIT_CODE:
+        return OOM
+    if exit_code in expected_exit_codes:
+        return EXPECTED_TERMINAL
+    return INPUT_ERROR
+
+
+def container_reasons(jobinfo: Dict) -> Iterable[str]:
+    containers = [jobinfo.get("Container")] + [
+        attempt.get("Container") for attempt in jobinfo.get("Attempts") or []
+    ]
+    return [
+        container["Reason"]
+        for container in containers
+        if isinstance(container, dict) and container.get("Reason")
+    ]
+
+
+def classify(parsed_info: Dict, expected_exit_codes: Iterable[int]) -> str:
+    """
+    Classify a logged Batch job.
+
+    A job killed by its timeout or its host going away is classified by that
+    rather than by the exit code of its killed container.
+
+    Parameters:
+    parsed_info (dict) The output of hls_batch_utils.parse_jobinfo
+    expected_exit_codes (tuple) The pipeline's expected failure exit codes
+
+    Returns:
+    failure_class (str)
+
+    """
+    if parsed_info["job_status"] == "SUCCEEDED":
+        return SUCCESS
+    jobinfo = parsed_info["jobinfo"]
+    status_reason = jobinfo.get("StatusReason") or ""
+    reasons = container_reasons(jobinfo)
+    if status_reason.startswith(TIMEOUT_STATUS_REASONS):
+        return TIMEOUT
+    if status_reason.startswith(TRANSIENT_STATUS_REASONS) or any(
+        reason.startswith(TRANSIENT_CONTAINER_REASONS) for reason in reasons
+    ):
+        return TRANSIENT_INFRA
+    if any(reason.startswith(OOM_CONTAINER_REASONS) for reason in reasons):
+        return OOM
+    return classify_exit_code(parsed_info["exit_code"], expected_exit_codes)
+
+
+def in_classes(classes: Iterable[str]) -> str:
+    return "failure_class IN (" + ", ".join(f"'{c}'" for c in classes) + ")"
+
+
+def attempted_memory() -> str:
+    """SQL for the memory of a row's last run, the first step if not recorded."""
+    return f"COALESCE(memory, {MEMORY_STEPS[0]})"
+
+
+def retried_classes(table: str) -> str:
+    """
+    The SQL condition selecting a log table's rows with a retried class.
+
+    The retry indexes are partial indexes on this condition.
+    """
+    condition = in_classes(RETRIED[table])
+    if table in UNCLASSIFIED_RETRIED:
+        return f"(failure_class IS NULL OR {condition})"
+    return condition
+
+
+def retry_condition(table: str) -> str:
+    """The SQL condition selecting a log table's rows to be retried."""
+    condition = retried_classes(table)
+    if table in ESCALATED:
+        condition = (
+            f"({condition} AND (failure_class IS DISTINCT FROM '{OOM}'"
+            + f" OR {attempted_memory()} < {MEMORY_STEPS[-1]}))"
+        )
+    return condition
+
+
+def finished_condition(table: str) -> str:
+    """The SQL condition selecting a log table's rows which are not retried."""
+    condition = in_classes(c for c in CLASSES if c not in RETRIED[table])
+    if table in ESCALATED:
+        condition = (
+            f"({condition} OR (failure_class = '{OOM}'"
+            + f" AND {attempted_memory()} >= {MEMORY_STEPS[-1]}))"
+        )
+    return condition
+
+
+def escalate_memory() -> str:
+    """
+    SQL assignment of the memory of a claimed row's retry.
+
+    A job which ran out of memory is retried with the next step up from the
+    memory it last ran with, any other with the same memory.
+    """
+    steps = ", ".join(str(step) for step in MEMORY_STEPS)
+    return (
+        f"memory = CASE WHEN failure_class = '{OOM}' THEN"
+        + f" (SELECT min(step) FROM unnest(ARRAY[{steps}]) AS step"
+        + f" WHERE step > {attempted_memory()})"
+        + f" ELSE {attempted_memory()} END"
+    )
@@ -0,0 +1,124 @@
+"""Statements that log granules in the HLS database when they enter the system."""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from hls_lambda_layer.hls_db import boolean_parameter, long_parameter, string_parameter
+
+Statement = Tuple[str, List[Dict]]
+
+# The sensing date in a Sentinel-2 granule id such as
+# S2A_MSIL1C_20200708T232851_N0209_R044_T58LEP_20200709T005119
+SENSING_DATE = re.compile(r"_(\d{4})(\d{2})(\d{2})T")
+
+
+def sentinel_acquisition(granule: str) -> Optional[str]:
+    """The yyyy-mm-dd sensing date of a Sentinel granule id."""
+    match = SENSING_DATE.search(granule)
+    return "-".join(match.groups()) if match else None
+
+
+def landsat_scene_insert(event: Dict, historic: bool) -> Statement:
+    """
+    Insert a new Landsat scene into landsat_ac_log.
+
+    Parameters:
+    event (dict) Landsat scene with path, row, scene and date
+    historic (bool) Whether the scene belongs to the historic pipeline
+
+    Returns:
+    statement (tuple) The sql and its Data API parameters
+
+    """
+    sql_parameters = [
+        string_parameter("path", event["path"]),
+        string_parameter("row", event["row"]),
+        string_parameter("scene_id", event["scene"]),
+        string_parameter("acquisition", event["date"]),
+        long_parameter("run_count", 0),
+        boolean_parameter("historic", historic),
+    ]
+    sql = (
+        "INSERT INTO landsat_ac_log (path, row, scene_id, acquisition, run_count, historic) VALUES"
+        + "(:path::varchar(3), :row::varchar(3),"
+        + " :scene_id::varchar(200), :acquisition::date, :run_count::integer, :historic::boolean)"
+        + " ON CONFLICT ON CONSTRAINT no_dupe_pathrowdate"
+        + " DO NOTHING"
+    )
+    return sql, sql_parameters
+
+
+def landsat_mgrs_insert(
+    event: Dict, mgrs_grids: List[str], historic: bool
+) -> Optional[Statement]:
+    """
+    Insert the MGRS tiles intersecting a Landsat scene into landsat_mgrs_log.
+
+    All tiles are written by one multi-row insert so a scene costs a single
+    Data API round trip.
+
+    Parameters:
+    event (dict) Landsat scene with path and date
+    mgrs_grids (list) MGRS tiles intersecting the scene
+    historic (bool) Whether the scene belongs to the historic pipeline
+
+    Returns:
+    statement (tuple) The sql and its Data API parameters, None without tiles
+
+    """
+    if not mgrs_grids:
+        return None
+    values = ",".join(
+        f"(:path::varchar(3), :mgrs_{index}::varchar(5), :acquisition::date,"
+        + " :run_count::integer, :historic::boolean)"
+        for index in range(len(mgrs_grids))
+    )
+    sql = (
+        "INSERT INTO landsat_mgrs_log (path, mgrs, acquisition, run_count, historic)"
+        + f" VALUES {values}"
+        + " ON CONFLICT DO NOTHING;"
+    )
+    sql_parameters = [
+        string_parameter("path", event["path"]),
+        string_parameter("acquisition", event["date"]),
+        long_parameter("run_count", 0),
+        boolean_parameter("historic", historic),
+    ]
+    sql_parameters.extend(
+        string_parameter(f"mgrs_{index}", mgrs_grid)
+        for index, mgrs_grid in enumerate(mgrs_grids)
+    )
+    return sql, sql_parameters
+
+
+def sentinel_granule_insert(granule: str, historic: bool) -> Statement:
+    """
+    Insert a new Sentinel granule into sentinel_log.
+
+    Granules which are already logged are left as they are, so duplicate
+    notifications and retried executions do not add rows.
+
+    Parameters:
+    granule (str) The Sentinel granule id
+    historic (bool) Whether the granule belongs to the historic pipeline
+
+    Returns:
+    statement (tuple) The sql and its Data API parameters
+
+    """
+    #  Initial run_count is 0 before processing
+    sql_parameters = [
+        string_parameter("granule", granule),
+        string_parameter("acquisition", sentinel_acquisition(granule)),
+        long_parameter("run_count", 0),
+        boolean_parameter("historic", historic),
+    ]
+    # acquisition is part of the partitioned table's unique key, so the
+    # conflict is left to whichever unique granule index the table has.
+    sql = (
+        "INSERT INTO sentinel_log (granule, acquisition, run_count, historic) VALUES"
+        + "(:granule::varchar, :acquisition::date, :run_count::integer,"
+        + " :historic::boolean)"
+        + " ON CONFLICT DO NOTHING"
+    )
+    return sql, sql_parameters
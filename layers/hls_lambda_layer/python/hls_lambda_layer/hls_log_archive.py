@@ -0,0 +1,235 @@
+"""
+Archive finished log rows to Parquet and remove them from the logging database.
+
+Rows are finished once they succeeded, failed in a way that is not retried or
+reached the retry limit.  Those older than the retention window are read
+through a server side cursor, written as zstd compressed Parquet files under
+<root>/<table>/date=<yyyy-mm-dd>/ by the day they were logged, and deleted in
+bounded batches once their files are written.  root is a local directory or an
+s3:// URL.  pyarrow is not in the Lambda runtime and must be installed
+wherever this runs.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from hls_lambda_layer.hls_db import (
+    execute_statement,
+    long_parameter,
+    stream_statement,
+    string_parameter,
+)
+from hls_lambda_layer.hls_failures import finished_condition
+
+# Rows the retry Lambdas will not select again, see hls_failures.
+FINISHED = {
+    table: f"({finished_condition(table)} OR run_count >= :retry_limit::integer)"
+    for table in ["sentinel_log", "landsat_ac_log", "landsat_mgrs_log"]
+}
+
+INTEGER_TYPES = {"smallint", "integer", "bigint"}
+
+
+def archive_columns(table: str) -> List[Tuple[str, str, str]]:
+    """
+    The columns of a log table with the select expression and Arrow type of each.
+
+    Timestamps and dates are selected as integers so they keep their values
+    whichever driver reads them.
+
+    Parameters:
+    table (str) The log table
+
+    Returns:
+    columns (list) (name, select expression, Arrow type name) tuples
+
+    """
+    response = execute_statement(
+        "SELECT column_name::text, data_type::text FROM information_schema.columns"
+        + " WHERE table_schema = current_schema() AND table_name = :table"
+        + " ORDER BY ordinal_position",
+        [string_parameter("table", table)],
+    )
+    columns = []
+    for name_field, type_field in response["records"]:
+        name = name_field["stringValue"]
+        data_type = type_field["stringValue"]
+        if data_type in INTEGER_TYPES:
+            columns.append((name, name, "int64"))
+        elif data_type == "boolean":
+            columns.append((name, name, "bool"))
+        elif data_type == "timestamp with time zone":
+            columns.append(
+                (name, f"(extract(epoch FROM {name}) * 1000000)::bigint", "timestamp")
+            )
+        elif data_type == "date":
+            columns.append((name, f"{name} - date '1970-01-01'", "date"))
+        else:
+            columns.append((name, f"{name}::text", "string"))
+    return columns
+
+
+def arrow_type(type_name: str):
+    import pyarrow
+
+    return {
+        "int64": pyarrow.int64(),
+        "bool": pyarrow.bool_(),
+        "timestamp": pyarrow.timestamp("us", tz="UTC"),
+        "date": pyarrow.date32(),
+        "string": pyarrow.string(),
+    }[type_name]
+
+
+def field_value(field: Dict):
+    if field.get("isNull"):
+        return None
+    (value,) = field.values()
+    return value
+
+
+def logged_date(ts_microseconds: int) -> str:
+    return (
+        datetime.fromtimestamp(ts_microseconds / 1000000, timezone.utc).date().isoformat()
+    )
+
+
+def write_partitions(
+    table: str,
+    columns: List[Tuple[str, str, str]],
+    records: List[List[Dict]],
+    root: str,
+) -> List[str]:
+    """
+    Write a batch of rows as one Parquet file per day logged.
+
+    Files are named by the first and last id they hold, so rewriting rows an
+    interrupted run archived but did not delete replaces their file.
+
+    Parameters:
+    table (str) The log table
+    columns (list) The table's archive_columns
+    records (list) Data API shaped records selected with the columns
+    root (str) Local directory or s3:// URL to archive under
+
+    Returns:
+    paths (list) The files written
+
+    """
+    import pyarrow
+    import pyarrow.parquet
+    from pyarrow import fs
+
+    filesystem, root_path = fs.FileSystem.from_uri(root)
+    names = [name for name, _, _ in columns]
+    schema = pyarrow.schema(
+        [(name, arrow_type(type_name)) for name, _, type_name in columns]
+    )
+    ts_index = names.index("ts")
+    by_date = {}
+    for record in records:
+        row = [field_value(field) for field in record]
+        by_date.setdefault(logged_date(row[ts_index]), []).append(row)
+    paths = []
+    for date, rows in sorted(by_date.items()):
+        directory = f"{root_path.rstrip('/')}/{table}/date={date}"
+        path = f"{directory}/{rows[0][0]}-{rows[-1][0]}.parquet"
+        arrays = [
+            pyarrow.array([row[index] for row in rows], type=schema.field(index).type)
+            for index in range(len(names))
+        ]
+        filesystem.create_dir(directory, recursive=True)
+        pyarrow.parquet.write_table(
+            pyarrow.Table.from_arrays(arrays, schema=schema),
+            path,
+            filesystem=filesystem,
+            compression="zstd",
+        )
+        paths.append(path)
+    return paths
+
+
+def delete_rows(table: str, ids: List[int], batch_size: int):
+    """Delete rows by id, batch_size rows per statement."""
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start : start + batch_size]
+        execute_statement(
+            f"DELETE FROM {table}"
+            + " WHERE id = ANY(string_to_array(:ids, ',')::bigint[])",
+            [string_parameter("ids", ",".join(str(id) for id in batch))],
+        )
+
+
+def archive_table(
+    table: str,
+    root: str,
+    retention_days: int,
+    retry_limit: int,
+    batch_size: int = 10000,
+    delete_batch_size: int = 1000,
+) -> int:
+    """
+    Archive and delete a log table's finished rows older than the retention window.
+
+    Parameters:
+    table (str) The log table
+    root (str) Local directory or s3:// URL to archive under
+    retention_days (int) Days finished rows are kept in the database
+    retry_limit (int) The run_count at which failed rows are no longer retried
+    batch_size (int) Rows read from the cursor and written per batch
+    delete_batch_size (int) Rows deleted per statement
+
+    Returns:
+    archived (int) The number of rows archived and deleted
+
+    """
+    columns = archive_columns(table)
+    if columns[0][0] != "id":
+        raise ValueError(f"{table} does not start with an id column")
+    sql = (
+        f"SELECT {', '.join(expression for _, expression, _ in columns)}"
+        + f" FROM {table}"
+        + " WHERE ts < now() - make_interval(days => :retention_days::integer)"
+        + f" AND {FINISHED[table]}"
+        + " ORDER BY id"
+    )
+    sql_parameters = [
+        long_parameter("retention_days", retention_days),
+        long_parameter("retry_limit", retry_limit),
+    ]
+    archived = 0
+    for records in stream_statement(sql, sql_parameters, batch_size):
+        write_partitions(table, columns, records, root)
+        delete_rows(
+            table, [record[0]["longValue"] for record in records], delete_batch_size
+        )
+        archived += len(records)
+        print(f"{table}: archived {archived} rows")
+    return archived
+
+
+def archive_log_tables(
+    root: str,
+    retention_days: int,
+    retry_limit: int,
+    tables: Optional[Iterable[str]] = None,
+    **kwargs,
+) -> Dict[str, int]:
+    """
+    Archive the finished rows of each log table.
+
+    Parameters:
+    root (str) Local directory or s3:// URL to archive under
+    retention_days (int) Days finished rows are kept in the database
+    retry_limit (int) The run_count at which failed rows are no longer retried
+    tables (list) Log tables to archive, all of them by default
+    kwargs Batch sizes passed to archive_table
+
+    Returns:
+    archived (dict) Rows archived per table
+
+    """
+    return {
+        table: archive_table(table, root, retention_days, retry_limit, **kwargs)
+        for table in tables or FINISHED
+    }
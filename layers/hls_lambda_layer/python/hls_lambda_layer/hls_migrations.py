@@ -0,0 +1,374 @@
+"""
+Versioned schema migrations for the HLS logging database.
+
+Migrations are the modules of hls_lambda_layer.migrations, applied in name
+order, and are recorded in the schema_migrations table once applied.  A
+migration module defines
+
+sql (str) Statements to execute, and or
+run (function) Called with the transactionId, None when not transactional
+transactional (bool) Whether to apply it in one transaction, True by default
+
+Migrations which build indexes or backfill large tables set transactional
+to False and use create_index and backfill, so no statement
+holds locks on the log tables for longer than a batch.  Migrations must be
+rerunnable, databases created before schema_migrations apply all of them
+once and scripts/partition_log_tables.py reapplies them to build
+partitioned tables.
+
+Index builds outlast the Data API's 45 second call timeout on large tables,
+so they are run with continueAfterTimeout and waited for, see execute_ddl.
+migrate can be given a time budget, after which it stops between index
+builds or backfill batches and leaves the interrupted migration to be run
+again by the next invocation, so the bootstrap Lambda applies long
+migrations over several invocations.  migrate holds an advisory lock while it
+applies migrations, so an overlapping call leaves them to the one holding it.
+"""
+
+import importlib
+import pkgutil
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Iterator, List, Optional
+
+from botocore.exceptions import ClientError
+from hls_lambda_layer.hls_db import (
+    execute_statement,
+    long_parameter,
+    string_parameter,
+    transaction,
+)
+
+MIGRATIONS_PACKAGE = "hls_lambda_layer.migrations"
+
+# Raised by the Data API when a call outlasts its timeout.  Statements run
+# with continueAfterTimeout carry on in the database.
+STATEMENT_TIMEOUT_ERROR = "StatementTimeoutException"
+# Seconds between checks on a statement which outlasted its call.
+POLL_SECONDS = 10
+
+# The time.monotonic() after which migrate starts no further step, set for
+# the duration of a migrate call with a time budget.
+deadline: Optional[float] = None
+
+# The pg_try_advisory_xact_lock key of the migration lock.
+MIGRATION_LOCK = 8020
+# Seconds between calls keeping the migration lock's transaction open, the
+# Data API rolls back a transaction left without calls for three minutes.
+LOCK_KEEPALIVE_SECONDS = 60
+# The lock transaction's last statement.  It takes no snapshot, so the idle
+# transaction does not hold back concurrent index builds, which wait for
+# every older snapshot.
+LOCK_KEEPALIVE = "SET LOCAL application_name = 'hls_migrations'"
+
+# The transactionId holding the migration lock during a migrate call and the
+# time.monotonic() of its last call.
+lock_transaction_id: Optional[str] = None
+lock_touched: float = 0
+
+
+class MigrationTimeout(Exception):
+    """The time budget of migrate ran out before a migration step."""
+
+
+schema_migrations = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version varchar primary key,
+    name varchar not null,
+    applied_at timestamptz default now() not null
+);
+"""
+
+
+def migrations() -> List[ModuleType]:
+    """The migration modules in version order."""
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    names = sorted(module.name for module in pkgutil.iter_modules(package.__path__))
+    return [importlib.import_module(f"{MIGRATIONS_PACKAGE}.{name}") for name in names]
+
+
+def version(migration: ModuleType) -> str:
+    """The leading number of a migration module's name, e.g. 0001."""
+    return migration.__name__.rsplit(".", 1)[-1].split("_", 1)[0]
+
+
+def applied_versions() -> List[str]:
+    execute_statement(schema_migrations)
+    response = execute_statement("SELECT version FROM schema_migrations ORDER BY version")
+    return [record[0]["stringValue"] for record in response["records"]]
+
+
+def pending_versions() -> List[str]:
+    """The versions of the migrations not yet applied."""
+    applied = applied_versions()
+    return [
+        version(migration)
+        for migration in migrations()
+        if version(migration) not in applied
+    ]
+
+
+@contextmanager
+def migration_lock(now: float) -> Iterator[bool]:
+    """
+    Take the migration lock for the block, yielding whether it was taken.
+
+    The lock is held by a transaction rather than a session, so it is
+    released if the caller dies rather than left on a pooled connection.
+
+    Parameters:
+    now (float) The time.monotonic() the lock is taken at
+
+    """
+    global lock_transaction_id, lock_touched
+    with transaction() as transaction_id:
+        response = execute_statement(
+            "SELECT pg_try_advisory_xact_lock(:key::bigint)",
+            [long_parameter("key", MIGRATION_LOCK)],
+            transactionId=transaction_id,
+        )
+        locked = response["records"][0][0]["booleanValue"]
+        if locked:
+            execute_statement(LOCK_KEEPALIVE, transactionId=transaction_id)
+            lock_transaction_id, lock_touched = transaction_id, now
+        try:
+            yield locked
+        finally:
+            lock_transaction_id = None
+
+
+def keep_lock(now: float):
+    """Keep the migration lock's transaction open."""
+    global lock_touched
+    if lock_transaction_id is not None and now - lock_touched >= LOCK_KEEPALIVE_SECONDS:
+        execute_statement(LOCK_KEEPALIVE, transactionId=lock_transaction_id)
+        lock_touched = now
+
+
+def check_deadline():
+    """
+    Raise MigrationTimeout once the time budget of migrate has run out.
+
+    Called before each migration step, so it also keeps the migration lock.
+    """
+    now = time.monotonic()
+    keep_lock(now)
+    if deadline is not None and now >= deadline:
+        raise MigrationTimeout()
+
+
+def apply(migration: ModuleType, transaction_id: Optional[str] = None):
+    kwargs = {} if transaction_id is None else {"transactionId": transaction_id}
+    if getattr(migration, "sql", None):
+        execute_statement(migration.sql, **kwargs)
+    if hasattr(migration, "run"):
+        migration.run(transaction_id)
+    execute_statement(
+        "INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"
+        + " ON CONFLICT (version) DO UPDATE SET applied_at = now()",
+        [
+            string_parameter("version", version(migration)),
+            string_parameter("name", migration.__name__.rsplit(".", 1)[-1]),
+        ],
+        **kwargs,
+    )
+
+
+def migrate(reapply: bool = False, time_budget: Optional[float] = None) -> List[str]:
+    """
+    Apply pending migrations.
+
+    Once the time budget runs out no further migration, index build or
+    backfill batch is started.  A migration interrupted by the budget is not
+    recorded, so the next call runs it again, see pending_versions.  Nothing
+    is applied while another call holds the migration lock.
+
+    Parameters:
+    reapply (bool) Apply every migration, including those already recorded
+    time_budget (float) Seconds after which migrate stops, unlimited by default
+
+    Returns:
+    applied (list) The versions applied
+
+    """
+    global deadline
+    start = time.monotonic()
+    versions = []
+    with migration_lock(start) as locked:
+        if not locked:
+            print("Migrations are being applied by another session")
+            return versions
+        applied = [] if reapply else applied_versions()
+        if reapply:
+            execute_statement(schema_migrations)
+        if time_budget is not None:
+            deadline = start + time_budget
+        try:
+            for migration in migrations():
+                if version(migration) in applied:
+                    continue
+                check_deadline()
+                print(f"Applying migration {migration.__name__}")
+                if getattr(migration, "transactional", True):
+                    with transaction() as transaction_id:
+                        apply(migration, transaction_id)
+                else:
+                    apply(migration)
+                versions.append(version(migration))
+        except MigrationTimeout:
+            print("Migration time budget exhausted, the rest are left for the next run")
+        finally:
+            deadline = None
+    return versions
+
+
+def relkind(table: str) -> Optional[str]:
+    response = execute_statement(
+        "SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:table)",
+        [string_parameter("table", table)],
+    )
+    records = response["records"]
+    return records[0][0]["stringValue"] if records else None
+
+
+def index_valid(name: str) -> Optional[bool]:
+    """Whether an index is valid, None if it does not exist."""
+    response = execute_statement(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)",
+        [string_parameter("name", name)],
+    )
+    records = response["records"]
+    return records[0][0]["booleanValue"] if records else None
+
+
+def partitions(table: str) -> List[str]:
+    response = execute_statement(
+        "SELECT inhrelid::regclass::text FROM pg_inherits"
+        + " WHERE inhparent = to_regclass(:table) ORDER BY 1",
+        [string_parameter("table", table)],
+    )
+    return [record[0]["stringValue"] for record in response["records"]]
+
+
+def is_empty(table: str) -> bool:
+    response = execute_statement(f"SELECT NOT EXISTS (SELECT FROM {table})")
+    return response["records"][0][0]["booleanValue"]
+
+
+def statement_running(sql: str) -> bool:
+    """Whether another session is running the statement."""
+    response = execute_statement(
+        "SELECT EXISTS (SELECT FROM pg_stat_activity WHERE query = :sql"
+        + " AND state = 'active' AND pid <> pg_backend_pid())",
+        [string_parameter("sql", sql)],
+    )
+    return response["records"][0][0]["booleanValue"]
+
+
+def wait_for(sql: str):
+    """Wait until no other session is running the statement."""
+    while statement_running(sql):
+        check_deadline()
+        time.sleep(POLL_SECONDS)
+
+
+def execute_ddl(sql: str):
+    """
+    Execute a DDL statement which may outlast the Data API's call timeout.
+
+    The statement is run with continueAfterTimeout, so a timed out call
+    leaves it running in the database, where it is waited for.
+
+    Parameters:
+    sql (str) The statement, such as a concurrent index build
+
+    """
+    try:
+        execute_statement(sql, continueAfterTimeout=True)
+    except ClientError as error:
+        if error.response.get("Error", {}).get("Code") != STATEMENT_TIMEOUT_ERROR:
+            raise
+        wait_for(sql)
+
+
+def create_index(name: str, table: str, definition: str):
+    """
+    Create an index without blocking writes to the table.
+
+    Partitioned tables cannot be indexed concurrently, so their index is
+    created on the parent only and each partition's index is built
+    concurrently and attached to it.  Partition indexes are named after the
+    partition, so name must start with the table name.  An invalid index
+    left by an interrupted build is rebuilt, once a build still running
+    from an earlier migration run has finished.  Empty tables, such as new
+    databases and future partitions, are indexed directly.
+
+    Parameters:
+    name (str) The index name
+    table (str) The table to index
+    definition (str) Columns and an optional predicate, e.g. (ts) WHERE historic
+
+    """
+    if not name.startswith(table):
+        raise ValueError(f"Index {name} is not named after {table}")
+    check_deadline()
+    build = f"CREATE INDEX CONCURRENTLY {name} ON {table} {definition}"
+    wait_for(build)
+    valid = index_valid(name)
+    if valid:
+        return
+    if valid is None and is_empty(table):
+        execute_statement(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}")
+    elif relkind(table) == "p":
+        execute_statement(
+            f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} {definition}"
+        )
+        for partition in partitions(table):
+            partition_index = partition + name[len(table) :]
+            create_index(partition_index, partition, definition)
+            execute_statement(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+    else:
+        if valid is False:
+            execute_ddl(f"DROP INDEX CONCURRENTLY {name}")
+        execute_ddl(build)
+        if not index_valid(name):
+            raise RuntimeError(f"Building index {name} failed")
+
+
+def backfill(table: str, assignments: str, where: str, batch_size: int = 10000) -> int:
+    """
+    Update the rows matching where in batches of batch_size ids.
+
+    Each batch is its own statement over a range of ids found through the
+    primary key, so a statement reads and locks at most batch_size rows
+    however few of the table's rows match.  The assignments must make where
+    false for the updated rows, so an interrupted backfill can be run again.
+
+    Parameters:
+    table (str) The table to update
+    assignments (str) The SET clause, e.g. job_status = jobinfo->>'Status'
+    where (str) The condition selecting rows still to update
+    batch_size (int) Ids updated per statement
+
+    Returns:
+    updated (int) The number of rows updated
+
+    """
+    first, last = execute_statement(f"SELECT min(id), max(id) FROM {table}")["records"][0]
+    if first.get("isNull"):
+        return 0
+    sql = (
+        f"UPDATE {table} SET {assignments}"
+        + " WHERE id >= :low::bigint AND id < :high::bigint"
+        + f" AND ({where})"
+    )
+    updated = 0
+    for low in range(first["longValue"], last["longValue"] + 1, batch_size):
+        check_deadline()
+        response = execute_statement(
+            sql,
+            [long_parameter("low", low), long_parameter("high", low + batch_size)],
+        )
+        updated += response["numberOfRecordsUpdated"]
+    return updated
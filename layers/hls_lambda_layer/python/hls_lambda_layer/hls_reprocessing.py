@@ -0,0 +1,299 @@
+"""
+Keyset paginated draining of the reprocessing backlogs.
+
+The retry Lambdas select their rows in priority order, oldest acquisitions
+first and then the least retried granules, a page at a time.  Each run starts
+from the front of the backlog, each page after the last row of the one
+before, and keeps dispatching pages until it reaches the end of the backlog
+or uses up its time or submission budget.  Rows dispatched by earlier runs
+are skipped by their claims, so starting from the front rather than from
+where the last run stopped keeps newly failed old acquisitions and retried
+granules in priority order.  The submission budget is the run's quota, set
+for each pipeline and branch so that one backlog cannot take the whole
+compute environment.
+
+Rows are only selected once the next_retry_at the loggers schedule with
+exponential backoff has passed.  The page query claims the rows it selects
+by setting their claimed_until lease, see claim_page, and the loggers
+release the claim when the retry's job is logged.  A granule whose retry is
+still queued or running is not selected again by an overlapping or later run
+until its lease expires.  The claims of rows whose execution could not be
+started are released straight away, see release_claims.
+
+Each retry Lambda describes its backlog with a Backlog, its table, selection
+and how its rows are decoded into step function inputs, and calls reprocess,
+which dispatches the pages in executions sized to the Step Functions limits
+from a rate limited thread pool, see hls_step_functions.
+"""
+
+import json
+import os
+import time
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from hls_lambda_layer.hls_db import (
+    boolean_parameter,
+    execute_statement,
+    historic_value,
+    long_parameter,
+    string_parameter,
+)
+from hls_lambda_layer.hls_step_functions import chunk_size, start_executions
+
+TIME_BUDGET = float(os.getenv("TIME_BUDGET", "600"))
+SUBMISSION_BUDGET = int(os.getenv("SUBMISSION_BUDGET", "20000"))
+LEASE = int(os.getenv("LEASE", "86400"))
+
+# A cursor is the (acquisition, run_count, id) priority key of the last row
+# dispatched by a run.  START sorts before every row.
+Cursor = Tuple[str, int, int]
+START = ("-infinity", -1, 0)
+
+
+def claim_page(table: str, columns: str, conditions: str, assignments: str = "") -> str:
+    """
+    A backlog page query which claims the rows it selects.
+
+    The next page in priority order of due, unclaimed rows in the
+    :historic_value branch matching conditions is locked, skipping rows
+    locked by a concurrent run, and their claimed_until lease set to :lease
+    seconds from now in the same statement.  The page is updated through the
+    primary key, by id and acquisition arrays rather than a join, so the plan
+    never scans the table.  The rows' priority keys follow columns, which
+    are returned as updated by assignments.
+
+    Parameters:
+    table (str) The log table
+    columns (str) The columns returned for each row
+    conditions (str) The backlog's conditions other than its historic branch
+    assignments (str) Further assignments of the claim's SET clause
+
+    Returns:
+    sql (str) The page query for drain
+
+    """
+    claim = "claimed_until = now() + make_interval(secs => :lease::integer)"
+    if assignments:
+        claim += f", {assignments}"
+    return (
+        f"WITH page AS (SELECT id, acquisition FROM {table}"
+        + f" WHERE {conditions}"
+        + " AND historic = :historic_value::boolean"
+        + " AND (next_retry_at IS NULL OR next_retry_at <= now())"
+        + " AND (claimed_until IS NULL OR claimed_until < now())"
+        + " AND (acquisition, run_count, id) > (:after_acquisition::date,"
+        + " :after_run_count::integer, :after_id::bigint)"
+        + " ORDER BY acquisition, run_count, id LIMIT :page_size::integer"
+        + " FOR UPDATE SKIP LOCKED),"
+        + f" claimed AS (UPDATE {table} SET {claim}"
+        + " WHERE historic = :historic_value::boolean"
+        + " AND id = ANY(ARRAY(SELECT id FROM page))"
+        + " AND acquisition = ANY(ARRAY(SELECT acquisition FROM page))"
+        + f" RETURNING {columns}, acquisition AS key_acquisition,"
+        + " run_count AS key_run_count, id AS key_id)"
+        + " SELECT * FROM claimed ORDER BY key_acquisition, key_run_count, key_id;"
+    )
+
+
+def release_claims(table: str, records: List[List[Dict]], historic: bool):
+    """
+    Release the claims of rows claimed by claim_page but not dispatched.
+
+    Parameters:
+    table (str) The log table
+    records (list) Records returned by the claim_page query
+    historic (bool) The branch the rows were claimed from
+
+    """
+    execute_statement(
+        f"UPDATE {table} SET claimed_until = NULL"
+        + " WHERE historic = :historic_value::boolean"
+        + " AND id = ANY(string_to_array(:ids, ',')::bigint[])"
+        + " AND acquisition = ANY(string_to_array(:acquisitions, ',')::date[])",
+        [
+            boolean_parameter("historic_value", historic),
+            string_parameter(
+                "ids", ",".join(str(record[-1]["longValue"]) for record in records)
+            ),
+            string_parameter(
+                "acquisitions",
+                ",".join(record[-3]["stringValue"] for record in records),
+            ),
+        ],
+    )
+
+
+def drain(
+    name: str,
+    sql: str,
+    sql_parameters: List[Dict],
+    dispatch: Callable[[List[List[Dict]]], List],
+    page_size: int,
+    time_budget: float = None,
+    submission_budget: int = None,
+    lease: int = None,
+    clock: Callable[[], float] = time.monotonic,
+) -> List:
+    """
+    Dispatch a backlog a page at a time from its front.
+
+    Parameters:
+    name (str) The backlog name, for logging
+    sql (str) The backlog query from claim_page
+    sql_parameters (list) Data API parameters of the query other than the
+    cursor, page_size and lease
+    dispatch (function) Called with each page of records, returns a list of errors
+    page_size (int) Records per page
+    time_budget (float) Seconds after which no further page is started, by
+    default TIME_BUDGET
+    submission_budget (int) Records dispatched at most, by default
+    SUBMISSION_BUDGET
+    lease (int) Seconds for which dispatched rows are claimed, by default LEASE
+
+    Returns:
+    errors (list) The errors returned by dispatch
+
+    """
+    if time_budget is None:
+        time_budget = TIME_BUDGET
+    if submission_budget is None:
+        submission_budget = SUBMISSION_BUDGET
+    if lease is None:
+        lease = LEASE
+    start = clock()
+    cursor = START
+    submitted = 0
+    errors = []
+    while True:
+        limit = min(page_size, submission_budget - submitted)
+        acquisition, run_count, last_id = cursor
+        response = execute_statement(
+            sql,
+            sql_parameters
+            + [
+                string_parameter("after_acquisition", acquisition),
+                long_parameter("after_run_count", run_count),
+                long_parameter("after_id", last_id),
+                long_parameter("page_size", limit),
+                long_parameter("lease", lease),
+            ],
+        )
+        records = response["records"]
+        if records:
+            errors.extend(dispatch(records))
+            submitted += len(records)
+            acquisition, run_count, last_id = records[-1][-3:]
+            cursor = (
+                acquisition["stringValue"],
+                run_count["longValue"],
+                last_id["longValue"],
+            )
+        if len(records) < limit:
+            # The end of the backlog.
+            break
+        if submitted >= submission_budget or clock() - start >= time_budget:
+            break
+    print(f"{name}: dispatched {submitted} records, stopped at {cursor}")
+    return errors
+
+
+def chunk(items: List, size: int) -> Iterator[List]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class Backlog:
+    """
+    A retry Lambda's backlog and how its rows are dispatched.
+
+    Parameters:
+    name (str) The backlog name, suffixed with _historic for the historic branch
+    table (str) The log table
+    columns (str) The columns selected for each row
+    conditions (str) The backlog's conditions other than its historic branch and
+    retry limit
+    decode (function) Converts a selected record to a step function input item
+    execution_input (function) Builds an execution's input from a chunk of items
+    page_size (int) Rows claimed and dispatched at a time
+    events_per_item (int) History events of one item's iteration of the state
+    machine's Map state, which sizes the executions, see
+    hls_step_functions.chunk_size
+    assignments (str) Assignments made to the rows as they are claimed, such as
+    hls_failures.escalate_memory
+    """
+
+    def __init__(
+        self,
+        name: str,
+        table: str,
+        columns: str,
+        conditions: str,
+        decode: Callable[[List[Dict]], Dict],
+        execution_input: Callable[[List[Dict]], Dict],
+        page_size: int,
+        events_per_item: int,
+        assignments: str = "",
+    ):
+        self.name = name
+        self.table = table
+        self.columns = columns
+        self.conditions = conditions
+        self.decode = decode
+        self.execution_input = execution_input
+        self.page_size = page_size
+        self.events_per_item = events_per_item
+        self.assignments = assignments
+
+
+def reprocess(
+    backlog: Backlog,
+    sql_parameters: List[Dict],
+    client,
+    state_machine: str,
+):
+    """
+    Dispatch a backlog's due rows to its state machine.
+
+    The historic branch is selected by the HISTORIC environment variable and
+    rows are retried until their run_count reaches RETRY_LIMIT.  Executions
+    hold no more items than the state machine's Map MaxConcurrency, from
+    MAX_CONCURRENCY.  The claims of the rows of executions which could not be
+    started are released, so the next run retries them.
+
+    Parameters:
+    backlog (Backlog) The backlog
+    sql_parameters (list) Data API parameters of the backlog's conditions
+    client The stepfunctions client
+    state_machine (str) The state machine ARN
+
+    """
+    historic = historic_value()
+    conditions = backlog.conditions + " AND run_count < :retry_limit::integer"
+    sql = claim_page(backlog.table, backlog.columns, conditions, backlog.assignments)
+    print(sql)
+    sql_parameters = sql_parameters + [
+        long_parameter("retry_limit", int(os.getenv("RETRY_LIMIT"))),
+        boolean_parameter("historic_value", historic),
+    ]
+
+    envelope_bytes = len(json.dumps(backlog.execution_input([])))
+    max_concurrency = int(os.getenv("MAX_CONCURRENCY", "0"))
+
+    def dispatch(records):
+        items = [backlog.decode(record) for record in records]
+        size = chunk_size(items, backlog.events_per_item, envelope_bytes, max_concurrency)
+        errors = start_executions(
+            client,
+            state_machine,
+            [backlog.execution_input(items_chunk) for items_chunk in chunk(items, size)],
+        )
+        record_chunks = list(chunk(records, size))
+        failed = [record for index in errors for record in record_chunks[index]]
+        if failed:
+            release_claims(backlog.table, failed, historic)
+        return list(errors.values())
+
+    name = f"{backlog.name}_historic" if historic else backlog.name
+    errors = drain(name, sql, sql_parameters, dispatch, page_size=backlog.page_size)
+    if len(errors) > 0:
+        raise NameError("A step function execution error occurred")
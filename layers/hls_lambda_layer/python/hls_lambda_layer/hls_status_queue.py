@@ -0,0 +1,101 @@
+"""
+Optional write-behind buffer for logging database status writes.
+
+When STATUS_QUEUE_URL is set, status statements are queued instead of being
+executed on the critical path of a pipeline execution, and a flusher
+applies them to the database in batches.
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List
+
+import boto3
+from hls_lambda_layer.hls_db import (
+    batch_execute_statement,
+    database_errors,
+    execute_statement,
+)
+
+# Created on first use and then reused for the life of the container.
+sqs_client = None
+
+# Data API batch_execute_statement accepts at most 1000 parameter sets.
+MAX_PARAMETER_SETS = 1000
+
+
+def get_sqs_client():
+    global sqs_client
+    if sqs_client is None:
+        sqs_client = boto3.client("sqs")
+    return sqs_client
+
+
+def write_statement(sql: str, sql_parameters: List[Dict] = []):
+    """
+    Queue a status statement when write-behind is enabled, else execute it.
+
+    Parameters:
+    sql (str) The SQL statement
+    sql_parameters (list) Data API parameters for the statement
+
+    """
+    queue_url = os.getenv("STATUS_QUEUE_URL")
+    if queue_url:
+        get_sqs_client().send_message(
+            QueueUrl=queue_url,
+            MessageBody=json.dumps({"sql": sql, "parameters": sql_parameters}),
+        )
+    else:
+        execute_statement(sql, sql_parameters=sql_parameters)
+
+
+def flush_records(records: Iterable[Dict]) -> List[str]:
+    """
+    Apply queued status statements with one batch call per distinct SQL.
+
+    A batch which cannot be applied is retried a statement at a time, so a
+    message which cannot be applied does not send the valid messages batched
+    with it back to the queue and, after repeated deliveries, to its
+    dead-letter queue.
+
+    Parameters:
+    records (list) SQS event records holding queued statements
+
+    Returns:
+    failed (list) messageIds of records which could not be applied
+
+    """
+    batches: Dict[str, List[Dict]] = {}
+    for record in records:
+        body = json.loads(record["body"])
+        batches.setdefault(body["sql"], []).append(
+            {"messageId": record["messageId"], "parameters": body["parameters"]}
+        )
+
+    errors = database_errors()
+    failed = []
+    for sql, messages in batches.items():
+        for start in range(0, len(messages), MAX_PARAMETER_SETS):
+            chunk = messages[start : start + MAX_PARAMETER_SETS]
+            try:
+                batch_execute_statement(
+                    sql, [message["parameters"] for message in chunk]
+                )
+            except errors as e:
+                print(e)
+                failed.extend(apply_messages(sql, chunk))
+    return failed
+
+
+def apply_messages(sql: str, messages: List[Dict]) -> List[str]:
+    """Apply messages one at a time, returning the messageIds which fail."""
+    errors = database_errors()
+    failed = []
+    for message in messages:
+        try:
+            execute_statement(sql, sql_parameters=message["parameters"])
+        except errors as e:
+            print(e)
+            failed.append(message["messageId"])
+    return failed
@@ -0,0 +1,179 @@
+"""
+Parallel, rate limited Step Functions execution starts.
+
+StartExecution is throttled per account and region by a token bucket of 800
+tokens refilled at 150 per second, more in the largest regions.  The
+reprocessing Lambdas start their chunk executions from a thread pool through
+a local token bucket kept below that refill rate, so per granule executions
+started elsewhere still have headroom, and retry throttled starts with
+jittered exponential backoff.
+
+Each execution's history is limited to 25,000 events and its input and each
+state's output to 256 KB.  chunk_size fits as many items into an execution as
+both limits allow, from an estimate of the history events each item's Map
+iteration adds and the size of the items, and no more than the Map state's
+MaxConcurrency, so that every item of an execution runs at once.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from botocore.exceptions import ClientError
+from hls_lambda_layer.hls_db import backoff_delay
+
+START_RATE = float(os.getenv("HLS_START_EXECUTION_RATE", "50"))
+START_BURST = int(os.getenv("HLS_START_EXECUTION_BURST", "100"))
+WORKERS = int(os.getenv("HLS_START_EXECUTION_WORKERS", "10"))
+MAX_ATTEMPTS = int(os.getenv("HLS_START_EXECUTION_MAX_ATTEMPTS", "6"))
+
+THROTTLING_ERRORS = {"ThrottlingException", "TooManyRequestsException"}
+
+MAX_HISTORY_EVENTS = 25000
+MAX_PAYLOAD_BYTES = 262144
+# Events of an execution outside its Map iterations.
+EXECUTION_EVENTS = 100
+# Share of the limits used, for items whose iterations retry more than estimated.
+HEADROOM = 0.8
+
+
+class TokenBucket:
+    """A thread safe bucket of up to capacity tokens refilled at rate per second."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, waiting for it to be refilled if the bucket is empty.
+
+        Tokens are reserved before waiting, so the bucket goes negative and
+        concurrent callers queue up behind each other rather than competing
+        for each refilled token.
+        """
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate
+        if wait > 0:
+            self.sleep(wait)
+
+
+def chunk_size(
+    items: List[Dict],
+    events_per_item: int,
+    envelope_bytes: int = 0,
+    max_concurrency: int = None,
+) -> int:
+    """
+    Items per execution within the history event and payload limits.
+
+    The Map iterations echo their items into the Map state's output, so the
+    largest item bounds both the execution input and the Map output.
+
+    Parameters:
+    items (list) The items to be split into executions
+    events_per_item (int) History events of one Map iteration
+    envelope_bytes (int) Size of the execution input without its items
+    max_concurrency (int) The Map state's MaxConcurrency, where 0 is unlimited
+
+    Returns:
+    size (int) Items per execution, at least 1
+
+    """
+    by_events = (MAX_HISTORY_EVENTS * HEADROOM - EXECUTION_EVENTS) // events_per_item
+    # Each item is followed by a separating comma and space.
+    item_bytes = max((len(json.dumps(item)) for item in items), default=0) + 2
+    by_bytes = (MAX_PAYLOAD_BYTES * HEADROOM - envelope_bytes) // item_bytes
+    size = min(by_events, by_bytes)
+    if max_concurrency:
+        size = min(size, max_concurrency)
+    return max(1, int(size))
+
+
+def is_throttled(error: ClientError) -> bool:
+    return error.response.get("Error", {}).get("Code") in THROTTLING_ERRORS
+
+
+def start_execution(client, state_machine: str, input: Dict, bucket: TokenBucket):
+    """
+    Start an execution, retrying throttled calls.
+
+    Parameters:
+    client The stepfunctions client
+    state_machine (str) The state machine ARN
+    input (dict) The execution input
+    bucket (TokenBucket) The limiter to take a token from before each call
+
+    Returns:
+    response (dict) The start_execution response
+
+    """
+    attempt = 0
+    while True:
+        bucket.acquire()
+        try:
+            return client.start_execution(
+                stateMachineArn=state_machine, input=json.dumps(input)
+            )
+        except ClientError as error:
+            attempt += 1
+            if attempt >= MAX_ATTEMPTS or not is_throttled(error):
+                raise
+            time.sleep(backoff_delay(attempt - 1))
+
+
+def start_executions(
+    client,
+    state_machine: str,
+    inputs: List[Dict],
+    bucket: TokenBucket = None,
+    workers: int = None,
+) -> Dict[int, ClientError]:
+    """
+    Start an execution for each input from a thread pool.
+
+    Parameters:
+    client The stepfunctions client
+    state_machine (str) The state machine ARN
+    inputs (list) The execution inputs
+    bucket (TokenBucket) The limiter, by default HLS_START_EXECUTION_RATE and
+    HLS_START_EXECUTION_BURST
+    workers (int) Threads starting executions, by default HLS_START_EXECUTION_WORKERS
+
+    Returns:
+    errors (dict) Errors of the executions which could not be started, by the
+    index of their input
+
+    """
+    bucket = bucket or TokenBucket(START_RATE, START_BURST)
+
+    def start(input):
+        try:
+            start_execution(client, state_machine, input, bucket)
+        except ClientError as error:
+            print(error)
+            return error
+
+    with ThreadPoolExecutor(max_workers=workers or WORKERS) as executor:
+        results = list(executor.map(start, inputs))
+    return {index: error for index, error in enumerate(results) if error is not None}
@@ -0,0 +1,84 @@
+"""
+LaSRC LAADS Auxiliary Data availability.
+
+Dates are parsed with the following patterns
+date as yyyy-mm-dd
+doy as yyyydoy
+landsat as LC08_L1TP_170071_20190303_20190309_01_T1
+sentinel as S2B_MSIL1C_20190301T075849_N0207_R035_T35HKD_20190301T121820
+"""
+
+import re
+from datetime import date
+from typing import Dict
+
+import boto3
+from botocore.errorfactory import ClientError
+
+# Created on first use and then reused for the life of the container.
+s3_client = None
+
+
+def get_s3_client():
+    global s3_client
+    if s3_client is None:
+        s3_client = boto3.client("s3")
+    return s3_client
+
+
+def key_pattern_exists(bucket: str, key_pattern: str):
+    try:
+        response = get_s3_client().list_objects_v2(Bucket=bucket, Prefix=key_pattern)
+        if "Contents" in response:
+            return True
+        else:
+            return False
+    except ClientError as e:
+        print(e)
+
+
+def getyyyydoy(date_str: str):
+    # Setup regular expressions for getting date
+    dmy = re.compile("(20[0-9][0-9])-?([0-9][0-9])-?([0-9][0-9])")
+    ydoy = re.compile("(20[0-9][0-9])-?([0-9][0-9][0-9])$")
+    matches = dmy.search(date_str)
+    if matches is not None:
+        year = int(matches[1])
+        month = int(matches[2])
+        day = int(matches[3])
+        d = date(year, month, day)
+        return d.strftime("%Y%j"), str(year)
+    else:
+        matches = ydoy.search(date_str)
+        year = matches[1]
+        doy = matches[2]
+        print(doy)
+        return f"{year}{doy}", str(year)
+
+
+def laads_available(date_str: str, bucket: str) -> Dict:
+    """
+    Check if the LAADS auxiliary data for a date is in the bucket.
+
+    Parameters:
+    date_str (str) A date, year and day of year or granule id
+    bucket (str) The LAADS auxiliary data bucket
+
+    Returns:
+    output (dict) The checked patterns and whether the data is available
+
+    """
+    ydoy, year = getyyyydoy(date_str)
+    vj_pattern = f"lasrc_aux/LADS/{year}/VJ104ANC.A{ydoy}"
+    print(f"------{bucket}    {vj_pattern} ------")
+    vj_exists = key_pattern_exists(bucket, vj_pattern)
+    vnp_pattern = f"lasrc_aux/LADS/{year}/VNP04ANC.A{ydoy}"
+    vnp_exists = key_pattern_exists(bucket, vnp_pattern)
+    return {
+        "granule": date_str,
+        "year": year,
+        "doy": ydoy,
+        "bucket": bucket,
+        "pattern": f"{vj_pattern} {vnp_pattern}",
+        "available": bool(vj_exists or vnp_exists),
+    }
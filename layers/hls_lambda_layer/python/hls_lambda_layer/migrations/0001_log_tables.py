@@ -0,0 +1,123 @@
+"""Create the log tables and add their columns."""
+
+sql = """
+-- The log tables are partitioned by historic and then by acquisition month,
+-- see 0003_log_partitions.  Keys must include the partition columns.
+-- Databases created before partitioning keep their unpartitioned tables
+-- until scripts/partition_log_tables.py migrates them.
+
+CREATE TABLE IF NOT EXISTS landsat_mgrs_log (
+    id bigserial,
+    ts timestamptz default now() not null,
+    path varchar(3) not null,
+    mgrs varchar(5) not null,
+    acquisition date not null,
+    jobinfo jsonb,
+    historic boolean default false not null,
+    primary key (id, historic, acquisition),
+    constraint no_dupe_mgrs unique(path, mgrs, acquisition, historic)
+) PARTITION BY LIST (historic);
+
+CREATE TABLE IF NOT EXISTS landsat_ac_log (
+    id bigserial,
+    ts timestamptz default now() not null,
+    path varchar(3) not null,
+    row varchar(3) not null,
+    acquisition date not null,
+    jobid text not null,
+    jobinfo jsonb,
+    historic boolean default false not null,
+    primary key (id, historic, acquisition),
+    constraint no_dupe_pathrowdate unique(path, row, acquisition, historic)
+) PARTITION BY LIST (historic);
+
+ALTER TABLE landsat_ac_log ADD COLUMN IF NOT EXISTS scene_id VARCHAR(100);
+ALTER TABLE landsat_ac_log ALTER COLUMN jobid DROP NOT NULL;
+
+DO $$
+BEGIN
+  IF EXISTS(SELECT *
+    FROM information_schema.columns
+    WHERE table_name='eventlog' and column_name='event')
+  THEN
+      ALTER TABLE eventlog RENAME COLUMN event TO jobinfo;
+  END IF;
+END $$;
+
+ALTER TABLE IF EXISTS eventlog RENAME TO sentinel_log;
+
+CREATE TABLE IF NOT EXISTS sentinel_log (
+    id bigserial,
+    ts timestamptz default now() not null,
+    jobinfo jsonb,
+    granule varchar,
+    run_count integer,
+    acquisition date not null,
+    historic boolean default false not null,
+    primary key (id, historic, acquisition),
+    constraint sentinel_log_granule_key unique(granule, acquisition, historic)
+) PARTITION BY LIST (historic);
+
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS granule VARCHAR;
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS run_count INTEGER;
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS acquisition DATE;
+
+DROP VIEW IF EXISTS sentinel_granule_log;
+
+DROP FUNCTION IF EXISTS granule(IN event jsonb, OUT granule text);
+
+ALTER TABLE landsat_ac_log ADD COLUMN IF NOT EXISTS run_count INTEGER;
+ALTER TABLE landsat_mgrs_log ADD COLUMN IF NOT EXISTS run_count INTEGER;
+
+DROP VIEW IF EXISTS landsat_ac_granule_log;
+DROP VIEW IF EXISTS landsat_mgrs_granule_log;
+
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS historic BOOLEAN;
+ALTER TABLE landsat_ac_log ADD COLUMN IF NOT EXISTS historic BOOLEAN;
+ALTER TABLE landsat_mgrs_log ADD COLUMN IF NOT EXISTS historic BOOLEAN;
+
+
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS succeeded BOOLEAN;
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS expected_error BOOLEAN;
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS unexpected_error BOOLEAN;
+
+DO $$
+BEGIN
+  IF to_regclass('sentinel_log_granule_key') IS NULL
+  THEN
+      -- Keep the most processed, then most recent, row for each granule.
+      DELETE FROM sentinel_log a USING sentinel_log b
+      WHERE a.granule = b.granule
+      AND (COALESCE(a.run_count, 0), a.id) < (COALESCE(b.run_count, 0), b.id);
+      CREATE UNIQUE INDEX sentinel_log_granule_key ON sentinel_log (granule);
+  END IF;
+END $$;
+
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS exit_code INTEGER;
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS job_status TEXT;
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS started_at TIMESTAMPTZ;
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS stopped_at TIMESTAMPTZ;
+ALTER TABLE landsat_ac_log ADD COLUMN IF NOT EXISTS exit_code INTEGER;
+ALTER TABLE landsat_ac_log ADD COLUMN IF NOT EXISTS job_status TEXT;
+ALTER TABLE landsat_ac_log ADD COLUMN IF NOT EXISTS started_at TIMESTAMPTZ;
+ALTER TABLE landsat_ac_log ADD COLUMN IF NOT EXISTS stopped_at TIMESTAMPTZ;
+ALTER TABLE landsat_mgrs_log ADD COLUMN IF NOT EXISTS exit_code INTEGER;
+ALTER TABLE landsat_mgrs_log ADD COLUMN IF NOT EXISTS job_status TEXT;
+ALTER TABLE landsat_mgrs_log ADD COLUMN IF NOT EXISTS started_at TIMESTAMPTZ;
+ALTER TABLE landsat_mgrs_log ADD COLUMN IF NOT EXISTS stopped_at TIMESTAMPTZ;
+
+-- See hls_failures.
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS failure_class TEXT;
+ALTER TABLE landsat_ac_log ADD COLUMN IF NOT EXISTS failure_class TEXT;
+ALTER TABLE landsat_mgrs_log ADD COLUMN IF NOT EXISTS failure_class TEXT;
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS memory INTEGER;
+ALTER TABLE landsat_ac_log ADD COLUMN IF NOT EXISTS memory INTEGER;
+
+-- See hls_reprocessing.claim_page and hls_batch_utils.NEXT_RETRY_AT.
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMPTZ;
+ALTER TABLE landsat_ac_log ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMPTZ;
+ALTER TABLE landsat_mgrs_log ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMPTZ;
+ALTER TABLE sentinel_log ADD COLUMN IF NOT EXISTS next_retry_at TIMESTAMPTZ;
+ALTER TABLE landsat_ac_log ADD COLUMN IF NOT EXISTS next_retry_at TIMESTAMPTZ;
+ALTER TABLE landsat_mgrs_log ADD COLUMN IF NOT EXISTS next_retry_at TIMESTAMPTZ;
+"""
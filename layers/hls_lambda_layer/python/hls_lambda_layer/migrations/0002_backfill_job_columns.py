@@ -0,0 +1,24 @@
+"""Backfill the job columns of rows logged before the loggers wrote them."""
+
+from hls_lambda_layer.hls_migrations import backfill
+
+transactional = False
+
+assignments = """
+exit_code = CASE WHEN jsonb_typeof(jobinfo->'Container'->'ExitCode') = 'number'
+  THEN (jobinfo->'Container'->>'ExitCode')::integer END,
+job_status = jobinfo->>'Status',
+started_at = CASE WHEN jsonb_typeof(jobinfo->'StartedAt') = 'number'
+  THEN to_timestamp((jobinfo->>'StartedAt')::bigint / 1000.0) END,
+stopped_at = CASE WHEN jsonb_typeof(jobinfo->'StoppedAt') = 'number'
+  THEN to_timestamp((jobinfo->>'StoppedAt')::bigint / 1000.0) END
+"""
+
+
+def run(transaction_id):
+    for table in ["sentinel_log", "landsat_ac_log", "landsat_mgrs_log"]:
+        backfill(
+            table,
+            assignments,
+            "job_status IS NULL AND jobinfo->>'Status' IS NOT NULL",
+        )
@@ -0,0 +1,69 @@
+"""Partition the log tables by acquisition date."""
+
+sql = """
+-- Create the forward and historic branches of each partitioned log table
+-- with a default partition and acquisition partitions from the table's first
+-- year until months_ahead months from now.  Years before 2026 get one
+-- partition each, later acquisitions are partitioned by month.  Existing
+-- partitions are left alone, so this is also run on a schedule to add future
+-- months.  A period whose rows already landed in the default partition is
+-- skipped with a warning.
+CREATE OR REPLACE FUNCTION create_log_partitions(months_ahead integer)
+RETURNS integer AS $$
+DECLARE
+  monthly_from constant date := date '2026-01-01';
+  log_table text;
+  first_period date;
+  period date;
+  period_end date;
+  branch text;
+  branch_value boolean;
+  branch_table text;
+  partition text;
+  created integer := 0;
+BEGIN
+  FOR log_table, first_period IN
+    VALUES ('sentinel_log', date '2015-01-01'),
+      ('landsat_ac_log', date '2013-01-01'),
+      ('landsat_mgrs_log', date '2013-01-01')
+  LOOP
+    CONTINUE WHEN (SELECT relkind FROM pg_class
+      WHERE oid = to_regclass(quote_ident(log_table))) IS DISTINCT FROM 'p';
+    FOR branch, branch_value IN VALUES ('forward', false), ('historic', true)
+    LOOP
+      branch_table := log_table || '_' || branch;
+      EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I'
+        ' FOR VALUES IN (%L) PARTITION BY RANGE (acquisition)',
+        branch_table, log_table, branch_value);
+      EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF %I DEFAULT',
+        branch_table || '_default', branch_table);
+      period := first_period;
+      WHILE period <= date_trunc('month', now()) + make_interval(months => months_ahead)
+      LOOP
+        IF period < monthly_from THEN
+          partition := branch_table || '_' || to_char(period, 'YYYY');
+          period_end := period + interval '1 year';
+        ELSE
+          partition := branch_table || '_' || to_char(period, 'YYYYMM');
+          period_end := period + interval '1 month';
+        END IF;
+        IF to_regclass(quote_ident(partition)) IS NULL THEN
+          BEGIN
+            EXECUTE format(
+              'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+              partition, branch_table, period, period_end);
+            created := created + 1;
+          EXCEPTION WHEN check_violation THEN
+            RAISE WARNING 'Rows for % are in the default partition', partition;
+          END;
+        END IF;
+        period := period_end;
+      END LOOP;
+    END LOOP;
+  END LOOP;
+  RETURN created;
+END $$ LANGUAGE plpgsql;
+
+SELECT create_log_partitions(3);
+"""
@@ -0,0 +1,67 @@
+"""
+Classify the jobs logged before the loggers recorded failure_class.
+
+Rows are classified from their job columns and jobinfo as
+hls_failures.classify would.
+"""
+
+from hls_lambda_layer.hls_failures import (
+    AC_EXPECTED_EXIT_CODES,
+    EXPECTED_TERMINAL,
+    INPUT_ERROR,
+    OOM,
+    OOM_CONTAINER_REASONS,
+    OOM_EXIT_CODE,
+    SUCCESS,
+    TILING_EXPECTED_EXIT_CODES,
+    TIMEOUT,
+    TIMEOUT_STATUS_REASONS,
+    TRANSIENT_CONTAINER_REASONS,
+    TRANSIENT_INFRA,
+    TRANSIENT_STATUS_REASONS,
+)
+from hls_lambda_layer.hls_migrations import backfill
+
+transactional = False
+
+EXPECTED_EXIT_CODES = {
+    "sentinel_log": AC_EXPECTED_EXIT_CODES,
+    "landsat_ac_log": AC_EXPECTED_EXIT_CODES,
+    "landsat_mgrs_log": TILING_EXPECTED_EXIT_CODES,
+}
+
+
+def status_reason_in(prefixes):
+    return " OR ".join(f"jobinfo->>'StatusReason' LIKE '{p}%'" for p in prefixes)
+
+
+def container_reason_in(prefixes):
+    pattern = "^(" + "|".join(prefixes) + ")"
+    return f"""jsonb_path_exists(jobinfo, '$.**.Reason ? (@ like_regex "{pattern}")')"""
+
+
+def assignments(expected_exit_codes):
+    expected = ", ".join(str(code) for code in expected_exit_codes)
+    return f"""
+failure_class = CASE
+  WHEN job_status = 'SUCCEEDED' THEN '{SUCCESS}'
+  WHEN {status_reason_in(TIMEOUT_STATUS_REASONS)} THEN '{TIMEOUT}'
+  WHEN {status_reason_in(TRANSIENT_STATUS_REASONS)}
+    OR {container_reason_in(TRANSIENT_CONTAINER_REASONS)} THEN '{TRANSIENT_INFRA}'
+  WHEN {container_reason_in(OOM_CONTAINER_REASONS)} THEN '{OOM}'
+  WHEN exit_code IS NULL THEN '{TRANSIENT_INFRA}'
+  WHEN exit_code = 0 THEN '{SUCCESS}'
+  WHEN exit_code = {OOM_EXIT_CODE} THEN '{OOM}'
+  WHEN exit_code IN ({expected}) THEN '{EXPECTED_TERMINAL}'
+  ELSE '{INPUT_ERROR}'
+END
+"""
+
+
+def run(transaction_id):
+    for table, expected_exit_codes in EXPECTED_EXIT_CODES.items():
+        backfill(
+            table,
+            assignments(expected_exit_codes),
+            "failure_class IS NULL AND jobinfo IS NOT NULL",
+        )
@@ -0,0 +1,28 @@
+"""
+Backfill the retry selection keys of rows logged before they were recorded.
+
+The retry Lambdas select by historic and order by acquisition, see
+hls_reprocessing.claim_page, and rows whose keys are NULL never compare
+true, so they would never be retried.  Sentinel acquisitions are taken from
+the granule's sensing date, or the day the row was logged, as
+scripts/partition_log_tables.py does.  Partitioned tables require both keys
+and are skipped.
+"""
+
+from hls_lambda_layer.hls_migrations import backfill, relkind
+
+transactional = False
+
+SENTINEL_ACQUISITION = (
+    "COALESCE(to_date(substring(granule from '_(\\d{8})T'), 'YYYYMMDD'), ts::date)"
+)
+
+
+def run(transaction_id):
+    if relkind("sentinel_log") == "r":
+        backfill(
+            "sentinel_log", f"acquisition = {SENTINEL_ACQUISITION}", "acquisition IS NULL"
+        )
+    for table in ["sentinel_log", "landsat_ac_log", "landsat_mgrs_log"]:
+        if relkind(table) == "r":
+            backfill(table, "historic = false", "historic IS NULL")
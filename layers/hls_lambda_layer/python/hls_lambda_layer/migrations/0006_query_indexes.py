@@ -0,0 +1,48 @@
+"""
+Indexes for the scheduled and per execution queries.
+
+Partial index predicates must match the query predicates exactly for the
+planner to use them, so change both together.  tests/test_query_plans.py
+checks the plans.  The retry indexes are keyed in the order the retry
+Lambdas page through their backlogs, see hls_reprocessing.claim_page, and
+their predicates are the failure classes hls_failures retries.
+"""
+
+from hls_lambda_layer.hls_migrations import create_index
+
+transactional = False
+
+
+def run(transaction_id):
+    # landsat_pathrow_status and check_landsat_pathrow_complete
+    create_index(
+        "landsat_ac_log_succeeded_idx",
+        "landsat_ac_log",
+        "(path, acquisition, row) WHERE job_status = 'SUCCEEDED'",
+    )
+    # put_exit_code_cw_metric
+    for table in ["sentinel_log", "landsat_ac_log", "landsat_mgrs_log"]:
+        create_index(f"{table}_stopped_at_idx", table, "(stopped_at)")
+    # process_sentinel_errors
+    create_index(
+        "sentinel_log_retry_idx",
+        "sentinel_log",
+        "(historic, acquisition, run_count, id, next_retry_at)"
+        + " WHERE failure_class IN ('transient_infra', 'oom', 'timeout', 'input_error')",
+    )
+    # process_landsat_ac_errors
+    create_index(
+        "landsat_ac_log_retry_idx",
+        "landsat_ac_log",
+        "(historic, acquisition, run_count, id, next_retry_at)"
+        + " WHERE failure_class IS NULL"
+        + " OR failure_class IN ('transient_infra', 'oom', 'timeout', 'input_error')",
+    )
+    # process_landsat_mgrs_incompletes
+    create_index(
+        "landsat_mgrs_log_incomplete_idx",
+        "landsat_mgrs_log",
+        "(historic, acquisition, run_count, id, ts, next_retry_at)"
+        + " WHERE failure_class IS NULL OR failure_class IN ('expected_terminal',"
+        + " 'transient_infra', 'oom', 'timeout', 'input_error')",
+    )
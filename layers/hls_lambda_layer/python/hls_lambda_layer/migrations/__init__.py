@@ -0,0 +1 @@
+"""Logging database migrations, applied in name order by hls_migrations."""
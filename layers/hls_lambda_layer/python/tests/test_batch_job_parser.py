@@ -1,4 +1,6 @@
 import json
+import os
+from unittest.mock import patch
 
 import pytest
 from hls_lambda_layer.batch_test_events import (
@@ -7,7 +9,7 @@ from hls_lambda_layer.batch_test_events import (
     batch_failed_event_string_cause,
     batch_succeeded_event,
 )
-from hls_lambda_layer.hls_batch_utils import parse_jobinfo
+from hls_lambda_layer.hls_batch_utils import archive_jobinfo, parse_jobinfo
 
 
 def test_parse_jobinfo_keyError():
@@ -43,3 +45,63 @@ def test_parse_jobinfo_no_exit():
     event = {key: batch_failed_event_string_cause}
     parsed_info = parse_jobinfo(key, event)
     assert parsed_info["exitcode"] == "nocode"
+
+
+def test_parse_jobinfo_job_columns():
+    key = "jobinfo"
+    parsed_info = parse_jobinfo(key, {key: batch_failed_event})
+    assert parsed_info["exit_code"] == 1
+    assert parsed_info["job_status"] == "FAILED"
+    assert parsed_info["started_at"] == "2020-06-06T00:38:48.719000+00:00"
+    assert parsed_info["stopped_at"] == "2020-06-06T00:38:49.450000+00:00"
+
+
+def test_parse_jobinfo_job_columns_missing():
+    key = "jobinfo"
+    parsed_info = parse_jobinfo(key, {key: batch_failed_event_string_cause})
+    assert parsed_info["exit_code"] is None
+    assert parsed_info["job_status"] is None
+    assert parsed_info["started_at"] is None
+    assert parsed_info["stopped_at"] is None
+    parsed_info = parse_jobinfo(key, {key: batch_failed_event_no_exit})
+    assert parsed_info["exit_code"] is None
+    assert parsed_info["job_status"] == "FAILED"
+
+
+def test_parse_jobinfo_compact():
+    key = "jobinfo"
+    parsed_info = parse_jobinfo(key, {key: batch_failed_event})
+    jobinfo = parsed_info["jobinfo"]
+    assert set(jobinfo) == {
+        "JobId",
+        "JobName",
+        "Status",
+        "StatusReason",
+        "CreatedAt",
+        "StartedAt",
+        "StoppedAt",
+        "Container",
+        "Attempts",
+    }
+    assert jobinfo["Container"] == {
+        "ExitCode": 1,
+        "Memory": 12000,
+        "Vcpus": 2,
+        "ResourceRequirements": [],
+    }
+    assert jobinfo["Attempts"][0]["Container"]["ExitCode"] == 1
+    assert "Environment" in parsed_info["rawjobinfo"]["Container"]
+    assert len(parsed_info["jobinfostring"]) < len(batch_failed_event["Cause"]) / 3
+
+
+@patch("hls_lambda_layer.hls_batch_utils.s3_client")
+def test_archive_jobinfo(s3_client):
+    key = "jobinfo"
+    parsed_info = parse_jobinfo(key, {key: batch_failed_event})
+    assert archive_jobinfo(parsed_info) is None
+    with patch.dict(os.environ, {"JOBINFO_ARCHIVE_BUCKET": "archive"}):
+        archived = archive_jobinfo(parsed_info)
+    assert archived == "jobinfo/5ce9a71e-2f18-4dd1-b9ac-9d3618774d3f.json"
+    args, kwargs = s3_client.put_object.call_args
+    assert kwargs["Bucket"] == "archive"
+    assert json.loads(kwargs["Body"]) == json.loads(batch_failed_event["Cause"])
@@ -0,0 +1,97 @@
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+from hls_lambda_layer import hls_db
+from hls_lambda_layer.hls_db import (
+    boolean_parameter,
+    execute_statement,
+    long_parameter,
+    string_parameter,
+)
+
+
+def client_error(code, message):
+    return ClientError(
+        {"Error": {"Code": code, "Message": message}}, "ExecuteStatement"
+    )
+
+
+resuming = client_error(
+    "BadRequestException", "Communications link failure\n\nThe last packet..."
+)
+
+
+def test_parameter_builders():
+    assert string_parameter("a", "b") == {"name": "a", "value": {"stringValue": "b"}}
+    assert long_parameter("a", 0) == {"name": "a", "value": {"longValue": 0}}
+    assert boolean_parameter("a", False) == {
+        "name": "a",
+        "value": {"booleanValue": False},
+    }
+    assert string_parameter("a", None) == {"name": "a", "value": {"isNull": True}}
+
+
+@patch("hls_lambda_layer.hls_db.boto3")
+def test_client_created_once(boto3):
+    with patch("hls_lambda_layer.hls_db.rds_client", None):
+        assert hls_db.get_rds_client() is hls_db.get_rds_client()
+    boto3.client.assert_called_once_with("rds-data")
+
+
+@patch("hls_lambda_layer.hls_db.time.sleep")
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_execute_statement_retries_resuming(client, sleep):
+    client.execute_statement.side_effect = [
+        resuming,
+        client_error("ThrottlingException", "Rate exceeded"),
+        {"records": []},
+    ]
+    assert execute_statement("SELECT 1") == {"records": []}
+    assert client.execute_statement.call_count == 3
+    assert sleep.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "code", ["DatabaseResumingException", "DatabaseUnavailableException"]
+)
+@patch("hls_lambda_layer.hls_db.time.sleep")
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_execute_statement_retries_paused_cluster(client, sleep, code):
+    client.execute_statement.side_effect = [
+        client_error(code, "The database is resuming after being paused"),
+        {"records": []},
+    ]
+    assert execute_statement("SELECT 1") == {"records": []}
+    assert client.execute_statement.call_count == 2
+    assert sleep.call_count == 1
+
+
+@patch("hls_lambda_layer.hls_db.time.sleep")
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_execute_statement_sql_error_not_retried(client, sleep):
+    client.execute_statement.side_effect = client_error(
+        "BadRequestException", 'ERROR: relation "nope" does not exist'
+    )
+    with pytest.raises(ClientError):
+        execute_statement("SELECT * FROM nope")
+    assert client.execute_statement.call_count == 1
+    sleep.assert_not_called()
+
+
+@patch("hls_lambda_layer.hls_db.time.sleep")
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_execute_statement_gives_up(client, sleep):
+    client.execute_statement.side_effect = resuming
+    with pytest.raises(ClientError):
+        execute_statement("SELECT 1")
+    assert client.execute_statement.call_count == hls_db.MAX_ATTEMPTS
+
+
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_execute_statement_logs_latency(client, capsys):
+    client.execute_statement.return_value = {}
+    execute_statement("SELECT\n  1", transactionId="t")
+    args, kwargs = client.execute_statement.call_args
+    assert kwargs["transactionId"] == "t"
+    assert '"db_statement": "SELECT 1"' in capsys.readouterr().out
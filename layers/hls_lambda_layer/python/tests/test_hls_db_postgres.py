@@ -0,0 +1,118 @@
+from datetime import date
+
+import pytest
+from hls_lambda_layer.hls_db import (
+    boolean_parameter,
+    execute_statement,
+    long_parameter,
+    null_parameter,
+    stream_statement,
+    string_parameter,
+    transaction,
+)
+from hls_lambda_layer.hls_db_postgres import parameter_values, to_field, to_pyformat
+
+
+def test_to_pyformat():
+    sql = (
+        "SELECT :path::varchar(3), to_timestamp(:from_ts, 'yyyy-mm-dd hh24:mi:ss')"
+        + " WHERE name LIKE 'a%' AND rate > 5 % 2"
+    )
+    assert to_pyformat(sql) == (
+        "SELECT %(path)s::varchar(3), to_timestamp(%(from_ts)s, 'yyyy-mm-dd hh24:mi:ss')"
+        + " WHERE name LIKE 'a%%' AND rate > 5 %% 2"
+    )
+
+
+def test_parameter_values():
+    assert parameter_values(
+        [
+            string_parameter("a", "b"),
+            long_parameter("c", 1),
+            boolean_parameter("d", False),
+            null_parameter("e"),
+        ]
+    ) == {"a": "b", "c": 1, "d": False, "e": None}
+
+
+def test_to_field():
+    assert to_field(None) == {"isNull": True}
+    assert to_field(True) == {"booleanValue": True}
+    assert to_field(3) == {"longValue": 3}
+    assert to_field({"ExitCode": 0}) == {"stringValue": '{"ExitCode": 0}'}
+    assert to_field(date(2020, 5, 27)) == {"stringValue": "2020-05-27"}
+
+
+log_table = """
+CREATE TABLE sentinel_log (
+    id bigserial primary key,
+    granule varchar,
+    jobinfo jsonb,
+    run_count integer,
+    acquisition date
+);
+CREATE INDEX ON sentinel_log (granule);
+"""
+insert = (
+    "INSERT INTO sentinel_log (granule, run_count, acquisition)"
+    + " VALUES (:granule::varchar, :run_count::integer, :acquisition::date)"
+)
+
+
+def granule_parameters(granule):
+    return [
+        string_parameter("granule", granule),
+        long_parameter("run_count", 0),
+        string_parameter("acquisition", "2020-05-27"),
+    ]
+
+
+def test_execute_statement(postgres_driver):
+    execute_statement(log_table)
+    response = execute_statement(insert, granule_parameters("g1"))
+    assert response["numberOfRecordsUpdated"] == 1
+    response = execute_statement(
+        "SELECT id, granule, acquisition, jobinfo FROM sentinel_log"
+        + " WHERE granule = :granule",
+        [string_parameter("granule", "g1")],
+    )
+    assert response["records"] == [
+        [
+            {"longValue": 1},
+            {"stringValue": "g1"},
+            {"stringValue": "2020-05-27"},
+            {"isNull": True},
+        ]
+    ]
+
+
+def test_transaction_rolls_back(postgres_driver):
+    execute_statement(log_table)
+    with pytest.raises(ValueError):
+        with transaction() as transaction_id:
+            execute_statement(
+                insert, granule_parameters("g1"), transactionId=transaction_id
+            )
+            raise ValueError("abort")
+    with transaction() as transaction_id:
+        execute_statement(
+            insert, granule_parameters("g2"), transactionId=transaction_id
+        )
+    response = execute_statement("SELECT granule FROM sentinel_log")
+    assert response["records"] == [[{"stringValue": "g2"}]]
+
+
+def test_batch_and_stream(postgres_driver):
+    execute_statement(log_table)
+    postgres_driver.batch_execute_statement(
+        insert, [granule_parameters(f"g{index}") for index in range(25)]
+    )
+    batches = list(
+        stream_statement(
+            "SELECT granule FROM sentinel_log WHERE run_count = :run_count ORDER BY id",
+            [long_parameter("run_count", 0)],
+            batch_size=10,
+        )
+    )
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert batches[2][-1] == [{"stringValue": "g24"}]
@@ -0,0 +1,100 @@
+from hls_lambda_layer.batch_test_events import (
+    batch_expected_failed_event,
+    batch_failed_event,
+    batch_failed_event_no_exit,
+    batch_failed_event_string_cause,
+    batch_succeeded_event,
+)
+from hls_lambda_layer.hls_batch_utils import parse_jobinfo
+from hls_lambda_layer.hls_db import execute_statement
+from hls_lambda_layer.hls_failures import (
+    AC_EXPECTED_EXIT_CODES,
+    TILING_EXPECTED_EXIT_CODES,
+    classify,
+    classify_exit_code,
+    escalate_memory,
+    finished_condition,
+    retry_condition,
+)
+from hls_lambda_layer.hls_migrations import migrate
+
+
+def parsed(event):
+    return parse_jobinfo("jobinfo", {"jobinfo": event})
+
+
+def classified(event):
+    return classify(parsed(event), AC_EXPECTED_EXIT_CODES)
+
+
+def test_classify():
+    assert classified(batch_succeeded_event) == "success"
+    assert classified(batch_failed_event) == "input_error"
+    assert classified(batch_expected_failed_event) == "oom"
+    # CannotInspectContainerError, without an exit code.
+    assert classified(batch_failed_event_no_exit) == "transient_infra"
+    assert classified(batch_failed_event_string_cause) == "transient_infra"
+
+
+def test_classify_status_reasons():
+    parsed_info = parsed(batch_expected_failed_event)
+    parsed_info["jobinfo"]["StatusReason"] = "Host EC2 (instance i-0123) terminated."
+    assert classify(parsed_info, AC_EXPECTED_EXIT_CODES) == "transient_infra"
+    parsed_info["jobinfo"]["StatusReason"] = "Job attempt duration exceeded timeout"
+    assert classify(parsed_info, AC_EXPECTED_EXIT_CODES) == "timeout"
+    parsed_info = parsed(batch_failed_event)
+    parsed_info["jobinfo"]["Attempts"][0]["Container"][
+        "Reason"
+    ] = "OutOfMemoryError: Container killed due to memory usage"
+    assert classify(parsed_info, AC_EXPECTED_EXIT_CODES) == "oom"
+
+
+def test_classify_exit_code():
+    assert classify_exit_code(0, AC_EXPECTED_EXIT_CODES) == "success"
+    assert classify_exit_code(4, AC_EXPECTED_EXIT_CODES) == "expected_terminal"
+    assert classify_exit_code(5, AC_EXPECTED_EXIT_CODES) == "input_error"
+    assert classify_exit_code(5, TILING_EXPECTED_EXIT_CODES) == "expected_terminal"
+    assert classify_exit_code(137, TILING_EXPECTED_EXIT_CODES) == "oom"
+    assert classify_exit_code("nocode", AC_EXPECTED_EXIT_CODES) == "transient_infra"
+
+
+def test_conditions():
+    assert retry_condition("sentinel_log") == (
+        "(failure_class IN ('transient_infra', 'oom', 'timeout', 'input_error')"
+        + " AND (failure_class IS DISTINCT FROM 'oom'"
+        + " OR COALESCE(memory, 20000) < 60000))"
+    )
+    assert retry_condition("landsat_ac_log") == (
+        "((failure_class IS NULL OR"
+        + " failure_class IN ('transient_infra', 'oom', 'timeout', 'input_error'))"
+        + " AND (failure_class IS DISTINCT FROM 'oom'"
+        + " OR COALESCE(memory, 20000) < 60000))"
+    )
+    assert finished_condition("landsat_ac_log") == (
+        "(failure_class IN ('success', 'expected_terminal')"
+        + " OR (failure_class = 'oom' AND COALESCE(memory, 20000) >= 60000))"
+    )
+    assert finished_condition("landsat_mgrs_log") == "failure_class IN ('success')"
+
+
+def test_escalate_memory(postgres_driver):
+    migrate()
+    execute_statement(
+        "INSERT INTO sentinel_log (granule, acquisition, failure_class, memory)"
+        + " VALUES ('g1', date '2020-01-01', 'oom', NULL),"
+        + " ('g2', date '2020-01-01', 'oom', 30000),"
+        + " ('g3', date '2020-01-01', 'oom', 60000),"
+        + " ('g4', date '2020-01-01', 'timeout', 30000),"
+        + " ('g5', date '2020-01-01', 'input_error', NULL)"
+    )
+    response = execute_statement(
+        f"UPDATE sentinel_log SET {escalate_memory()}"
+        + f" WHERE {retry_condition('sentinel_log')} RETURNING granule, memory"
+    )
+    memory = {
+        granule["stringValue"]: memory["longValue"]
+        for granule, memory in response["records"]
+    }
+    # Out of memory jobs step up the ladder, others keep their memory, and
+    # jobs which ran out of memory at the cap are no longer retried.
+    assert memory == {"g1": 30000, "g2": 60000, "g4": 30000, "g5": 20000}
@@ -0,0 +1,99 @@
+import pytest
+from hls_lambda_layer.hls_db import execute_statement
+from hls_lambda_layer.hls_log_archive import archive_log_tables
+
+from lambda_functions import setupdb
+
+pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+
+rows = """
+INSERT INTO sentinel_log
+    (ts, granule, acquisition, run_count, historic, succeeded, expected_error,
+    unexpected_error, failure_class, jobinfo, stopped_at)
+VALUES
+    (timestamptz '2020-01-02 23:30:00+00', 'S2A_MSIL1C_20200101T000000_old_succeeded',
+    '2020-01-01', 1, false, true, false, false, 'success', '{"Status": "SUCCEEDED"}',
+    timestamptz '2020-01-02 23:40:00+00'),
+    (timestamptz '2020-01-03 01:00:00+00', 'S2A_MSIL1C_20200101T000000_old_expected',
+    '2020-01-01', 1, true, false, true, false, 'expected_terminal', null, null),
+    (timestamptz '2020-01-03 02:00:00+00', 'S2A_MSIL1C_20200101T000000_old_exhausted',
+    '2020-01-01', 3, false, false, false, true, 'input_error', null, null),
+    (timestamptz '2020-01-03 03:00:00+00', 'S2A_MSIL1C_20200101T000000_old_retrying',
+    '2020-01-01', 1, false, false, false, true, 'input_error', null, null),
+    (timestamptz '2020-01-03 04:00:00+00', 'S2A_MSIL1C_20200101T000000_old_pending',
+    '2020-01-01', 0, false, null, null, null, null, null, null),
+    (now(), 'S2A_MSIL1C_20200101T000000_new_succeeded',
+    '2020-01-01', 1, false, true, false, false, 'success', null, null);
+
+INSERT INTO landsat_ac_log
+    (ts, path, row, acquisition, run_count, exit_code, failure_class, memory)
+VALUES
+    (timestamptz '2020-01-02 00:00:00+00', '001', '001', '2020-01-01', 1, 0, 'success',
+    null),
+    (timestamptz '2020-01-02 00:00:00+00', '001', '002', '2020-01-01', 1, 137, 'oom',
+    60000),
+    (timestamptz '2020-01-02 00:00:00+00', '001', '003', '2020-01-01', 1, 1,
+    'input_error', null);
+
+INSERT INTO landsat_mgrs_log
+    (ts, path, mgrs, acquisition, run_count, exit_code, failure_class)
+VALUES
+    (timestamptz '2020-01-02 00:00:00+00', '001', '36VVK', '2020-01-01', 1, 0,
+    'success'),
+    (timestamptz '2020-01-02 00:00:00+00', '001', '36VVL', '2020-01-01', 3, 1,
+    'input_error'),
+    (timestamptz '2020-01-02 00:00:00+00', '001', '36VVM', '2020-01-01', 1, null,
+    null);
+"""
+
+
+def remaining(table, column):
+    response = execute_statement(f"SELECT {column} FROM {table} ORDER BY id")
+    return [record[0]["stringValue"] for record in response["records"]]
+
+
+def test_archive_log_tables(postgres_driver, tmp_path):
+    setupdb.handler({}, {})
+    execute_statement(rows)
+
+    archived = archive_log_tables(
+        str(tmp_path), retention_days=30, retry_limit=3, batch_size=2
+    )
+
+    assert archived == {"sentinel_log": 3, "landsat_ac_log": 2, "landsat_mgrs_log": 2}
+    granules = remaining("sentinel_log", "granule")
+    assert [granule.split("_")[-1] for granule in granules] == [
+        "retrying",
+        "pending",
+        "succeeded",
+    ]
+    assert remaining("landsat_ac_log", "row") == ["003"]
+    assert remaining("landsat_mgrs_log", "mgrs") == ["36VVM"]
+
+    # Rows are partitioned by the UTC day they were logged.
+    sentinel = pyarrow_parquet.read_table(tmp_path / "sentinel_log").to_pylist()
+    by_granule = {row["granule"].split("_")[-1]: row for row in sentinel}
+    assert set(by_granule) == {"succeeded", "expected", "exhausted"}
+    succeeded = by_granule["succeeded"]
+    assert str(succeeded["date"]) == "2020-01-02"
+    assert str(by_granule["expected"]["date"]) == "2020-01-03"
+    assert succeeded["acquisition"].isoformat() == "2020-01-01"
+    assert succeeded["stopped_at"].isoformat() == "2020-01-02T23:40:00+00:00"
+    assert succeeded["jobinfo"] == '{"Status": "SUCCEEDED"}'
+    assert by_granule["expected"]["historic"] is True
+    assert by_granule["expected"]["stopped_at"] is None
+
+    files = sorted(path.name for path in (tmp_path / "sentinel_log").rglob("*.parquet"))
+    assert files == ["1-1.parquet", "2-2.parquet", "3-3.parquet"]
+    landsat = pyarrow_parquet.read_table(tmp_path / "landsat_ac_log").to_pylist()
+    assert sorted(row["exit_code"] for row in landsat) == [0, 137]
+
+
+def test_archive_log_tables_nothing_finished(postgres_driver, tmp_path):
+    setupdb.handler({}, {})
+    assert archive_log_tables(str(tmp_path), retention_days=30, retry_limit=3) == {
+        "sentinel_log": 0,
+        "landsat_ac_log": 0,
+        "landsat_mgrs_log": 0,
+    }
+    assert not list(tmp_path.iterdir())
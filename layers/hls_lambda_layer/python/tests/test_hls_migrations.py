@@ -0,0 +1,218 @@
+import importlib
+from types import ModuleType
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+from hls_lambda_layer import hls_migrations
+from hls_lambda_layer.hls_db import execute_statement
+from hls_lambda_layer.hls_migrations import (
+    backfill,
+    create_index,
+    execute_ddl,
+    migrate,
+    pending_versions,
+)
+
+
+def records(sql):
+    return execute_statement(sql)["records"]
+
+
+def fake_migration(name, **attributes):
+    migration = ModuleType(f"hls_lambda_layer.migrations.{name}")
+    migration.__dict__.update(attributes)
+    return migration
+
+
+def test_migrate_records_versions(postgres_driver):
+    applied = migrate()
+    assert applied == [hls_migrations.version(m) for m in hls_migrations.migrations()]
+    assert applied[:4] == ["0001", "0002", "0003", "0004"]
+    assert migrate() == []
+    assert records("SELECT name FROM schema_migrations ORDER BY version")[0] == [
+        {"stringValue": "0001_log_tables"}
+    ]
+
+
+def test_migrate_rolls_back_failed_transactional_migration(postgres_driver):
+    def fail(transaction_id):
+        raise ValueError("failed")
+
+    failing = fake_migration(
+        "0001_failing", sql="CREATE TABLE created (id integer)", run=fail
+    )
+    with patch.object(hls_migrations, "migrations", return_value=[failing]):
+        with pytest.raises(ValueError):
+            migrate()
+    assert records("SELECT to_regclass('created') IS NULL") == [[{"booleanValue": True}]]
+    assert records("SELECT count(*) FROM schema_migrations") == [[{"longValue": 0}]]
+
+
+def test_migrate_stops_at_time_budget(postgres_driver):
+    migrations = [
+        fake_migration("0001_first", sql="CREATE TABLE first (id integer)"),
+        fake_migration("0002_second", sql="CREATE TABLE second (id integer)"),
+    ]
+    with patch.object(hls_migrations, "migrations", return_value=migrations):
+        # The budget runs out after the first migration.
+        with patch("hls_lambda_layer.hls_migrations.time") as time:
+            time.monotonic.side_effect = [0, 5, 20]
+            assert migrate(time_budget=10) == ["0001"]
+        assert hls_migrations.deadline is None
+        assert pending_versions() == ["0002"]
+        assert migrate() == ["0002"]
+        assert pending_versions() == []
+
+
+def test_migrate_skips_while_locked(postgres_driver, postgres_url):
+    psycopg = pytest.importorskip("psycopg")
+    with psycopg.connect(postgres_url) as connection:
+        connection.execute(
+            "SELECT pg_advisory_xact_lock(%s)", [hls_migrations.MIGRATION_LOCK]
+        )
+        assert migrate() == []
+    versions = [hls_migrations.version(m) for m in hls_migrations.migrations()]
+    assert pending_versions() == versions
+    assert migrate() == versions
+
+
+@patch("hls_lambda_layer.hls_migrations.time")
+def test_migrate_keeps_lock(time, postgres_driver):
+    migrations = [
+        fake_migration("0001_first", sql="CREATE TABLE first (id integer)"),
+        fake_migration("0002_second", sql="CREATE TABLE second (id integer)"),
+    ]
+    time.monotonic.side_effect = [0, 30, 90]
+    with patch.object(hls_migrations, "migrations", return_value=migrations):
+        with patch.object(
+            hls_migrations, "execute_statement", wraps=execute_statement
+        ) as execute:
+            assert migrate() == ["0001", "0002"]
+    keepalives = [
+        call
+        for call in execute.call_args_list
+        if call.args[0] == hls_migrations.LOCK_KEEPALIVE
+    ]
+    # Once as the lock is taken and once more after a minute.
+    assert len(keepalives) == 2
+    assert hls_migrations.lock_transaction_id is None
+
+
+@patch("hls_lambda_layer.hls_migrations.time.sleep")
+def test_execute_ddl_waits_for_timed_out_statement(sleep):
+    timeout = ClientError(
+        {"Error": {"Code": "StatementTimeoutException", "Message": "timeout"}},
+        "ExecuteStatement",
+    )
+    running = {"records": [[{"booleanValue": True}]]}
+    finished = {"records": [[{"booleanValue": False}]]}
+    sql = "CREATE INDEX CONCURRENTLY log_id_idx ON log (id)"
+    with patch.object(
+        hls_migrations,
+        "execute_statement",
+        side_effect=[timeout, running, finished],
+    ) as execute:
+        execute_ddl(sql)
+    args, kwargs = execute.call_args_list[0]
+    assert kwargs == {"continueAfterTimeout": True}
+    assert execute.call_args_list[1][0][1][0]["value"] == {"stringValue": sql}
+    sleep.assert_called_once_with(hls_migrations.POLL_SECONDS)
+
+
+def test_create_index_on_partitions(postgres_driver):
+    execute_statement(
+        "CREATE TABLE log (id integer, historic boolean) PARTITION BY LIST (historic);"
+        + " CREATE TABLE log_forward PARTITION OF log FOR VALUES IN (false)"
+        + " PARTITION BY RANGE (id);"
+        + " CREATE TABLE log_forward_1 PARTITION OF log_forward FOR VALUES FROM (0) TO (10);"
+        + " CREATE TABLE log_historic PARTITION OF log FOR VALUES IN (true);"
+        + " INSERT INTO log VALUES (1, false), (2, true);"
+    )
+    create_index("log_id_idx", "log", "(id) WHERE historic")
+    create_index("log_id_idx", "log", "(id) WHERE historic")
+    indexes = records(
+        "SELECT indexrelid::regclass::text, indisvalid FROM pg_index"
+        + " JOIN pg_partition_tree('log_id_idx') ON relid = indexrelid ORDER BY 1"
+    )
+    assert indexes == [
+        [{"stringValue": name}, {"booleanValue": True}]
+        for name in [
+            "log_forward_1_id_idx",
+            "log_forward_id_idx",
+            "log_historic_id_idx",
+            "log_id_idx",
+        ]
+    ]
+    with pytest.raises(ValueError):
+        create_index("other_idx", "log", "(id)")
+
+
+def test_create_index_rebuilds_invalid_index(postgres_driver):
+    execute_statement(
+        "CREATE TABLE log (id integer); CREATE INDEX log_id_idx ON log (id);"
+        + " UPDATE pg_index SET indisvalid = false"
+        + " WHERE indexrelid = 'log_id_idx'::regclass"
+    )
+    create_index("log_id_idx", "log", "(id)")
+    assert records(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = 'log_id_idx'::regclass"
+    ) == [[{"booleanValue": True}]]
+
+
+def test_backfill(postgres_driver):
+    execute_statement(
+        "CREATE TABLE log (id integer, value integer);"
+        + " INSERT INTO log SELECT i, NULL FROM generate_series(1, 5) AS i;"
+        + " UPDATE log SET value = 0 WHERE id = 3"
+    )
+    with patch.object(
+        hls_migrations, "execute_statement", wraps=execute_statement
+    ) as execute:
+        updated = backfill("log", "value = id * 10", "value IS NULL", batch_size=2)
+    assert updated == 4
+    # The id bounds, then the id ranges [1, 3), [3, 5) and [5, 7).
+    assert execute.call_count == 4
+    assert records("SELECT value FROM log ORDER BY id") == [
+        [{"longValue": value}] for value in [10, 20, 0, 40, 50]
+    ]
+
+
+def test_failure_class_backfill(postgres_driver):
+    migrate()
+    execute_statement(
+        """
+        INSERT INTO landsat_ac_log (path, row, acquisition, exit_code, job_status, jobinfo)
+        VALUES
+            ('001', '001', '2020-01-01', 0, 'SUCCEEDED', '{}'),
+            ('001', '002', '2020-01-01', 1, 'FAILED', '{}'),
+            ('001', '003', '2020-01-01', 137, 'FAILED', '{}'),
+            ('001', '004', '2020-01-01', 3, 'FAILED', '{}'),
+            ('001', '005', '2020-01-01', null, 'FAILED',
+            '{"Attempts": [{"Container": {"Reason": "CannotInspectContainerError"}}]}'),
+            ('001', '006', '2020-01-01', 137, 'FAILED',
+            '{"StatusReason": "Host EC2 (instance i-0123) terminated."}'),
+            ('001', '007', '2020-01-01', 137, 'FAILED',
+            '{"StatusReason": "Job attempt duration exceeded timeout"}'),
+            ('001', '008', '2020-01-01', 1, 'FAILED',
+            '{"Container": {"Reason": "OutOfMemoryError: Container killed"}}'),
+            ('001', '009', '2020-01-01', null, null, null)
+        """
+    )
+    migration = importlib.import_module(
+        "hls_lambda_layer.migrations.0004_backfill_failure_class"
+    )
+    migration.run(None)
+    assert records("SELECT failure_class FROM landsat_ac_log ORDER BY row") == [
+        [{"stringValue": failure_class}]
+        for failure_class in [
+            "success",
+            "input_error",
+            "oom",
+            "expected_terminal",
+            "transient_infra",
+            "transient_infra",
+            "timeout",
+            "oom",
+        ]
+    ] + [[{"isNull": True}]]
@@ -0,0 +1,164 @@
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+from hls_lambda_layer.hls_db import boolean_parameter, execute_statement
+from hls_lambda_layer.hls_migrations import migrate
+from hls_lambda_layer.hls_reprocessing import Backlog, claim_page, drain, reprocess
+
+sql = claim_page("sentinel_log", "id, granule", "unexpected_error")
+forward = [boolean_parameter("historic_value", False)]
+
+
+@pytest.fixture
+def backlog(postgres_driver):
+    migrate()
+    execute_statement(
+        "INSERT INTO sentinel_log (granule, acquisition, run_count, unexpected_error)"
+        + " SELECT 'g' || i, date '2020-01-01', 0, i % 3 <> 0"
+        + " FROM generate_series(1, 9) AS i"
+    )
+
+
+def run(**kwargs):
+    dispatched = []
+
+    def dispatch(records):
+        dispatched.append([record[1]["stringValue"] for record in records])
+        return []
+
+    drain("errors", sql, forward, dispatch, page_size=2, **kwargs)
+    return dispatched
+
+
+def release(granules):
+    execute_statement(
+        "UPDATE sentinel_log SET claimed_until = NULL"
+        + f" WHERE granule IN ({', '.join(repr(granule) for granule in granules)})"
+    )
+
+
+def test_drain_starts_from_front(backlog):
+    assert run(submission_budget=2) == [["g1", "g2"]]
+    # The submission budget is a quota, the last page is cut short.
+    assert run(submission_budget=3) == [["g4", "g5"], ["g7"]]
+    # A granule which failed again after its retry sorts ahead of the rows
+    # the last run did not reach.
+    execute_statement(
+        "UPDATE sentinel_log SET run_count = 1, acquisition = date '2019-12-31'"
+        + " WHERE granule = 'g1'"
+    )
+    release(["g1"])
+    assert run() == [["g1", "g8"]]
+    release(["g1", "g2", "g4", "g5", "g7", "g8"])
+    assert run() == [["g1", "g2"], ["g4", "g5"], ["g7", "g8"]]
+
+
+def test_drain_priority_order(backlog):
+    execute_statement(
+        "UPDATE sentinel_log SET acquisition = date '2019-12-31' WHERE granule = 'g7'"
+    )
+    execute_statement("UPDATE sentinel_log SET run_count = 1 WHERE granule = 'g2'")
+    # Oldest acquisitions first, then the least retried.
+    assert run() == [["g7", "g1"], ["g4", "g5"], ["g8", "g2"]]
+
+
+def test_drain_skips_claimed_rows(backlog):
+    assert run(submission_budget=2) == [["g1", "g2"]]
+    # The claimed rows are in flight and are not dispatched again until their
+    # claim is released by the logger or their lease expires.
+    assert run(submission_budget=2) == [["g4", "g5"]]
+    release(["g2"])
+    assert run() == [["g2", "g7"], ["g8"]]
+    assert run() == []
+
+
+def test_drain_lease_expires(backlog):
+    everything = [["g1", "g2"], ["g4", "g5"], ["g7", "g8"]]
+    assert run(lease=0) == everything
+    assert run() == everything
+
+
+def test_drain_time_budget(backlog):
+    ticks = iter(range(100))
+    assert run(time_budget=1, clock=lambda: next(ticks)) == [["g1", "g2"]]
+
+
+def test_drain_returns_dispatch_errors(backlog):
+    errors = drain("errors", sql, forward, lambda records: [len(records)], page_size=4)
+    assert errors == [4, 2]
+
+
+def test_drain_skips_rows_not_due(backlog):
+    execute_statement(
+        "UPDATE sentinel_log SET next_retry_at = now() + interval '1 hour'"
+        + " WHERE granule IN ('g2', 'g4')"
+    )
+    execute_statement(
+        "UPDATE sentinel_log SET next_retry_at = now() - interval '1 hour'"
+        + " WHERE granule = 'g5'"
+    )
+    assert run() == [["g1", "g5"], ["g7", "g8"]]
+
+
+errors_backlog = Backlog(
+    name="errors",
+    table="sentinel_log",
+    columns="granule",
+    conditions="unexpected_error",
+    decode=lambda record: record[0]["stringValue"],
+    execution_input=lambda granules: {"errors": granules},
+    page_size=4,
+    # (20000 - 100) // 6600 = 3 items per execution.
+    events_per_item=6600,
+)
+
+
+@patch.dict(os.environ, {"RETRY_LIMIT": "1", "HISTORIC": "historic"})
+def test_reprocess(backlog):
+    execute_statement("UPDATE sentinel_log SET historic = true")
+    execute_statement("UPDATE sentinel_log SET run_count = 1 WHERE granule = 'g8'")
+    client = MagicMock()
+    reprocess(errors_backlog, [], client, "arn")
+    inputs = [
+        json.loads(kwargs["input"])
+        for args, kwargs in client.start_execution.call_args_list
+    ]
+    assert sorted(inputs, key=lambda input: input["errors"]) == [
+        {"errors": ["g1", "g2", "g4"]},
+        {"errors": ["g5"]},
+        {"errors": ["g7"]},
+    ]
+
+
+@patch.dict(os.environ, {"RETRY_LIMIT": "1"})
+def test_reprocess_raises_on_execution_errors(backlog):
+    client = MagicMock()
+    client.start_execution.side_effect = ClientError(
+        {"Error": {"Code": "InvalidArn", "Message": "InvalidArn"}}, "StartExecution"
+    )
+    with pytest.raises(NameError):
+        reprocess(errors_backlog, [], client, "arn")
+
+
+@patch.dict(os.environ, {"RETRY_LIMIT": "1"})
+def test_reprocess_releases_claims_of_failed_starts(backlog):
+    def start_execution(stateMachineArn, input):
+        if "g5" in json.loads(input)["errors"]:
+            raise ClientError(
+                {"Error": {"Code": "InvalidArn", "Message": "InvalidArn"}},
+                "StartExecution",
+            )
+
+    client = MagicMock()
+    client.start_execution.side_effect = start_execution
+    with pytest.raises(NameError):
+        reprocess(errors_backlog, [], client, "arn")
+    response = execute_statement(
+        "SELECT granule FROM sentinel_log WHERE unexpected_error"
+        + " AND claimed_until IS NULL ORDER BY id"
+    )
+    # The first page is started as g1, g2 and g4 and then g5 alone.
+    assert [record[0]["stringValue"] for record in response["records"]] == ["g5"]
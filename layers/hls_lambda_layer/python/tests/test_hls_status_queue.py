@@ -0,0 +1,95 @@
+import json
+import os
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+from hls_lambda_layer.hls_db import execute_statement, long_parameter, string_parameter
+from hls_lambda_layer.hls_status_queue import flush_records, write_statement
+
+update = "UPDATE sentinel_log SET jobinfo = :jobinfo::jsonb WHERE id = :selector"
+insert = "INSERT INTO sentinel_log (granule) VALUES (:granule::varchar)"
+
+
+class LocalQueue:
+    """Stand-in for SQS which keeps sent messages as event records."""
+
+    def __init__(self):
+        self.records = []
+
+    def send_message(self, QueueUrl, MessageBody):
+        message_id = str(len(self.records))
+        self.records.append({"messageId": message_id, "body": MessageBody})
+        return {"MessageId": message_id}
+
+
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_write_statement_without_queue(client):
+    write_statement(insert, [string_parameter("granule", "g")])
+    args, kwargs = client.execute_statement.call_args
+    assert kwargs["sql"] == insert
+
+
+@patch.dict(os.environ, {"STATUS_QUEUE_URL": "queue"})
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_write_behind_roundtrip(client):
+    queue = LocalQueue()
+    with patch("hls_lambda_layer.hls_status_queue.sqs_client", queue):
+        for selector in range(3):
+            write_statement(
+                update,
+                [
+                    string_parameter("jobinfo", "{}"),
+                    long_parameter("selector", selector),
+                ],
+            )
+        write_statement(insert, [string_parameter("granule", "g")])
+    client.execute_statement.assert_not_called()
+    assert json.loads(queue.records[0]["body"])["sql"] == update
+
+    assert flush_records(queue.records) == []
+    assert client.batch_execute_statement.call_count == 2
+    args, kwargs = client.batch_execute_statement.call_args_list[0]
+    assert kwargs["sql"] == update
+    assert [parameters[1] for parameters in kwargs["parameterSets"]] == [
+        long_parameter("selector", selector) for selector in range(3)
+    ]
+
+
+@patch("hls_lambda_layer.hls_db.rds_client")
+def test_flush_records_reports_failed_messages(client):
+    error = ClientError(
+        {"Error": {"Code": "BadRequestException", "Message": "syntax"}},
+        "BatchExecuteStatement",
+    )
+    client.batch_execute_statement.side_effect = [error, {}]
+    # The failed batch is retried a message at a time and only the message
+    # which still fails is reported.
+    client.execute_statement.side_effect = [error, {}]
+    records = [
+        {"messageId": "a", "body": json.dumps({"sql": update, "parameters": []})},
+        {"messageId": "b", "body": json.dumps({"sql": insert, "parameters": []})},
+        {"messageId": "c", "body": json.dumps({"sql": update, "parameters": []})},
+    ]
+    assert flush_records(records) == ["a"]
+    assert client.execute_statement.call_count == 2
+    assert all(
+        kwargs["sql"] == update
+        for args, kwargs in client.execute_statement.call_args_list
+    )
+
+
+def test_flush_records_reports_failed_messages_postgres(postgres_driver):
+    execute_statement("CREATE TABLE flushed (id integer primary key)")
+    insert_id = "INSERT INTO flushed (id) VALUES (:id::integer)"
+    records = [
+        {
+            "messageId": message_id,
+            "body": json.dumps(
+                {"sql": insert_id, "parameters": [string_parameter("id", value)]}
+            ),
+        }
+        for message_id, value in [("a", "1"), ("b", "x"), ("c", "2")]
+    ]
+    assert flush_records(records) == ["b"]
+    response = execute_statement("SELECT id FROM flushed ORDER BY id")
+    assert response["records"] == [[{"longValue": 1}], [{"longValue": 2}]]
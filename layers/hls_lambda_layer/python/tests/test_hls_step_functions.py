@@ -0,0 +1,95 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+from hls_lambda_layer.hls_step_functions import (
+    TokenBucket,
+    chunk_size,
+    start_executions,
+)
+
+
+def client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "StartExecution")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_limits_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=5, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.now == 0
+    for _ in range(10):
+        bucket.acquire()
+    assert abs(clock.now - 1.0) < 1e-9
+
+
+def test_chunk_size():
+    small = [{"granule": "S2A_MSIL1C_20200101T000000"}] * 10
+    # Limited by the history events, (25000 * 0.8 - 100) // 31.
+    assert chunk_size(small, events_per_item=31) == 641
+    large = [{"scene": "x" * 998}] * 10
+    # Limited by the payload, 262144 * 0.8 // (1011 + 2).
+    assert chunk_size(large, events_per_item=10) == 207
+    assert chunk_size(large, events_per_item=10, envelope_bytes=200000) == 9
+    assert chunk_size(large, events_per_item=30000) == 1
+
+
+def test_chunk_size_max_concurrency():
+    small = [{"granule": "S2A_MSIL1C_20200101T000000"}] * 10
+    assert chunk_size(small, events_per_item=31, max_concurrency=400) == 400
+    assert chunk_size(small, events_per_item=31, max_concurrency=0) == 641
+    large = [{"scene": "x" * 998}] * 10
+    assert chunk_size(large, events_per_item=10, max_concurrency=400) == 207
+
+
+def test_start_executions():
+    client = MagicMock()
+    inputs = [{"errors": [index]} for index in range(25)]
+    errors = start_executions(client, "arn", inputs, TokenBucket(1000, 100), workers=4)
+    assert errors == {}
+    started = [
+        json.loads(kwargs["input"])
+        for args, kwargs in client.start_execution.call_args_list
+    ]
+    assert sorted(started, key=lambda input: input["errors"]) == inputs
+    assert client.start_execution.call_args.kwargs["stateMachineArn"] == "arn"
+
+
+@patch("hls_lambda_layer.hls_step_functions.time.sleep")
+def test_start_executions_retries_throttling(sleep):
+    client = MagicMock()
+    client.start_execution.side_effect = [
+        client_error("ThrottlingException"),
+        client_error("ThrottlingException"),
+        {"executionArn": "execution"},
+        client_error("InvalidExecutionInput"),
+    ]
+    bucket = TokenBucket(1000, 100)
+    errors = start_executions(client, "arn", [{"a": 1}], bucket, workers=1)
+    assert errors == {}
+    assert client.start_execution.call_count == 3
+    assert sleep.call_count == 2
+
+    errors = start_executions(client, "arn", [{"a": 1}], bucket, workers=1)
+    assert errors[0].response["Error"]["Code"] == "InvalidExecutionInput"
+
+
+@patch("hls_lambda_layer.hls_step_functions.time.sleep")
+def test_start_executions_gives_up(sleep):
+    client = MagicMock()
+    client.start_execution.side_effect = client_error("ThrottlingException")
+    errors = start_executions(client, "arn", [{"a": 1}], TokenBucket(1000, 100))
+    assert len(errors) == 1
+    assert client.start_execution.call_count == 6
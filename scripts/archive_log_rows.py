@@ -0,0 +1,35 @@
+"""
+Archive finished log rows older than the retention window to Parquet.
+
+Finished rows are written under <root>/<table>/date=<yyyy-mm-dd>/ and deleted
+from the log tables, see hls_lambda_layer.hls_log_archive.  Run it with the
+postgres driver so rows are streamed through a server side cursor rather than
+read in a single Data API response, e.g.
+
+HLS_DB_DRIVER=postgres HLS_SECRETS=... HLS_DB_NAME=... \
+    python -m scripts.archive_log_rows s3://bucket/hls-log-archive
+"""
+
+import argparse
+
+from hls_lambda_layer.hls_log_archive import FINISHED, archive_log_tables
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("root", help="Local directory or s3:// URL to archive under")
+    parser.add_argument("--retention-days", type=int, default=180)
+    parser.add_argument("--retry-limit", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--delete-batch-size", type=int, default=1000)
+    parser.add_argument("--table", action="append", choices=list(FINISHED))
+    args = parser.parse_args()
+    print(
+        archive_log_tables(
+            args.root,
+            args.retention_days,
+            args.retry_limit,
+            args.table,
+            batch_size=args.batch_size,
+            delete_batch_size=args.delete_batch_size,
+        )
+    )
@@ -0,0 +1,82 @@
+"""Time the retry page claims against a local Postgres through the postgres driver."""
+
+import argparse
+import statistics
+import time
+import uuid
+
+import psycopg
+from hls_lambda_layer import hls_db
+from hls_lambda_layer.hls_db import (
+    boolean_parameter,
+    execute_statement,
+    long_parameter,
+    string_parameter,
+)
+from hls_lambda_layer.hls_db_postgres import PostgresDriver
+from hls_lambda_layer.hls_migrations import migrate
+from hls_lambda_layer.hls_reprocessing import START, claim_page
+
+from lambda_functions.process_sentinel_errors import backlog
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--url", required=True, help="libpq URL of a scratch database")
+parser.add_argument("--rows", type=int, default=100000, help="Synthetic sentinel rows")
+parser.add_argument("--runs", type=int, default=20, help="Timed runs per query")
+args = parser.parse_args()
+
+schema = f"benchmark_{uuid.uuid4().hex}"
+with psycopg.connect(args.url, autocommit=True) as connection:
+    connection.execute(f"CREATE SCHEMA {schema}")
+
+try:
+    url = psycopg.conninfo.make_conninfo(args.url, options=f"-csearch_path={schema}")
+    hls_db.driver = PostgresDriver(url)
+    migrate()
+    execute_statement(
+        "INSERT INTO sentinel_log"
+        + " (granule, acquisition, run_count, historic, succeeded, unexpected_error,"
+        + " failure_class)"
+        + " SELECT 'S2A_' || n, date '2020-01-01' + n % 1000, n % 4, n % 10 = 0,"
+        + " n % 7 != 0, n % 7 = 0,"
+        + " CASE WHEN n % 7 = 0 THEN 'input_error' ELSE 'success' END"
+        + " FROM generate_series(1, :rows) AS n",
+        [long_parameter("rows", args.rows)],
+    )
+    execute_statement("ANALYZE sentinel_log")
+
+    # The first page of the Sentinel errors backlog, as reprocess claims it.
+    queries = {
+        "sentinel errors": (
+            claim_page(
+                backlog.table,
+                backlog.columns,
+                backlog.conditions + " AND run_count < :retry_limit::integer",
+                backlog.assignments,
+            ),
+            [
+                long_parameter("retry_limit", 3),
+                boolean_parameter("historic_value", False),
+                string_parameter("after_acquisition", START[0]),
+                long_parameter("after_run_count", START[1]),
+                long_parameter("after_id", START[2]),
+                long_parameter("page_size", backlog.page_size),
+                long_parameter("lease", 3600),
+            ],
+        ),
+    }
+    for name, (sql, sql_parameters) in queries.items():
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            execute_statement(sql, sql_parameters)
+            timings.append(time.perf_counter() - start)
+            # Release the page, so every run claims the same rows.
+            execute_statement(
+                "UPDATE sentinel_log SET claimed_until = NULL"
+                + " WHERE claimed_until IS NOT NULL"
+            )
+        print(f"{name:>16}: median {statistics.median(timings) * 1e3:8.2f} ms")
+finally:
+    with psycopg.connect(args.url, autocommit=True) as connection:
+        connection.execute(f"DROP SCHEMA {schema} CASCADE")
@@ -0,0 +1,87 @@
+"""Compare pr2mgrs load cost and per-invocation latency against the legacy loader."""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import timeit
+
+from lambda_functions.pr2mgrs.hls_pr2mgrs import handler
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--invocations", type=int, default=200, help="Events per run")
+parser.add_argument("--seed", type=int, default=0, help="Random event seed")
+args = parser.parse_args()
+
+repo_root = os.path.join(os.path.dirname(__file__), "..")
+
+# Each loader runs in a fresh interpreter so import time and peak RSS are not
+# polluted by the other loader or by this script.
+load_measurement = """
+import json, resource, time
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+{load}
+elapsed = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": elapsed, "rss_kb": after - before}}))
+"""
+
+loaders = {
+    "legacy text": (
+        "from lambda_functions.pr2mgrs.hls_pr2mgrs.handler import lookup_file\n"
+        "with open(lookup_file, 'r') as f:\n"
+        "    lookupTable = list(map(lambda x: x.split(' '), f.read().splitlines()))"
+    ),
+    "packed mmap": (
+        "from lambda_functions.pr2mgrs.hls_pr2mgrs import handler\n"
+        "handler.handler({'path': '001', 'row': '002'}, {})"
+    ),
+}
+
+for name, load in loaders.items():
+    output = subprocess.run(
+        [sys.executable, "-c", load_measurement.format(load=load)],
+        cwd=repo_root,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    measurement = json.loads(output)
+    print(
+        f"{name:>12}: load {measurement['seconds'] * 1e3:8.1f} ms"
+        f"  peak RSS +{measurement['rss_kb'] / 1024:6.1f} MB"
+    )
+
+with open(handler.lookup_file, "r") as f:
+    lookupTable = list(map(lambda x: x.split(" "), f.read().splitlines()))
+
+
+def legacy_handler(event, context):
+    """The filter based lookup used before the packed table was introduced."""
+    if event.get("row"):
+        pathrow = f"{event['path']}{event['row']}"
+        listS2 = list(filter(lambda x: x[0] == pathrow, lookupTable))
+        mgrs = [s2[1] for s2 in listS2]
+        return {"mgrs": mgrs, "count": len(mgrs)}
+    listL8 = list(filter(lambda x: x[1] == str(event.get("MGRS")), lookupTable))
+    pathrows = [l8[0] for l8 in listL8]
+    if event.get("path"):
+        pathrows = [pr for pr in pathrows if pr[0:3] == str(event.get("path"))]
+    return {"pathrows": pathrows, "pathrows_string": ",".join(pathrows)}
+
+
+random.seed(args.seed)
+rows = lookupTable[1:]
+events = []
+for _ in range(args.invocations):
+    pathrow, mgrs = random.choice(rows)[0:2]
+    events.append({"path": pathrow[0:3], "row": pathrow[3:6]})
+    events.append({"MGRS": mgrs})
+    events.append({"MGRS": mgrs, "path": pathrow[0:3]})
+
+for name, function in [("legacy scan", legacy_handler), ("packed", handler.handler)]:
+    elapsed = timeit.timeit(lambda: [function(e, {}) for e in events], number=1)
+    print(f"{name:>12}: {elapsed / len(events) * 1e6:10.1f} us per invocation")
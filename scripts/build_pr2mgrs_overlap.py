@@ -0,0 +1,11 @@
+"""Pack HLS.L8S2overlap.txt into the memory mapped table read by pr2mgrs."""
+
+from lambda_functions.pr2mgrs.hls_pr2mgrs import handler
+
+with open(handler.lookup_file, "r") as f:
+    packed = handler.pack_overlap_table(f.read().splitlines())
+
+with open(handler.packed_lookup_file, "wb") as f:
+    f.write(packed)
+
+print(f"Wrote {len(packed)} bytes to {handler.packed_lookup_file}")
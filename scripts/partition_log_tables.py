@@ -0,0 +1,131 @@
+"""
+Move log tables created before partitioning into partitioned tables.
+
+Pause the pipeline before running.  Each unpartitioned log table is renamed to
+<table>_unpartitioned along with its indexes and id sequence, the migrations
+are reapplied to create the partitioned tables, and the rows are copied across
+in id order.  Rerunning resumes an interrupted copy.  Drop the
+*_unpartitioned tables with --drop once the copy has been checked.
+
+Database settings are read from the environment as for the Lambdas, e.g.
+
+HLS_SECRETS=... HLS_DB_ARN=... HLS_DB_NAME=... python -m scripts.partition_log_tables
+"""
+
+import argparse
+from typing import List
+
+from hls_lambda_layer.hls_db import execute_statement, long_parameter, string_parameter
+from hls_lambda_layer.hls_migrations import migrate
+
+LOG_TABLES = ["sentinel_log", "landsat_ac_log", "landsat_mgrs_log"]
+
+# Rows logged before historic and the Sentinel acquisition were recorded.
+HISTORIC = "COALESCE(historic, false)"
+SENTINEL_ACQUISITION = (
+    "COALESCE({acquisition}to_date(substring(granule from '_(\\d{{8}})T'),"
+    + " 'YYYYMMDD'), ts::date)"
+)
+
+rename = """
+DO $$
+DECLARE
+  index_name text;
+BEGIN
+  IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('{table}')) = 'r' THEN
+    EXECUTE format('ALTER SEQUENCE %s RENAME TO {table}_unpartitioned_id_seq',
+      pg_get_serial_sequence('{table}', 'id'));
+    FOR index_name IN SELECT indexname FROM pg_indexes
+      WHERE schemaname = current_schema() AND tablename = '{table}'
+    LOOP
+      EXECUTE format('ALTER INDEX %I RENAME TO %I',
+        index_name, index_name || '_unpartitioned');
+    END LOOP;
+    ALTER TABLE {table} RENAME TO {table}_unpartitioned;
+  END IF;
+END $$;
+"""
+
+
+def columns(table: str) -> List[str]:
+    response = execute_statement(
+        "SELECT column_name::text FROM information_schema.columns"
+        + " WHERE table_schema = current_schema() AND table_name = :table"
+        + " ORDER BY ordinal_position",
+        [string_parameter("table", table)],
+    )
+    return [record[0]["stringValue"] for record in response["records"]]
+
+
+def copy_rows(table: str, batch_size: int) -> int:
+    """
+    Copy a table's rows from its unpartitioned predecessor.
+
+    Parameters:
+    table (str) The log table
+    batch_size (int) Rows to copy per statement
+
+    Returns:
+    copied (int) The number of rows read from the unpartitioned table by this run
+
+    """
+    legacy = f"{table}_unpartitioned"
+    legacy_columns = columns(legacy)
+    if not legacy_columns:
+        return 0
+    values = {name: name for name in columns(table) if name in legacy_columns}
+    values["historic"] = HISTORIC
+    if table == "sentinel_log":
+        values["acquisition"] = SENTINEL_ACQUISITION.format(
+            acquisition="acquisition, " if "acquisition" in legacy_columns else ""
+        )
+    sql = (
+        f"WITH batch AS (SELECT * FROM {legacy} WHERE id > :after"
+        + " ORDER BY id LIMIT :batch_size),"
+        + f" copied AS (INSERT INTO {table} ({', '.join(values)})"
+        + f" SELECT {', '.join(values.values())} FROM batch ON CONFLICT DO NOTHING)"
+        + " SELECT count(*), max(id) FROM batch"
+    )
+    # Resume after the last row an interrupted run copied.
+    response = execute_statement(f"SELECT COALESCE(max(id), 0) FROM {table}")
+    after = response["records"][0][0]["longValue"]
+    copied = 0
+    while True:
+        response = execute_statement(
+            sql,
+            [
+                long_parameter("after", after),
+                long_parameter("batch_size", batch_size),
+            ],
+        )
+        count, last_id = response["records"][0]
+        if count["longValue"] == 0:
+            break
+        copied += count["longValue"]
+        after = last_id["longValue"]
+        print(f"{table}: copied {copied} rows")
+    execute_statement(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'),"
+        + f" (SELECT max(id) FROM {table}))"
+    )
+    return copied
+
+
+def partition_log_tables(batch_size: int = 50000, drop: bool = False):
+    for table in LOG_TABLES:
+        execute_statement(rename.format(table=table))
+    migrate(reapply=True)
+    for table in LOG_TABLES:
+        copy_rows(table, batch_size)
+        if drop:
+            execute_statement(f"DROP TABLE IF EXISTS {table}_unpartitioned")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument(
+        "--drop", action="store_true", help="Drop the copied unpartitioned tables"
+    )
+    args = parser.parse_args()
+    partition_log_tables(args.batch_size, args.drop)
@@ -103,10 +103,8 @@ def submit_tile_job(
     return response
 
 
-def process_mgrs(mgrs_tile, date, ignore):
+def process_mgrs(mgrs_tile, mgrs_result, date, ignore):
     print(mgrs_tile)
-    event = {"MGRS": mgrs_tile}
-    mgrs_result = handler.handler(event, {})
 
     year = date[:4]
 
@@ -151,18 +149,16 @@ def process_mgrs(mgrs_tile, date, ignore):
 
 if os.path.isfile(granules):
     scenes = open(granules, "r").read().splitlines()
-    for line in scenes:
-        components = line.split("_")
-        path = components[2][0:3]
-        row = components[2][3:6]
-        date = components[3]
-        result = handler.handler({"path": path, "row": row}, {})
-        process_mgrs(result["mgrs"][0], date)
-
 else:
-    components = granules.split("_")
-    path = components[2][0:3]
-    row = components[2][3:6]
-    date = components[3]
-    result = handler.handler({"path": path, "row": row}, {})
-    process_mgrs(result["mgrs"][0], date, ignore)
+    scenes = [granules]
+
+# Resolve every scene's pathrow and then every first MGRS tile with one
+# batched lookup each rather than a handler call per scene and tile.
+scene_pathrows = [scene.split("_")[2][0:6] for scene in scenes]
+pathrow_results = handler.handler({"pathrows": scene_pathrows}, {})["pathrows"]
+scene_tiles = [pathrow_results[pathrow]["mgrs"][0] for pathrow in scene_pathrows]
+mgrs_results = handler.handler({"mgrs_tiles": scene_tiles}, {})["mgrs_tiles"]
+
+for scene, mgrs_tile in zip(scenes, scene_tiles):
+    date = scene.split("_")[3]
+    process_mgrs(mgrs_tile, mgrs_results[mgrs_tile], date, ignore)
@@ -1,3 +1,21 @@
 #!/bin/bash
-aws lambda invoke --function-name=$HLSSTACK_SETUPDBEXPORT response.json
-rm response.json
+# Invoke the database bootstrap Lambda until no migrations are pending, long
+# migrations are applied over several invocations.  The invocation runs for up
+# to the Lambda's 15 minute timeout, so the CLI must not time out reading it.
+set -e
+function_name=${1:-$HLSSTACK_SETUPDBEXPORT}
+while true; do
+  aws lambda invoke --cli-read-timeout 0 --cli-connect-timeout 60 \
+    --function-name="$function_name" response.json
+  read -r applied pending < <(python3 -c "import json; r = json.load(open('response.json')); print(len(r['applied']), len(r['pending']))")
+  cat response.json
+  rm response.json
+  if [ "$pending" -eq 0 ]; then
+    break
+  fi
+  # Nothing applied while migrations are pending means another run holds the
+  # migration lock, wait for it rather than invoking again straight away.
+  if [ "$applied" -eq 0 ]; then
+    sleep 60
+  fi
+done
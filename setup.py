@@ -18,6 +18,8 @@ extras_require_test = [
     "flake8~=7.0",
     "black~=24.1",
     "boto3~=1.34",
+    "psycopg[binary,pool]~=3.1",
+    "pyarrow>=14",
     "pytest-cov~=4.1",
     "pytest~=8.0",
 ]
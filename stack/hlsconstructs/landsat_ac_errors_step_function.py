@@ -11,9 +11,12 @@ class LandsatACErrorsStepFunction(StateMachineStepFunction):
         scope: Construct,
         id: str,
         landsat_step_function_arn: str,
+        max_concurrency: int = 400,
         **kwargs,
     ) -> None:
         super().__init__(scope, id, **kwargs)
+        # The retry Lambdas size their executions to run all items at once.
+        self.max_concurrency = max_concurrency
 
         state_definition = {
             "Comment": "Landsat AC Errors Step Function",
@@ -22,7 +25,7 @@ class LandsatACErrorsStepFunction(StateMachineStepFunction):
                 "ProcessErrors": {
                     "Type": "Map",
                     "ItemsPath": "$.errors",
-                    "MaxConcurrency": 100,
+                    "MaxConcurrency": max_concurrency,
                     "Iterator": {
                         "StartAt": "ProcessError",
                         "States": {
@@ -52,11 +55,16 @@ class LandsatACErrorsStepFunction(StateMachineStepFunction):
                                         "scheme.$": "$.scheme",
                                         "bucket.$": "$.bucket",
                                         "prefix.$": "$.prefix",
+                                        "memory.$": "$.memory",
                                     },
                                 },
+                                # Discard the nested execution's description, so
+                                # the Map output stays within 256 KB.
+                                "ResultPath": None,
                                 "Catch": [
                                     {
                                         "ErrorEquals": ["States.ALL"],
+                                        "ResultPath": None,
                                         "Next": "SuccessState",
                                     }
                                 ],
@@ -13,9 +13,12 @@ class LandsatIncompleteStepFunction(StateMachineStepFunction):
         id: str,
         landsat_mgrs_step_function_arn: str,
         get_random_wait: Lambda,
+        max_concurrency: int = 400,
         **kwargs,
     ) -> None:
         super().__init__(scope, id, **kwargs)
+        # The retry Lambdas size their executions to run all items at once.
+        self.max_concurrency = max_concurrency
         state_definition = {
             "Comment": "Landsat Incomplete Step Function",
             "StartAt": "ProcessIncompletes",
@@ -23,7 +26,7 @@ class LandsatIncompleteStepFunction(StateMachineStepFunction):
                 "ProcessIncompletes": {
                     "Type": "Map",
                     "ItemsPath": "$.incompletes",
-                    "MaxConcurrency": 100,
+                    "MaxConcurrency": max_concurrency,
                     "Iterator": {
                         "StartAt": "GetRandomWait",
                         "States": {
@@ -51,9 +54,13 @@ class LandsatIncompleteStepFunction(StateMachineStepFunction):
                                         "date.$": "$.date",
                                     },
                                 },
+                                # Discard the nested execution's description, so
+                                # the Map output stays within 256 KB.
+                                "ResultPath": None,
                                 "Catch": [
                                     {
                                         "ErrorEquals": ["States.ALL"],
+                                        "ResultPath": None,
                                         "Next": "SuccessState",
                                     }
                                 ],
@@ -44,14 +44,14 @@ class LandsatMGRSStepFunction(BatchStepFunction):
                 "CheckPathRowStatus": {
                     "Type": "Task",
                     "Resource": landsat_pathrow_status.function.function_arn,
-                    "ResultPath": "$.ready_for_tiling",
+                    "ResultPath": "$.pathrow_status",
                     "Next": "ReadyForTiling",
                 },
                 "ReadyForTiling": {
                     "Type": "Choice",
                     "Choices": [
                         {
-                            "Variable": "$.ready_for_tiling",
+                            "Variable": "$.pathrow_status.ready_for_tiling",
                             "BooleanEquals": True,
                             "Next": "GetRandomWaitTile",
                         }
@@ -82,7 +82,7 @@ class LandsatMGRSStepFunction(BatchStepFunction):
                             "Environment": [
                                 {
                                     "Name": "PATHROW_LIST",
-                                    "Value.$": "$.mgrs_metadata.pathrows_string",
+                                    "Value.$": "$.pathrow_status.pathrows_string",
                                 },
                                 {
                                     "Name": "INPUT_BUCKET",
@@ -133,7 +133,7 @@ class LandsatMGRSStepFunction(BatchStepFunction):
             updated_environment = [
                 {
                     "Name": "PATHROW_LIST",
-                    "Value.$": "$.mgrs_metadata.pathrows_string",
+                    "Value.$": "$.pathrow_status.pathrows_string",
                 },
                 {
                     "Name": "INPUT_BUCKET",
@@ -1,3 +1,4 @@
+import copy
 import json
 from typing import Union
 
@@ -17,10 +18,8 @@ class LandsatStepFunction(BatchStepFunction, StateMachineStepFunction):
         intermediate_output_bucket: str,
         ac_job_definition: str,
         acjobqueue: str,
-        landsat_mgrs_logger: Lambda,
+        landsat_admission: Lambda,
         landsat_ac_logger: Lambda,
-        landsat_logger: Lambda,
-        pr2mgrs: Lambda,
         check_landsat_tiling_exit_code: Lambda,
         check_landsat_ac_exit_code: Lambda,
         get_random_wait: Lambda,
@@ -44,12 +43,12 @@ class LandsatStepFunction(BatchStepFunction, StateMachineStepFunction):
 
         state_definition = {
             "Comment": "Landsat Step Function",
-            "StartAt": "GetMGRSValues",
+            "StartAt": "AdmitLandsat",
             "States": {
-                "GetMGRSValues": {
+                "AdmitLandsat": {
                     "Type": "Task",
-                    "Resource": pr2mgrs.function.function_arn,
-                    "ResultPath": "$.mgrsvalues",
+                    "Resource": landsat_admission.function.function_arn,
+                    "ResultPath": "$",
                     "Next": "MGRSExists",
                     "Retry": [retry],
                 },
@@ -59,25 +58,11 @@ class LandsatStepFunction(BatchStepFunction, StateMachineStepFunction):
                         {
                             "Variable": "$.mgrsvalues.count",
                             "NumericGreaterThan": 0,
-                            "Next": "LogLandsat",
+                            "Next": "LaadsAvailable",
                         },
                     ],
                     "Default": "Done",
                 },
-                "LogLandsat": {
-                    "Type": "Task",
-                    "Resource": landsat_logger.function.function_arn,
-                    "ResultPath": None,
-                    "Next": "LogLandsatMGRS",
-                    "Retry": [retry],
-                },
-                "LogLandsatMGRS": {
-                    "Type": "Task",
-                    "Resource": landsat_mgrs_logger.function.function_arn,
-                    "ResultPath": None,
-                    "Next": "CheckLaads",
-                    "Retry": [retry],
-                },
                 "CheckLaads": {
                     "Type": "Task",
                     "Resource": laads_available.function.function_arn,
@@ -107,7 +92,19 @@ class LandsatStepFunction(BatchStepFunction, StateMachineStepFunction):
                 "WaitForAc": {
                     "Type": "Wait",
                     "SecondsPath": "$.wait_time",
-                    "Next": "RunLandsatAc",
+                    "Next": "AcMemory",
+                },
+                # Retries of scenes which ran out of memory are given more.
+                "AcMemory": {
+                    "Type": "Choice",
+                    "Choices": [
+                        {
+                            "Variable": "$.memory",
+                            "IsPresent": True,
+                            "Next": "RunLandsatAcWithMemory",
+                        }
+                    ],
+                    "Default": "RunLandsatAc",
                 },
                 "RunLandsatAc": {
                     "Type": "Task",
@@ -249,6 +246,9 @@ class LandsatStepFunction(BatchStepFunction, StateMachineStepFunction):
             state_definition["States"]["RunLandsatAc"]["Parameters"][
                 "ContainerOverrides"
             ]["Environment"].append({"Name": "DEBUG_BUCKET", "Value": debug_bucket})
+        run_with_memory = copy.deepcopy(state_definition["States"]["RunLandsatAc"])
+        run_with_memory["Parameters"]["ContainerOverrides"]["Memory.$"] = "$.memory"
+        state_definition["States"]["RunLandsatAcWithMemory"] = run_with_memory
         self.state_machine = aws_stepfunctions.CfnStateMachine(
             self,
             "LandsatStateMachine",
@@ -22,9 +22,12 @@ class SentinelErrorsStepFunction(BatchStepFunction, StateMachineStepFunction):
         get_random_wait: Lambda,
         gibs_outputbucket: str,
         debug_bucket: Union[bool, str] = False,
+        max_concurrency: int = 400,
         **kwargs,
     ) -> None:
         super().__init__(scope, id, **kwargs)
+        # The retry Lambdas size their executions to run all items at once.
+        self.max_concurrency = max_concurrency
         retry = {
             "ErrorEquals": ["States.ALL"],
             "IntervalSeconds": 10,
@@ -39,7 +42,7 @@ class SentinelErrorsStepFunction(BatchStepFunction, StateMachineStepFunction):
                 "ProcessErrors": {
                     "Type": "Map",
                     "ItemsPath": "$.errors",
-                    "MaxConcurrency": 400,
+                    "MaxConcurrency": max_concurrency,
                     "Iterator": {
                         "StartAt": "GetRandomWait",
                         "States": {
@@ -64,6 +67,7 @@ class SentinelErrorsStepFunction(BatchStepFunction, StateMachineStepFunction):
                                     "JobDefinition": sentinel_job_definition,
                                     "ContainerOverrides": {
                                         "Command": ["export && sentinel.sh"],
+                                        "Memory.$": "$.memory",
                                         "Environment": [
                                             {
                                                 "Name": "GRANULE_LIST",
@@ -12,7 +12,7 @@ class SentinelStepFunction(BatchStepFunction):
         self,
         scope: Construct,
         id: str,
-        check_twin_granule: Lambda,
+        sentinel_admission: Lambda,
         laads_available: Lambda,
         outputbucket: str,
         outputbucket_role_arn: str,
@@ -20,7 +20,6 @@ class SentinelStepFunction(BatchStepFunction):
         sentinel_job_definition: str,
         jobqueue: str,
         sentinel_ac_logger: Lambda,
-        sentinel_logger: Lambda,
         check_exit_code: Lambda,
         replace_existing: bool,
         gibs_outputbucket: str,
@@ -41,20 +40,13 @@ class SentinelStepFunction(BatchStepFunction):
             replace = None
         sentinel_state_definition = {
             "Comment": "Sentinel Step Function",
-            "StartAt": "CheckGranule",
+            "StartAt": "AdmitSentinel",
             "States": {
-                "CheckGranule": {
+                "AdmitSentinel": {
                     "Type": "Task",
-                    "Resource": check_twin_granule.function.function_arn,
+                    "Resource": sentinel_admission.function.function_arn,
                     "ResultPath": "$",
-                    "Next": "LogSentinel",
-                    "Retry": [retry],
-                },
-                "LogSentinel": {
-                    "Type": "Task",
-                    "Resource": sentinel_logger.function.function_arn,
-                    "ResultPath": "$",
-                    "Next": "CheckLaads",
+                    "Next": "LaadsAvailable",
                     "Retry": [retry],
                 },
                 "CheckLaads": {
@@ -0,0 +1,61 @@
+from typing import List
+
+from aws_cdk import Duration, aws_iam, aws_lambda, aws_lambda_event_sources, aws_sqs
+from constructs import Construct
+from hlsconstructs.lambdafunc import Lambda
+
+
+class StatusQueue(Construct):
+    """Write-behind queue for status writes and the Lambda that flushes it."""
+
+    def __init__(
+        self,
+        scope: Construct,
+        id: str,
+        env: dict,
+        layers: List[aws_lambda.LayerVersion],
+        rds_policy_statement: aws_iam.PolicyStatement,
+        batch_size: int = 100,
+        batching_window: int = 30,
+        **kwargs,
+    ) -> None:
+        super().__init__(scope, id, **kwargs)
+        timeout = 120
+
+        self.dead_letter_queue = aws_sqs.Queue(
+            self,
+            "StatusDeadLetterQueue",
+            retention_period=Duration.days(14),
+        )
+        self.queue = aws_sqs.Queue(
+            self,
+            "StatusQueue",
+            # AWS recommends six times the consuming function's timeout.
+            visibility_timeout=Duration.seconds(timeout * 6),
+            dead_letter_queue=aws_sqs.DeadLetterQueue(
+                max_receive_count=5, queue=self.dead_letter_queue
+            ),
+        )
+
+        self.flusher = Lambda(
+            self,
+            "FlushStatusQueue",
+            code_file="flush_status_queue.py",
+            env=env,
+            timeout=timeout,
+            layers=layers,
+        )
+        self.flusher.function.add_to_role_policy(rds_policy_statement)
+        self.flusher.function.add_event_source(
+            aws_lambda_event_sources.SqsEventSource(
+                self.queue,
+                batch_size=batch_size,
+                max_batching_window=Duration.seconds(batching_window),
+                report_batch_item_failures=True,
+            )
+        )
+
+    def add_writer(self, writer: Lambda):
+        """Send a logger Lambda's status writes through the queue."""
+        writer.function.add_environment("STATUS_QUEUE_URL", self.queue.queue_url)
+        self.queue.grant_send_messages(writer.function)
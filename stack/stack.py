@@ -6,6 +6,8 @@ from aws_cdk import (
     Duration,
     RemovalPolicy,
     Stack,
+    aws_events,
+    aws_events_targets,
     aws_iam,
     aws_lambda,
     aws_s3,
@@ -30,6 +32,7 @@ from hlsconstructs.rds import Rds
 from hlsconstructs.s3 import S3
 from hlsconstructs.sentinel_errors_step_function import SentinelErrorsStepFunction
 from hlsconstructs.sentinel_step_function import SentinelStepFunction
+from hlsconstructs.status_queue import StatusQueue
 from hlsconstructs.step_function_trigger import StepFunctionTrigger
 from hlsconstructs.stepfunction_alarm import StepFunctionAlarm
 
@@ -79,6 +82,7 @@ LANDSAT_HISTORIC_INCOMPLETE_CRON = getenv(
     "HLS_LANDSAT_HISTORIC_INCOMPLETE_CRON", "cron(0 0/6 * * ? *)"
 )
 SENTINEL_ERRORS_CRON = getenv("HLS_SENTINEL_ERRORS_CRON", "cron(0 0/4 * * ? *)")
+LOG_PARTITIONS_CRON = getenv("HLS_LOG_PARTITIONS_CRON", "cron(0 2 * * ? *)")
 LANDSAT_AC_ERRORS_CRON = getenv("HLS_LANDSAT_AC_ERRORS_CRON", "cron(0 16 * * ? *)")
 LANDSAT_HISTORIC_AC_ERRORS_CRON = getenv(
     "HLS_LANDSAT_HISTORIC_AC_ERRORS_CRON", "cron(0 0/4 * * ? *)"
@@ -87,6 +91,43 @@ LANDSAT_DAYS_PRIOR = getenv("HLS_LANDSAT_DAYS_PRIOR", "4")
 LANDSAT_HISTORIC_HOURS_PRIOR = getenv("HLS_LANDSAT_HISTORIC_HOURS_PRIOR", "4")
 SENTINEL_RETRY_LIMIT = getenv("HLS_SENTINEL_RETRY_LIMIT", "3")
 LANDSAT_RETRY_LIMIT = getenv("HLS_LANDSAT_RETRY_LIMIT", "3")
+# Seconds and rows after which a retry Lambda run stops dispatching its backlog
+RETRY_TIME_BUDGET = getenv("HLS_RETRY_TIME_BUDGET", "600")
+RETRY_SUBMISSION_BUDGET = getenv("HLS_RETRY_SUBMISSION_BUDGET", "20000")
+# Each retry Lambda's share of the compute environment, the rows one run of it
+# may submit
+SENTINEL_RETRY_QUOTA = getenv("HLS_SENTINEL_RETRY_QUOTA", RETRY_SUBMISSION_BUDGET)
+SENTINEL_HISTORIC_RETRY_QUOTA = getenv(
+    "HLS_SENTINEL_HISTORIC_RETRY_QUOTA", RETRY_SUBMISSION_BUDGET
+)
+LANDSAT_AC_RETRY_QUOTA = getenv("HLS_LANDSAT_AC_RETRY_QUOTA", RETRY_SUBMISSION_BUDGET)
+LANDSAT_HISTORIC_AC_RETRY_QUOTA = getenv(
+    "HLS_LANDSAT_HISTORIC_AC_RETRY_QUOTA", RETRY_SUBMISSION_BUDGET
+)
+LANDSAT_INCOMPLETE_RETRY_QUOTA = getenv(
+    "HLS_LANDSAT_INCOMPLETE_RETRY_QUOTA", RETRY_SUBMISSION_BUDGET
+)
+LANDSAT_HISTORIC_INCOMPLETE_RETRY_QUOTA = getenv(
+    "HLS_LANDSAT_HISTORIC_INCOMPLETE_RETRY_QUOTA", RETRY_SUBMISSION_BUDGET
+)
+# Seconds a dispatched retry is claimed if its job is never logged
+RETRY_LEASE = getenv("HLS_RETRY_LEASE", "86400")
+# Seconds before a failed granule's first retry, doubling with each run up to
+# the cap, and the shorter first delay after transient failures
+RETRY_BACKOFF = getenv("HLS_RETRY_BACKOFF", "3600")
+TRANSIENT_RETRY_BACKOFF = getenv("HLS_TRANSIENT_RETRY_BACKOFF", "300")
+RETRY_BACKOFF_CAP = getenv("HLS_RETRY_BACKOFF_CAP", "604800")
+# Container memory, in MiB, of the AC jobs' runs after running out of memory,
+# from the job definitions' memory up to the cap
+OOM_MEMORY_STEPS = getenv("HLS_OOM_MEMORY_STEPS", "20000,30000,60000")
+# Percent of an MGRS tile's summed pathrow coverage required before tiling
+LANDSAT_TILING_COVERAGE_THRESHOLD = getenv(
+    "HLS_LANDSAT_TILING_COVERAGE_THRESHOLD", "100"
+)
+# Queue status writes and apply them to the database in batches
+STATUS_WRITE_BEHIND = getenv("HLS_STATUS_WRITE_BEHIND", "false").lower() == "true"
+# Existing bucket to archive full Batch job descriptions in, jobinfo is compacted
+JOBINFO_ARCHIVE_BUCKET = getenv("HLS_JOBINFO_ARCHIVE_BUCKET", None)
 SSH_KEYNAME = getenv("HLS_SSH_KEYNAME", "hls-mount")
 LANDSAT_SNS_TOPIC = getenv(
     "HLS_LANDSAT_SNS_TOPIC", "arn:aws:sns:us-west-2:673253540267:public-c2-notify-v2"
@@ -233,6 +274,17 @@ class HlsStack(Stack):
             max_capacity=RDS_MAX_CAPACITY,
         )
 
+        self.hls_lambda_layer = aws_lambda.LayerVersion(
+            self,
+            "HLSLambdaLayer",
+            code=aws_lambda.Code.from_asset(
+                os.path.join(
+                    os.path.dirname(__file__), "..", "layers", "hls_lambda_layer"
+                )
+            ),
+            compatible_runtimes=[aws_lambda.Runtime.PYTHON_3_8],
+        )
+
         self.rds_bootstrap = Lambda(
             self,
             "LambdaDBBootstrap",
@@ -242,7 +294,30 @@ class HlsStack(Stack):
                 "HLS_DB_NAME": self.rds.database.database_name,
                 "HLS_DB_ARN": self.rds.arn,
             },
+            timeout=900,
+            layers=[self.hls_lambda_layer],
+        )
+
+        self.create_log_partitions = Lambda(
+            self,
+            "CreateLogPartitions",
+            code_file="create_log_partitions.py",
+            env={
+                "HLS_SECRETS": self.rds.secret.secret_arn,
+                "HLS_DB_NAME": self.rds.database.database_name,
+                "HLS_DB_ARN": self.rds.arn,
+                "MONTHS_AHEAD": "3",
+            },
             timeout=300,
+            layers=[self.hls_lambda_layer],
+        )
+        self.create_log_partitions_rule = aws_events.Rule(
+            self,
+            "CreateLogPartitionsRule",
+            schedule=aws_events.Schedule.expression(LOG_PARTITIONS_CRON),
+        )
+        self.create_log_partitions_rule.add_target(
+            aws_events_targets.LambdaFunction(self.create_log_partitions.function)
         )
 
         self.batch = Batch(
@@ -296,17 +371,6 @@ class HlsStack(Stack):
             vcpus=2,
         )
 
-        self.hls_lambda_layer = aws_lambda.LayerVersion(
-            self,
-            "HLSLambdaLayer",
-            code=aws_lambda.Code.from_asset(
-                os.path.join(
-                    os.path.dirname(__file__), "..", "layers", "hls_lambda_layer"
-                )
-            ),
-            compatible_runtimes=[aws_lambda.Runtime.PYTHON_3_8],
-        )
-
         self.pr2mgrs_lambda = Lambda(
             self,
             "Pr2Mgrs",
@@ -321,98 +385,95 @@ class HlsStack(Stack):
             code_file="laads_available.py",
             env={"LAADS_BUCKET": LAADS_BUCKET},
             timeout=120,
+            layers=[self.hls_lambda_layer],
         )
 
-        self.check_twin_granule = Lambda(
-            self,
-            "CheckGranule",
-            code_file="twin_granule.py",
-            env={"SENTINEL_INPUT_BUCKET": SENTINEL_INPUT_BUCKET},
-            timeout=120,
-        )
-
-        self.check_twin_granule_historic = Lambda(
-            self,
-            "CheckGranuleHistoric",
-            code_file="twin_granule.py",
-            env={"SENTINEL_INPUT_BUCKET": SENTINEL_INPUT_BUCKET_HISTORIC},
-            timeout=120,
-        )
-
-        self.landsat_mgrs_logger = Lambda(
+        self.landsat_admission = Lambda(
             self,
-            "LandsatMGRSLogger",
-            code_file="landsat_mgrs_logger.py",
+            "LandsatAdmission",
+            code_dir="pr2mgrs",
+            handler="hls_pr2mgrs.landsat_admission.handler",
             env={
                 "HLS_SECRETS": self.rds.secret.secret_arn,
                 "HLS_DB_NAME": self.rds.database.database_name,
                 "HLS_DB_ARN": self.rds.arn,
+                "LAADS_BUCKET": LAADS_BUCKET,
             },
             timeout=120,
+            layers=[self.hls_lambda_layer],
         )
 
-        self.landsat_mgrs_logger_historic = Lambda(
+        self.landsat_admission_historic = Lambda(
             self,
-            "LandsatMGRSLoggerHistoric",
-            code_file="landsat_mgrs_logger.py",
+            "LandsatAdmissionHistoric",
+            code_dir="pr2mgrs",
+            handler="hls_pr2mgrs.landsat_admission.handler",
             env={
                 "HLS_SECRETS": self.rds.secret.secret_arn,
                 "HLS_DB_NAME": self.rds.database.database_name,
                 "HLS_DB_ARN": self.rds.arn,
+                "LAADS_BUCKET": LAADS_BUCKET,
                 "HISTORIC": "historic",
             },
             timeout=120,
+            layers=[self.hls_lambda_layer],
         )
 
-        self.mgrs_logger = Lambda(
+        self.sentinel_admission = Lambda(
             self,
-            "MGRSLogger",
-            code_file="mgrs_logger.py",
+            "SentinelAdmission",
+            code_file="sentinel_admission.py",
             env={
                 "HLS_SECRETS": self.rds.secret.secret_arn,
                 "HLS_DB_NAME": self.rds.database.database_name,
                 "HLS_DB_ARN": self.rds.arn,
+                "LAADS_BUCKET": LAADS_BUCKET,
+                "SENTINEL_INPUT_BUCKET": SENTINEL_INPUT_BUCKET,
             },
             timeout=120,
             layers=[self.hls_lambda_layer],
         )
 
-        self.landsat_ac_logger = Lambda(
+        self.sentinel_admission_historic = Lambda(
             self,
-            "LandsatAcLogger",
-            code_file="landsat_ac_logger.py",
+            "SentinelAdmissionHistoric",
+            code_file="sentinel_admission.py",
             env={
                 "HLS_SECRETS": self.rds.secret.secret_arn,
                 "HLS_DB_NAME": self.rds.database.database_name,
                 "HLS_DB_ARN": self.rds.arn,
+                "LAADS_BUCKET": LAADS_BUCKET,
+                "SENTINEL_INPUT_BUCKET": SENTINEL_INPUT_BUCKET_HISTORIC,
+                "HISTORIC": "historic",
             },
             timeout=120,
             layers=[self.hls_lambda_layer],
         )
 
-        self.landsat_logger = Lambda(
+        self.mgrs_logger = Lambda(
             self,
-            "LandsatLogger",
-            code_file="landsat_logger.py",
+            "MGRSLogger",
+            code_file="mgrs_logger.py",
             env={
                 "HLS_SECRETS": self.rds.secret.secret_arn,
                 "HLS_DB_NAME": self.rds.database.database_name,
                 "HLS_DB_ARN": self.rds.arn,
             },
             timeout=120,
+            layers=[self.hls_lambda_layer],
         )
 
-        self.landsat_logger_historic = Lambda(
+        self.landsat_ac_logger = Lambda(
             self,
-            "LandsatLoggerHistoric",
-            code_file="landsat_logger.py",
+            "LandsatAcLogger",
+            code_file="landsat_ac_logger.py",
             env={
                 "HLS_SECRETS": self.rds.secret.secret_arn,
                 "HLS_DB_NAME": self.rds.database.database_name,
                 "HLS_DB_ARN": self.rds.arn,
-                "HISTORIC": "historic",
             },
             timeout=120,
+            layers=[self.hls_lambda_layer],
         )
 
         self.landsat_pathrow_status = Lambda(
@@ -423,8 +484,10 @@ class HlsStack(Stack):
                 "HLS_SECRETS": self.rds.secret.secret_arn,
                 "HLS_DB_NAME": self.rds.database.database_name,
                 "HLS_DB_ARN": self.rds.arn,
+                "COVERAGE_THRESHOLD": LANDSAT_TILING_COVERAGE_THRESHOLD,
             },
             timeout=120,
+            layers=[self.hls_lambda_layer],
         )
 
         self.check_landsat_tiling_exit_code = Lambda(
@@ -432,6 +495,7 @@ class HlsStack(Stack):
             "CheckLandsatTilingExitCode",
             code_file="check_landsat_tiling_exit_code.py",
             timeout=30,
+            layers=[self.hls_lambda_layer],
         )
 
         self.check_exit_code = Lambda(
@@ -439,31 +503,7 @@ class HlsStack(Stack):
             "CheckExitCode",
             code_file="check_exit_code.py",
             timeout=30,
-        )
-
-        self.sentinel_logger = Lambda(
-            self,
-            "SentinelLogger",
-            code_file="sentinel_logger.py",
-            env={
-                "HLS_SECRETS": self.rds.secret.secret_arn,
-                "HLS_DB_NAME": self.rds.database.database_name,
-                "HLS_DB_ARN": self.rds.arn,
-            },
-            timeout=120,
-        )
-
-        self.sentinel_logger_historic = Lambda(
-            self,
-            "SentinelLoggerHistoric",
-            code_file="sentinel_logger.py",
-            env={
-                "HLS_SECRETS": self.rds.secret.secret_arn,
-                "HLS_DB_NAME": self.rds.database.database_name,
-                "HLS_DB_ARN": self.rds.arn,
-                "HISTORIC": "historic",
-            },
-            timeout=120,
+            layers=[self.hls_lambda_layer],
         )
 
         self.sentinel_ac_logger = Lambda(
@@ -509,6 +549,7 @@ class HlsStack(Stack):
                 "HLS_DB_ARN": self.rds.arn,
             },
             timeout=900,
+            layers=[self.hls_lambda_layer],
         )
 
         #  self.put_landsat_task_cw_metric = Lambda(
@@ -616,14 +657,13 @@ class HlsStack(Stack):
         self.sentinel_step_function = SentinelStepFunction(
             self,
             "SentinelStateMachine",
-            check_twin_granule=self.check_twin_granule,
+            sentinel_admission=self.sentinel_admission,
             laads_available=self.laads_available,
             outputbucket=OUTPUT_BUCKET,
             inputbucket=SENTINEL_INPUT_BUCKET,
             sentinel_job_definition=self.sentinel_task.job.ref,
             jobqueue=self.batch.sentinel_jobqueue.ref,
             sentinel_ac_logger=self.sentinel_ac_logger,
-            sentinel_logger=self.sentinel_logger,
             check_exit_code=self.check_exit_code,
             outputbucket_role_arn=OUTPUT_BUCKET_ROLE_ARN,
             replace_existing=REPLACE_EXISTING,
@@ -634,14 +674,13 @@ class HlsStack(Stack):
         self.sentinel_step_function_historic = SentinelStepFunction(
             self,
             "SentinelHistoricStateMachine",
-            check_twin_granule=self.check_twin_granule_historic,
+            sentinel_admission=self.sentinel_admission_historic,
             laads_available=self.laads_available,
             outputbucket=OUTPUT_BUCKET_HISTORIC,
             inputbucket=SENTINEL_INPUT_BUCKET_HISTORIC,
             sentinel_job_definition=self.sentinel_task.job.ref,
             jobqueue=self.batch.sentinel_historic_jobqueue.ref,
             sentinel_ac_logger=self.sentinel_ac_logger,
-            sentinel_logger=self.sentinel_logger_historic,
             check_exit_code=self.check_exit_code,
             outputbucket_role_arn=OUTPUT_BUCKET_ROLE_ARN,
             replace_existing=REPLACE_EXISTING,
@@ -745,10 +784,8 @@ class HlsStack(Stack):
             intermediate_output_bucket=LANDSAT_INTERMEDIATE_OUTPUT_BUCKET,
             ac_job_definition=self.landsat_task.job.ref,
             acjobqueue=self.batch.landsatac_jobqueue.ref,
-            landsat_mgrs_logger=self.landsat_mgrs_logger,
+            landsat_admission=self.landsat_admission,
             landsat_ac_logger=self.landsat_ac_logger,
-            landsat_logger=self.landsat_logger,
-            pr2mgrs=self.pr2mgrs_lambda,
             check_landsat_tiling_exit_code=self.check_landsat_tiling_exit_code,
             check_landsat_ac_exit_code=self.check_exit_code,
             get_random_wait=self.get_random_wait,
@@ -764,10 +801,8 @@ class HlsStack(Stack):
             intermediate_output_bucket=LANDSAT_INTERMEDIATE_OUTPUT_BUCKET,
             ac_job_definition=self.landsat_task.job.ref,
             acjobqueue=self.batch.landsatac_historic_jobqueue.ref,
-            landsat_mgrs_logger=self.landsat_mgrs_logger_historic,
+            landsat_admission=self.landsat_admission_historic,
             landsat_ac_logger=self.landsat_ac_logger,
-            landsat_logger=self.landsat_logger_historic,
-            pr2mgrs=self.pr2mgrs_lambda,
             check_landsat_tiling_exit_code=self.check_landsat_tiling_exit_code,
             check_landsat_ac_exit_code=self.check_exit_code,
             get_random_wait=self.get_random_wait,
@@ -866,6 +901,12 @@ class HlsStack(Stack):
                 "HLS_DB_ARN": self.rds.arn,
                 "DAYS_PRIOR": LANDSAT_DAYS_PRIOR,
                 "RETRY_LIMIT": LANDSAT_RETRY_LIMIT,
+                "TIME_BUDGET": RETRY_TIME_BUDGET,
+                "SUBMISSION_BUDGET": LANDSAT_INCOMPLETE_RETRY_QUOTA,
+                "LEASE": RETRY_LEASE,
+                "MAX_CONCURRENCY": str(
+                    self.landsat_incomplete_step_function.max_concurrency
+                ),
             },
         )
 
@@ -884,6 +925,12 @@ class HlsStack(Stack):
                 "HLS_DB_ARN": self.rds.arn,
                 "HOURS_PRIOR": LANDSAT_HISTORIC_HOURS_PRIOR,
                 "RETRY_LIMIT": LANDSAT_RETRY_LIMIT,
+                "TIME_BUDGET": RETRY_TIME_BUDGET,
+                "SUBMISSION_BUDGET": LANDSAT_HISTORIC_INCOMPLETE_RETRY_QUOTA,
+                "LEASE": RETRY_LEASE,
+                "MAX_CONCURRENCY": str(
+                    self.landsat_historic_incomplete_step_function.max_concurrency
+                ),
                 "HISTORIC": "historic",
             },
         )
@@ -902,6 +949,13 @@ class HlsStack(Stack):
                 "HLS_DB_NAME": self.rds.database.database_name,
                 "HLS_DB_ARN": self.rds.arn,
                 "RETRY_LIMIT": LANDSAT_RETRY_LIMIT,
+                "TIME_BUDGET": RETRY_TIME_BUDGET,
+                "SUBMISSION_BUDGET": LANDSAT_AC_RETRY_QUOTA,
+                "LEASE": RETRY_LEASE,
+                "MAX_CONCURRENCY": str(
+                    self.landsat_ac_errors_step_function.max_concurrency
+                ),
+                "MEMORY_STEPS": OOM_MEMORY_STEPS,
             },
         )
 
@@ -919,6 +973,13 @@ class HlsStack(Stack):
                 "HLS_DB_NAME": self.rds.database.database_name,
                 "HLS_DB_ARN": self.rds.arn,
                 "RETRY_LIMIT": LANDSAT_RETRY_LIMIT,
+                "TIME_BUDGET": RETRY_TIME_BUDGET,
+                "SUBMISSION_BUDGET": LANDSAT_HISTORIC_AC_RETRY_QUOTA,
+                "LEASE": RETRY_LEASE,
+                "MAX_CONCURRENCY": str(
+                    self.landsat_historic_ac_errors_step_function.max_concurrency
+                ),
+                "MEMORY_STEPS": OOM_MEMORY_STEPS,
                 "HISTORIC": "historic",
             },
         )
@@ -936,8 +997,16 @@ class HlsStack(Stack):
                 "HLS_DB_NAME": self.rds.database.database_name,
                 "HLS_DB_ARN": self.rds.arn,
                 "RETRY_LIMIT": SENTINEL_RETRY_LIMIT,
+                "TIME_BUDGET": RETRY_TIME_BUDGET,
+                "SUBMISSION_BUDGET": SENTINEL_RETRY_QUOTA,
+                "LEASE": RETRY_LEASE,
+                "MAX_CONCURRENCY": str(
+                    self.sentinel_errors_step_function.max_concurrency
+                ),
+                "MEMORY_STEPS": OOM_MEMORY_STEPS,
                 "HISTORIC": "no",
             },
+            layers=[self.hls_lambda_layer],
         )
 
         self.sentinel_historic_errors_step_function_trigger = StepFunctionTrigger(
@@ -953,8 +1022,16 @@ class HlsStack(Stack):
                 "HLS_DB_NAME": self.rds.database.database_name,
                 "HLS_DB_ARN": self.rds.arn,
                 "RETRY_LIMIT": SENTINEL_RETRY_LIMIT,
+                "TIME_BUDGET": RETRY_TIME_BUDGET,
+                "SUBMISSION_BUDGET": SENTINEL_HISTORIC_RETRY_QUOTA,
+                "LEASE": RETRY_LEASE,
+                "MAX_CONCURRENCY": str(
+                    self.sentinel_errors_step_function_historic.max_concurrency
+                ),
+                "MEMORY_STEPS": OOM_MEMORY_STEPS,
                 "HISTORIC": "historic",
             },
+            layers=[self.hls_lambda_layer],
         )
 
         # Alarms
@@ -982,6 +1059,56 @@ class HlsStack(Stack):
         # Cross construct permissions
         self.addRDSpolicy()
 
+        if STATUS_WRITE_BEHIND:
+            self.status_queue = StatusQueue(
+                self,
+                "StatusQueue",
+                env={
+                    "HLS_SECRETS": self.rds.secret.secret_arn,
+                    "HLS_DB_NAME": self.rds.database.database_name,
+                    "HLS_DB_ARN": self.rds.arn,
+                },
+                layers=[self.hls_lambda_layer],
+                rds_policy_statement=self.rds.policy_statement,
+            )
+            # landsat_ac_logger writes synchronously because the MGRS step
+            # function reads its status to decide whether a tile is ready.
+            for logger in [
+                self.sentinel_ac_logger,
+                self.update_sentinel_failure,
+                self.mgrs_logger,
+            ]:
+                self.status_queue.add_writer(logger)
+
+        # The job loggers schedule the next retry of failed granules.
+        for logger in [
+            self.landsat_ac_logger,
+            self.mgrs_logger,
+            self.sentinel_ac_logger,
+            self.update_sentinel_failure,
+        ]:
+            logger.function.add_environment("RETRY_BACKOFF", RETRY_BACKOFF)
+            logger.function.add_environment(
+                "TRANSIENT_RETRY_BACKOFF", TRANSIENT_RETRY_BACKOFF
+            )
+            logger.function.add_environment("RETRY_BACKOFF_CAP", RETRY_BACKOFF_CAP)
+
+        if JOBINFO_ARCHIVE_BUCKET:
+            jobinfo_archive_policy = aws_iam.PolicyStatement(
+                resources=[f"arn:aws:s3:::{JOBINFO_ARCHIVE_BUCKET}/jobinfo/*"],
+                actions=["s3:PutObject"],
+            )
+            for logger in [
+                self.landsat_ac_logger,
+                self.mgrs_logger,
+                self.sentinel_ac_logger,
+                self.update_sentinel_failure,
+            ]:
+                logger.function.add_environment(
+                    "JOBINFO_ARCHIVE_BUCKET", JOBINFO_ARCHIVE_BUCKET
+                )
+                logger.function.add_to_role_policy(jobinfo_archive_policy)
+
         # Bucket policies
         self.laads_bucket_read_policy = aws_iam.PolicyStatement(
             resources=[
@@ -995,6 +1122,13 @@ class HlsStack(Stack):
         )
         self.laads_cron.function.add_to_role_policy(self.laads_bucket_read_policy)
         self.laads_available.function.add_to_role_policy(self.laads_bucket_read_policy)
+        for admission in [
+            self.landsat_admission,
+            self.landsat_admission_historic,
+            self.sentinel_admission,
+            self.sentinel_admission_historic,
+        ]:
+            admission.function.add_to_role_policy(self.laads_bucket_read_policy)
 
         if DOWNLOADER_FUNCTION_ARN:
             self.downloader_function = aws_lambda.Function.from_function_arn(
@@ -1020,7 +1154,7 @@ class HlsStack(Stack):
                 "s3:List*",
             ],
         )
-        self.check_twin_granule.function.add_to_role_policy(
+        self.sentinel_admission.function.add_to_role_policy(
             self.sentinel_input_bucket_policy
         )
         self.sentinel_task.role.add_to_policy(self.sentinel_input_bucket_policy)
@@ -1035,7 +1169,7 @@ class HlsStack(Stack):
                 "s3:List*",
             ],
         )
-        self.check_twin_granule_historic.function.add_to_role_policy(
+        self.sentinel_admission_historic.function.add_to_role_policy(
             self.sentinel_input_bucket_historic_policy
         )
         self.sentinel_task.role.add_to_policy(
@@ -1209,22 +1343,21 @@ class HlsStack(Stack):
     def addRDSpolicy(self):
         lambdas = [
             self.rds_bootstrap,
-            self.landsat_mgrs_logger,
-            self.landsat_mgrs_logger_historic,
+            self.create_log_partitions,
             self.landsat_ac_logger,
             self.mgrs_logger,
             self.landsat_pathrow_status,
             self.sentinel_ac_logger,
-            self.sentinel_logger,
-            self.sentinel_logger_historic,
             self.update_sentinel_failure,
             self.check_landsat_pathrow_complete,
             self.landsat_incomplete_step_function_trigger.execute_step_function,
             self.landsat_historic_incomplete_step_function_trigger.execute_step_function,
             self.sentinel_errors_step_function_trigger.execute_step_function,
             self.sentinel_historic_errors_step_function_trigger.execute_step_function,
-            self.landsat_logger,
-            self.landsat_logger_historic,
+            self.landsat_admission,
+            self.landsat_admission_historic,
+            self.sentinel_admission,
+            self.sentinel_admission_historic,
             #  self.put_landsat_task_cw_metric,
             #  self.put_landsat_tile_task_cw_metric,
             #  self.put_sentintel_task_cw_metric,